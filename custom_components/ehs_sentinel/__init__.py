@@ -9,8 +9,9 @@ import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import entity_registry, device_registry
-from .const import DOMAIN
+from .const import DOMAIN, DEFAULT_SNAPSHOT_MAX_AGE, PACKET_LOG_FORMAT_TEXT
 from .nasa_packet import AddressClassEnum
+from .statistics_import import DEFAULT_STATISTICS_KEYS, async_import_capture_statistics, statistics_keys
 from pathlib import Path
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,6 +20,7 @@ NASA_REPOSITORY_FILE = os.path.join(
 )
 NASA_REPOSITORY_FILE = os.path.abspath(NASA_REPOSITORY_FILE)
 PLATFORMS = ["sensor", "number", "switch", "binary_sensor", "select"]
+FSV_EXPORT_READ_TIMEOUT = 30  # maximale Wartezeit in Sekunden für das Lesen aller FSV Werte beim Export
 
 def get_entry_option(entry, key, default=None):
     return entry.options.get(key, entry.data.get(key, default))
@@ -41,10 +43,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         "extended_logging": get_entry_option(entry, "extended_logging", False),
         "force_refresh": get_entry_option(entry, "force_refresh", False),
         "diagnostic_logs": get_entry_option(entry, "diagnostic_logs", False),
+        "snapshot_max_age": get_entry_option(entry, "snapshot_max_age", DEFAULT_SNAPSHOT_MAX_AGE),
+        "packet_log_format": get_entry_option(entry, "packet_log_format", PACKET_LOG_FORMAT_TEXT),
     }
     _LOGGER.debug(f"Config Dict: {config_dict}")
 
     coordinator = EHSSentinelCoordinator(hass, config_dict, nasa_repo)
+
+    # letzte bekannte Werte laden, bevor die Plattformen ihre Entities anlegen
+    await coordinator.async_restore_snapshot()
     
     await coordinator.async_config_entry_first_refresh()
     
@@ -103,7 +110,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         "export_fsv_file",
         async_export_fsv_file_service,
         schema=vol.Schema({
-            vol.Required("file_name"): cv.string
+            vol.Required("file_name"): cv.string,
+            vol.Optional("fresh_read", default=False): cv.boolean
         }),
         supports_response=SupportsResponse.ONLY
     )
@@ -118,6 +126,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         supports_response=SupportsResponse.ONLY
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        "import_statistics",
+        async_import_statistics_service,
+        schema=vol.Schema({
+            vol.Required("file_name"): cv.string,
+            vol.Optional("nasa_keys"): vol.All(cv.ensure_list, [vol.In(statistics_keys(nasa_repo))]),
+            vol.Optional("start"): cv.datetime,
+            vol.Optional("end"): cv.datetime,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -215,6 +236,7 @@ async def async_request_current_diagnostics(call: ServiceCall):
     coordinator = next(iter(call.hass.data[DOMAIN].values()))
     _LOGGER.info(f"Service Action Call: Request current Diagnostics")
     await coordinator._log_task_stats()
+    await coordinator.dump_capture("diagnostics", force=True)
 
 async def async_development_tools_service(call: ServiceCall):
     tool_name = call.data.get("tool_name")
@@ -231,6 +253,7 @@ async def async_development_tools_service(call: ServiceCall):
 
 async def async_export_fsv_file_service(call: ServiceCall):
     file_name = call.data.get("file_name")
+    fresh_read = call.data.get("fresh_read", False)
     coordinator = next(iter(call.hass.data[DOMAIN].values()))
     if not coordinator:
         raise ServiceValidationError(
@@ -240,7 +263,14 @@ async def async_export_fsv_file_service(call: ServiceCall):
     log_dir = Path(
             coordinator.hass.config.path("www", DOMAIN, "logs")
         )
-    _LOGGER.info(f"Service Action Call: Export FSV File {log_dir / file_name}")
+    _LOGGER.info(f"Service Action Call: Export FSV File {log_dir / file_name} (fresh read: {fresh_read})")
+
+    fsv_keys = [key for key in coordinator.nasa_repo if "_FSV_" in key]
+    fresh_keys = set()
+    if fresh_read:
+        # alle FSV Werte vor dem Export gebündelt vom Gerät lesen, die Antworten landen über den Processor in coordinator.data
+        fresh_keys = await coordinator.producer.read_batch(fsv_keys, FSV_EXPORT_READ_TIMEOUT)
+        _LOGGER.info(f"FSV Export: {len(fresh_keys)} of {len(fsv_keys)} values read from the device")
 
     dict_to_export = {}
 
@@ -250,14 +280,22 @@ async def async_export_fsv_file_service(call: ServiceCall):
                 dict_to_export[value['nasa_name']] = value['value']
 
     def _write_yaml(path, data):
-        with open(path, "w") as file:
+        # direkt in eine temporäre Datei streamen und erst danach ersetzen, damit kein halbes Backup entsteht
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as file:
             yaml.dump(data, file)
+        os.replace(tmp_path, path)
 
     try:
-        log_dir.mkdir(parents=True, exist_ok=True)
         await coordinator.hass.async_add_executor_job(_write_yaml, log_dir / file_name, dict_to_export)
         _LOGGER.info(f"FSV File {log_dir / file_name} exported successfully.")    
-        return {"status": "success", "message": f"Exported FSV File {log_dir / file_name}"}
+        response = {"status": "success", "message": f"Exported FSV File {log_dir / file_name}"}
+        if fresh_read:
+            response["fresh"] = sorted(key for key in dict_to_export if key in fresh_keys)
+            response["cached"] = sorted(key for key, value in dict_to_export.items() if key not in fresh_keys and value is not None)
+            response["missing"] = sorted(key for key in fsv_keys if key not in fresh_keys and dict_to_export.get(key) is None)
+        return response
     except Exception as e:
         _LOGGER.error(f"Error exporting FSV File {log_dir / file_name}: {e}")
         return {"status": "error", "message": f"Error exporting FSV File {log_dir / file_name}: {e}"}
@@ -299,14 +337,65 @@ async def async_import_fsv_file_service(call: ServiceCall) -> ServiceResponse:
                     value['new_value'] = "OFF"
             
             _LOGGER.info(f"FSV Key {key} from file {log_dir / file_name} is different from current value. Current: {value['old_value']}, Backup: {value['new_value']}. Restoring value.")
-            
-            await coordinator.producer.write_request(
-                message=key,
-                value=f"{value['new_value']}",
-                read_request_after=True
-            )
+
+        # alle geänderten Werte gebündelt schreiben und gemeinsam zurücklesen
+        results = await coordinator.producer.write_batch(
+            {key: value['new_value'] for key, value in dict_to_update.items()}
+        )
+        for key, value in dict_to_update.items():
+            value['success'] = results.get(key, False)
+
+        failed = [key for key, value in dict_to_update.items() if not value['success']]
+        if len(failed) > 0:
+            _LOGGER.warning(f"FSV Import from {log_dir / file_name}: {len(failed)} of {len(dict_to_update)} values could not be restored: {failed}")
+            return {"status": "partial", "message": f"Imported FSV File {log_dir / file_name}, {len(failed)} of {len(dict_to_update)} values failed", "updated_entities": dict_to_update}
         return {"status": "success", "message": f"Imported FSV File {log_dir / file_name}", "updated_entities": dict_to_update}
     else:
         _LOGGER.error(f"FSV File {log_dir / file_name} not found.")
         return {"status": "error", "message": f"FSV File {log_dir / file_name} not found."}
-    
\ No newline at end of file
+    
+
+async def async_import_statistics_service(call: ServiceCall) -> ServiceResponse:
+    file_name = call.data.get("file_name")
+    nasa_keys = call.data.get("nasa_keys") or DEFAULT_STATISTICS_KEYS
+    start = call.data.get("start")
+    end = call.data.get("end")
+    coordinator = next(iter(call.hass.data[DOMAIN].values()))
+    if not coordinator:
+        raise ServiceValidationError(
+                translation_key="coordinator_not_found",
+                translation_domain=DOMAIN,
+            )
+
+    log_dir = Path(
+            coordinator.hass.config.path("www", DOMAIN, "logs")
+        )
+    _LOGGER.info(f"Service Action Call: Import Statistics from {log_dir / file_name} for {len(nasa_keys)} sensors")
+    if "recorder" not in call.hass.config.components:
+        return {"status": "error", "message": "The recorder integration is not loaded."}
+    if not os.path.isfile(log_dir / file_name):
+        _LOGGER.error(f"Capture {log_dir / file_name} not found.")
+        return {"status": "error", "message": f"Capture {log_dir / file_name} not found."}
+
+    try:
+        result = await async_import_capture_statistics(
+            call.hass,
+            coordinator,
+            log_dir / file_name,
+            nasa_keys,
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+        )
+    except Exception as e:
+        _LOGGER.error(f"Error importing statistics from {log_dir / file_name}: {e}")
+        return {"status": "error", "message": f"Error importing statistics from {log_dir / file_name}: {e}"}
+
+    hours = sum(result["imported"].values())
+    _LOGGER.info(f"Statistics import from {log_dir / file_name}: {result['frames']} frames, {hours} hourly statistics for {len(result['imported'])} sensors")
+    return {
+        "status": "success" if len(result["missing"]) == 0 else "partial",
+        "message": f"Imported {hours} hourly statistics for {len(result['imported'])} sensors from {log_dir / file_name}",
+        "frames": result["frames"],
+        "imported": result["imported"],
+        "missing": result["missing"],
+    }
@@ -0,0 +1,58 @@
+_UNSET = object()
+
+
+class AdaptiveInterval:
+    """
+    Poll-Intervall einer einzelnen Adresse, das sich an die Volatilität des Werts anpasst.
+
+    Solange sich der Wert zwischen zwei Polls nicht ändert, wächst das Intervall
+    exponentiell bis max_interval. Sobald eine Änderung gesehen wird, springt es
+    zurück auf min_interval.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, factor: float = 2.0):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError(f"Invalid adaptive bounds: min_interval={min_interval}, max_interval={max_interval}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+        self.next_due = None
+        self.last_value = _UNSET
+        self._changed = False
+        self._polled = False
+
+    def due(self, now: float) -> bool:
+        return self.next_due is None or self.next_due <= now
+
+    def on_value(self, value, now: float):
+        """Neuer Wert empfangen (Broadcast oder Antwort auf einen Poll)."""
+        if self.last_value is not _UNSET and value != self.last_value:
+            self.interval = self.min_interval
+            self._changed = True
+            if self.next_due is None or self.next_due > now + self.min_interval:
+                self.next_due = now + self.min_interval
+        self.last_value = value
+
+    def on_poll(self, now: float):
+        """
+        Adresse wird jetzt abgefragt, Intervall für den nächsten Poll bestimmen.
+
+        Maßgeblich sind alle Werte seit dem letzten Poll, also auch dessen Antwort. Ein Vergleich mit dem
+        beim letzten Poll bekannten Wert würde eine Änderung erst einen Poll später bemerken.
+        """
+        if self._polled and not self._changed:
+            self.interval = min(self.interval * self.factor, self.max_interval)
+        self._changed = False
+        self._polled = True
+        self.next_due = now + self.interval
+
+    def set_bounds(self, min_interval: float, max_interval: float):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError(f"Invalid adaptive bounds: min_interval={min_interval}, max_interval={max_interval}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(self.interval, min_interval), max_interval)
+
+    def __repr__(self):
+        return f"AdaptiveInterval(interval={self.interval}, min={self.min_interval}, max={self.max_interval}, next_due={self.next_due})"
@@ -0,0 +1,64 @@
+import time
+from array import array
+
+from .packet_capture import CaptureWriter
+
+
+class CaptureRing:
+    """
+    Ringpuffer der letzten Rohframes, immer aktiv und ohne Dateizugriff.
+
+    Alle Frames liegen in einer vorab angelegten bytearray-Arena mit festen Slots zu slot_size Bytes,
+    Länge und monotone Zeit (ns) in zwei arrays daneben. add() kopiert nur den Frame in seinen Slot,
+    es wird nichts alloziert. Frames größer als ein Slot werden gekürzt abgelegt und gezählt.
+    snapshot() liefert den Inhalt in zeitlicher Reihenfolge, dump_frames() schreibt ihn im Binärformat aus packet_capture.
+    """
+
+    def __init__(self, capacity: int = 2048, slot_size: int = 512):
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.truncated = 0
+        self._arena = bytearray(capacity * slot_size)
+        self._lengths = array("H", bytes(2 * capacity))
+        self._stamps = array("Q", bytes(8 * capacity))
+        self._next = 0
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    @property
+    def total(self) -> int:
+        return self._next
+
+    def add(self, frame: bytes, mono_ns: int = None):
+        slot = self._next % self.capacity
+        length = len(frame)
+        if length > self.slot_size:
+            length = self.slot_size
+            frame = frame[:length]
+            self.truncated += 1
+        start = slot * self.slot_size
+        self._arena[start:start + length] = frame
+        self._lengths[slot] = length
+        self._stamps[slot] = time.monotonic_ns() if mono_ns is None else mono_ns
+        self._next += 1
+
+    def snapshot(self) -> list:
+        """Kopie des Inhalts als [(monotone Zeit in ns, Frame), ...], älteste zuerst."""
+        frames = []
+        for i in range(self._next - len(self), self._next):
+            slot = i % self.capacity
+            start = slot * self.slot_size
+            frames.append((self._stamps[slot], bytes(self._arena[start:start + self._lengths[slot]])))
+        return frames
+
+    def clear(self):
+        self._next = 0
+
+
+def dump_frames(frames: list, path):
+    """Schreibt einen snapshot() als eigenständige Aufzeichnung (blockierend, im Executor aufrufen)."""
+    with open(path, "wb") as f:
+        writer = CaptureWriter(f)
+        for mono_ns, frame in frames:
+            writer.write(mono_ns, frame)
@@ -0,0 +1,82 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+
+
+class Clock:
+    """Zeitquelle für Scheduler und Timeouts, kann für Tests und Replays ersetzt werden."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Wanduhrzeit als Unix-Timestamp, z.B. für gespeicherte Zeitstempel."""
+        return time.time()
+
+    def now(self) -> datetime:
+        """Lokale Wanduhrzeit als datetime, z.B. für Tageswechsel und Energie-Deltas."""
+        return datetime.fromtimestamp(self.time())
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class ScaledClock(Clock):
+    """Clock die um den Faktor speed schneller läuft als die Echtzeit (z.B. für beschleunigte Tests)."""
+
+    def __init__(self, speed: float = 1.0, start: float = None):
+        if speed <= 0:
+            raise ValueError("speed must be greater than 0")
+        self.speed = speed
+        self._real_start = time.monotonic()
+        self._wall_start = time.time() if start is None else start
+
+    def monotonic(self) -> float:
+        return self._real_start + (time.monotonic() - self._real_start) * self.speed
+
+    def time(self) -> float:
+        return self._wall_start + (time.monotonic() - self._real_start) * self.speed
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(seconds, 0) / self.speed)
+
+
+class ReplayClock(Clock):
+    """
+    Clock die nur per advance() weiterläuft, z.B. mit den Zeitstempeln einer Aufzeichnung.
+
+    So sieht der Coordinator bei einem Replay die Zeitabstände der Aufzeichnung, egal wie schnell
+    die Frames eingespielt werden. sleep() kehrt zurück, sobald die Replay-Zeit weit genug
+    vorgerückt ist.
+    """
+
+    def __init__(self, start: float = None):
+        self._wall = time.time() if start is None else start
+        self._offset = self._wall - time.monotonic()  # monotonic beginnt beim aktuellen Wert
+        self._waiters = []
+        self._counter = itertools.count()
+
+    def monotonic(self) -> float:
+        return self._wall - self._offset
+
+    def time(self) -> float:
+        return self._wall
+
+    def advance(self, timestamp: float):
+        """Setzt die Uhr auf timestamp (Unix-Timestamp), rückwärts läuft sie nie."""
+        if timestamp > self._wall:
+            self._wall = timestamp
+        while len(self._waiters) > 0 and self._waiters[0][0] <= self._wall:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._wall + seconds, next(self._counter), future))
+        await future
@@ -5,7 +5,8 @@ import voluptuous as vol
 import asyncio
 import yaml
 import os
-from .const import DOMAIN, DEFAULT_POLLING_YAML
+import re
+from .const import DOMAIN, DEFAULT_POLLING_YAML, DEFAULT_SNAPSHOT_MAX_AGE, PACKET_LOG_FORMAT_TEXT, PACKET_LOG_FORMAT_BINARY
 
 CONFIG_SCHEMA = vol.Schema({
                     vol.Required("ip", default="192.168.2.200"): str,
@@ -24,6 +25,45 @@ CONFIG_SCHEMA = vol.Schema({
                     vol.Required("diagnostic_logs", default=False): bool,
                 })
 
+POLLING_TIME_KEYS = ("schedule", "freshness", "min_interval", "max_interval")
+TIME_STRING = re.compile(r'^(\d+)([smh])$', re.IGNORECASE)
+
+def _seconds(value) -> int | None:
+    match = TIME_STRING.match(f"{value}".strip())
+    if not match:
+        return None
+    return int(match.group(1)) * {"s": 1, "m": 60, "h": 3600}[match.group(2).lower()]
+
+def validate_polling_yaml(polling_yaml: str) -> str | None:
+    """Prüft die polling_yaml so, wie der PollScheduler sie liest. Liefert den Fehlerschlüssel oder None."""
+    try:
+        config = yaml.safe_load(polling_yaml)
+    except Exception:
+        return "invalid_yaml"
+    if config is None:
+        return None
+    if not isinstance(config, dict) or not isinstance(config.get("fetch_interval") or [], list) or not isinstance(config.get("groups") or {}, dict):
+        return "invalid_yaml"
+
+    for poller in config.get("fetch_interval") or []:
+        if not isinstance(poller, dict) or "name" not in poller or not isinstance(poller.get("overrides") or {}, dict):
+            return "invalid_yaml"
+        if poller.get("enable", False) and not poller.get("schedule"):
+            return "invalid_polling_time"
+        overrides = list((poller.get("overrides") or {}).values())
+        if not all(isinstance(override or {}, dict) for override in overrides):
+            return "invalid_yaml"
+        for entry in [poller] + [override or {} for override in overrides]:
+            seconds = {key: _seconds(entry[key]) for key in POLLING_TIME_KEYS if entry.get(key)}
+            if None in seconds.values() or seconds.get("schedule") == 0 or seconds.get("min_interval") == 0:
+                return "invalid_polling_time"
+        # ein max_interval der Gruppe wird im Scheduler angehoben, ein explizites der Adresse nicht
+        group_min = _seconds(poller.get("min_interval") or poller.get("schedule") or "0s")
+        for override in overrides:
+            if (override or {}).get("max_interval") and _seconds(override["max_interval"]) < (_seconds(override["min_interval"]) if override.get("min_interval") else group_min):
+                return "invalid_polling_time"
+    return None
+
 async def test_connection(ip, port) -> bool:
     try:
         reader, writer = await asyncio.open_connection(ip, port)
@@ -112,6 +152,8 @@ class EHSSentinelOptionsFlowHandler(config_entries.OptionsFlow):
         self._extended_logging = config_entry.options.get("extended_logging", config_entry.data.get("extended_logging", False))
         self._force_refresh = config_entry.options.get("force_refresh", config_entry.data.get("force_refresh", False))
         self._diagnostic_logs = config_entry.options.get("diagnostic_logs", config_entry.data.get("diagnostic_logs", False))
+        self._snapshot_max_age = config_entry.options.get("snapshot_max_age", config_entry.data.get("snapshot_max_age", DEFAULT_SNAPSHOT_MAX_AGE))
+        self._packet_log_format = config_entry.options.get("packet_log_format", config_entry.data.get("packet_log_format", PACKET_LOG_FORMAT_TEXT))
 
     async def async_step_init(self, user_input=None):
         errors = {}
@@ -121,6 +163,8 @@ class EHSSentinelOptionsFlowHandler(config_entries.OptionsFlow):
         polling_enabled = self._polling_enabled
         force_refresh = self._force_refresh
         diagnostic_logs = self._diagnostic_logs
+        snapshot_max_age = self._snapshot_max_age
+        packet_log_format = self._packet_log_format
         if user_input is not None:
             extended_logging = user_input.get("extended_logging", extended_logging)
             if user_input.get("reset_defaults"):
@@ -129,17 +173,22 @@ class EHSSentinelOptionsFlowHandler(config_entries.OptionsFlow):
                 polling_enabled = False
                 force_refresh = False
                 diagnostic_logs = False
+                snapshot_max_age = DEFAULT_SNAPSHOT_MAX_AGE
+                packet_log_format = PACKET_LOG_FORMAT_TEXT
             else:
                 polling_yaml = user_input["polling_yaml"]
                 write_mode = user_input["write_mode"]
                 polling_enabled = user_input["polling"]
                 force_refresh = user_input["force_refresh"]
                 diagnostic_logs = user_input["diagnostic_logs"]
-            # YAML validieren
-            try:
-                yaml.safe_load(polling_yaml)
-            except Exception:
-                errors["polling_yaml"] = "invalid_yaml"
+                snapshot_max_age = user_input.get("snapshot_max_age", snapshot_max_age)
+                packet_log_format = user_input.get("packet_log_format", packet_log_format)
+            # YAML und Zeitangaben validieren, ungültige Werte würden erst im Scheduler auffallen
+            polling_error = validate_polling_yaml(polling_yaml)
+            if polling_error is not None:
+                errors["polling_yaml"] = polling_error
+            if not re.match(r'^\d+[smh]$', f"{snapshot_max_age}".strip(), re.IGNORECASE):
+                errors["snapshot_max_age"] = "invalid_time"
             if not errors:
                 return await self._update_and_reload({
                         "polling": polling_enabled,
@@ -149,6 +198,8 @@ class EHSSentinelOptionsFlowHandler(config_entries.OptionsFlow):
                         "polling_yaml": polling_yaml,
                         "force_refresh": force_refresh,
                         "diagnostic_logs": diagnostic_logs,
+                        "snapshot_max_age": snapshot_max_age,
+                        "packet_log_format": packet_log_format,
                     }, f"{self.ip}")
 
         return self.async_show_form(
@@ -165,12 +216,32 @@ class EHSSentinelOptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Required("extended_logging", default=extended_logging): bool,
                     vol.Required("force_refresh", default=force_refresh): bool,
                     vol.Required("diagnostic_logs", default=diagnostic_logs): bool,
+                    vol.Required("snapshot_max_age", default=snapshot_max_age): str,
+                    vol.Required("packet_log_format", default=packet_log_format): selector({
+                        "select": {
+                            "options": [PACKET_LOG_FORMAT_TEXT, PACKET_LOG_FORMAT_BINARY]
+                        }
+                    }),
                 }),
             errors=errors,
         )
     
     async def _update_and_reload(self, new_options: dict, title: str):
+        old_options = {
+            "write_mode": self._write_mode,
+            "extended_logging": self._extended_logging,
+            "force_refresh": self._force_refresh,
+            "diagnostic_logs": self._diagnostic_logs,
+            "snapshot_max_age": self._snapshot_max_age,
+            "packet_log_format": self._packet_log_format,
+        }
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
         self.hass.config_entries.async_update_entry(self.config_entry, options=new_options)
-        await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+
+        # Nur Polling geändert: Scheduler im laufenden Coordinator umkonfigurieren statt neu zu laden
+        if coordinator is not None and all(new_options[key] == value for key, value in old_options.items()):
+            coordinator.update_polling(new_options["polling"], new_options["polling_yaml"])
+        else:
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
         return self.async_create_entry(title=title, data=new_options)
     
\ No newline at end of file
@@ -6,23 +6,31 @@ PLATFORM_NUMBER = "number"
 PLATFORM_BINARY_SENSOR = "binary_sensor"
 PLATFORM_SELECT = "select"
 PLATFORM_OPTIONS = "options"
+DEFAULT_SNAPSHOT_MAX_AGE = "6h"
+PACKET_LOG_FORMAT_TEXT = "text"
+PACKET_LOG_FORMAT_BINARY = "binary"
 DEFAULT_POLLING_YAML = """
 fetch_interval: 
   - name: fsv10xx
     enable: true
     schedule: 30m
+    freshness: 15m
   - name: fsv20xx
     enable: true
     schedule: 30m
+    freshness: 15m
   - name: fsv30xx
     enable: true
     schedule: 30m
+    freshness: 15m
   - name: fsv40xx
     enable: true
     schedule: 30m
+    freshness: 15m
   - name: fsv50xx
     enable: true
     schedule: 30m
+    freshness: 15m
 groups:
   fsv10xx:
     - VAR_IN_FSV_1011
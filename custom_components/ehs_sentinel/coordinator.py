@@ -2,9 +2,8 @@ import logging
 import asyncio
 import re
 import socket
+import random
 import yaml
-import gzip
-import shutil
 from datetime import datetime
 import traceback
 
@@ -13,15 +12,20 @@ from homeassistant.helpers.entity import DeviceInfo
 
 from .message_processor import MessageProcessor
 from .message_producer import MessageProducer
-from .nasa_packet import NASAPacket, AddressClassEnum 
+from .poll_scheduler import PollScheduler
+from .clock import Clock
+from .value_snapshot import ValueSnapshot
+from .health_monitor import HealthMonitor, HEALTH_FAILED
+from .packet_logger import PacketLogger
+from .capture_ring import CaptureRing, dump_frames
+from .nasa_packet import NASAPacket, NASAChecksumError, AddressClassEnum, DataType
 from .sensor import EHSSentinelSensor
 from .number import EHSSentinelNumber
 from .switch import EHSSentinelSwitch
 from .binary_sensor import EHSSentinelBinarySensor
 from .select import EHSSentinelSelect
-from .const import DOMAIN, DEVICE_ID, PLATFORM_SENSOR, PLATFORM_NUMBER, PLATFORM_SWITCH, PLATFORM_BINARY_SENSOR, PLATFORM_SELECT
+from .const import DOMAIN, DEVICE_ID, PLATFORM_SENSOR, PLATFORM_NUMBER, PLATFORM_SWITCH, PLATFORM_BINARY_SENSOR, PLATFORM_SELECT, DEFAULT_SNAPSHOT_MAX_AGE, PACKET_LOG_FORMAT_TEXT, PACKET_LOG_FORMAT_BINARY
 from homeassistant.helpers.entity import async_generate_entity_id
-from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
 ENTITY_CLASS_MAP = {
@@ -37,12 +41,21 @@ _LOGGER = logging.getLogger(__name__)
 EHS_PACKET_WORKERS = 5  # Anzahl paralleler Packet-Worker, anpassbar
 EHS_PACKET_QUEUE_MAXSIZE = 100  # Maximale Queue-Größe
 EHS_PACKET_QUEUE_WARN_THRESHOLD = 0.8  # 80% Warnschwelle
+EHS_RECONNECT_BASE_DELAY = 1  # erste Wartezeit in Sekunden nach einem fehlgeschlagenen Verbindungsversuch
+EHS_RECONNECT_MAX_DELAY = 60  # obere Grenze für das exponentielle Reconnect-Backoff
+EHS_HEALTH_WINDOW = 30  # Länge eines Auswertungsfensters der Verbindungsüberwachung in Sekunden
+EHS_SNAPSHOT_SAVE_INTERVAL = 600  # Sekunden zwischen zwei Speicherungen des Werte-Snapshots
+EHS_SNAPSHOT_REFRESH_DELAY = 5  # Pause in Sekunden zwischen zwei Read-Paketen beim Nachlesen veralteter Werte
+EHS_CAPTURE_RING_SIZE = 2048  # Anzahl der letzten Rohframes im Ringpuffer
+EHS_CAPTURE_DUMP_COOLDOWN = 300  # Sekunden, bevor derselbe Anlass den Ringpuffer erneut ausschreibt
+EHS_CAPTURE_DUMP_KEEP = 10  # Anzahl aufbewahrter capture_*.ehscap Dateien
 
 class EHSSentinelCoordinator(DataUpdateCoordinator):
     """Coordinator für EHS Sentinel, verwaltet Daten und Entitäten."""
 
-    def __init__(self, hass, config_dict, nasa_repo):
+    def __init__(self, hass, config_dict, nasa_repo, clock: Clock = None):
         super().__init__(hass, _LOGGER, name="EHS Sentinel Coordinator")
+        self.clock = clock or Clock()
         self.ip = config_dict['ip']
         self.port = config_dict['port']
         self.writemode = config_dict['write_mode']
@@ -53,20 +66,37 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
         self.indoor_address = None
         self.outdoor_address = None
         self.force_refresh = config_dict['force_refresh']
+        self.snapshot_max_age = self.parse_time_string(config_dict.get('snapshot_max_age') or DEFAULT_SNAPSHOT_MAX_AGE)
+        self.packet_log_format = config_dict.get('packet_log_format') or PACKET_LOG_FORMAT_TEXT
         self.nasa_repo = nasa_repo
         self.processor = MessageProcessor(hass, self)
         self.producer = MessageProducer(hass, self)
         self.running = True
         self.data = {}
         self._packet_logger = None
+        self.capture_ring = CaptureRing(EHS_CAPTURE_RING_SIZE)
+        self._capture_dumped_at = {}
         self._data_lock = asyncio.Lock()
         self._entity_adders = {}
         self._write_confirmations = {}
         self._read_confirmations = {}
+        self._ack_confirmations = {}
         self._diagnostic_task = None
         self._tcp_read_task = None
         self._tcp_write_task = None
-        self._tcp_polling_tasks = {}
+        self._startup_complete = False
+        self.health = HealthMonitor()
+        self._health_task = None
+        self._reconnect_failures = 0
+        self.reconnects = 0
+        self._last_seen = {}
+        self.snapshot = ValueSnapshot(hass, self.clock)
+        self._snapshot_task = None
+        self._started_at = self.clock.monotonic()
+        self._unpopulated = set(self._writable_entities())
+        self._last_populated_at = None
+        self._poll_scheduler = PollScheduler(self, self.clock)
+        self._poll_scheduler.configure(self.polling_yaml if self.polling else None)
         self._packet_queue = asyncio.Queue(maxsize=EHS_PACKET_QUEUE_MAXSIZE)
         self._packet_workers = []
         self.stats = {
@@ -74,9 +104,11 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
             "packets_processed": 0,
             "packets_processed_not_indoor_outdoor": 0,
             "packets_requested": 0,
+            "polls_sent": 0,
+            "polls_saved": 0,
         }
         self._stats_lock = asyncio.Lock()
-        _LOGGER.info(f"Initialized EHSSentinelCoordinator with IP: {self.ip}, Port: {self.port}, Write Mode: {self.writemode}, Polling: {self.polling}, extended_logging: {self.extended_logging}, Force Refresh: {self.force_refresh}")
+        _LOGGER.info("Initialized EHSSentinelCoordinator with IP: %s, Port: %s, Write Mode: %s, Polling: %s, extended_logging: %s, Force Refresh: %s", self.ip, self.port, self.writemode, self.polling, self.extended_logging, self.force_refresh)
         # Vorinitialisiere coordinator.data mit allen bekannten Einträgen aus nasa_repo die mit NASA_EHSSENTINEL_ beginnen,
         # damit Plattform-Setups beim Start Entities anlegen können.
         # Erwartet: nasa_repo[key]['hass_opts']['platform'] enthält PLATFORM_* oder ähnliches.
@@ -85,7 +117,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                 hass_opts = meta.get("hass_opts", {})
                 platform = hass_opts.get("platform", {}).get("type")
                 if self.extended_logging:
-                    _LOGGER.info(f"Pre-initializing entity for key: {key} with meta: {meta}")
+                    _LOGGER.info("Pre-initializing entity for key: %s with meta: %s", key, meta)
                 if platform is None or hass_opts.get("writable") is False:
                     platform = hass_opts.get("default_platform", None)
 
@@ -117,7 +149,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
         
         if event is not None and event_value is not None:
             if event_value == value:
-                _LOGGER.info(f"Confirming write for {msgname} with value: {value}, target value was: {event_value}")
+                _LOGGER.info("Confirming write for %s with value: %s, target value was: %s", msgname, value, event_value)
                 event.set()
                 del self._write_confirmations[msgname]
     
@@ -132,6 +164,86 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
             event.set()
             del self._read_confirmations[msgname]
 
+    def create_ack_confirmation(self, packet_number):
+        future = asyncio.get_running_loop().create_future()
+        self._ack_confirmations[packet_number] = future
+        return future
+
+    def confirm_ack(self, packet_number, acked: bool):
+        future = self._ack_confirmations.pop(packet_number, None)
+        if future is None:
+            if self.producer is not None:
+                self.producer.on_unawaited_ack(packet_number)
+            return
+        if not future.done():
+            if self.extended_logging:
+                _LOGGER.info("Received %s for packet number %s", 'Ack' if acked else 'Nack', packet_number)
+            future.set_result(acked)
+
+    def mark_seen(self, msgname, value=None):
+        """Merkt sich, wann eine Nachricht zuletzt auf dem Bus gesehen wurde."""
+        self._last_seen[msgname] = self.clock.monotonic()
+        self._poll_scheduler.observe(msgname, value)
+        self.snapshot.update(msgname, value)
+        self._mark_populated(msgname)
+
+    def _mark_populated(self, msgname):
+        if msgname in self._unpopulated:
+            self._unpopulated.discard(msgname)
+            self._last_populated_at = self.clock.monotonic()
+            if len(self._unpopulated) == 0:
+                _LOGGER.info("All writable entities populated after %.1fs", self._last_populated_at - self._started_at)
+
+    async def async_restore_snapshot(self):
+        """Lädt den Werte-Snapshot und übernimmt die Werte, damit Entities sofort einen Zustand haben."""
+        count = await self.snapshot.async_load()
+        now = self.clock.monotonic()
+        restored = 0
+        for msgname, (value, ts) in self.snapshot.values.items():
+            if msgname not in self.nasa_repo:
+                continue
+            try:
+                platform = self.processor._get_platform(msgname)
+            except KeyError:
+                continue
+            self.data.setdefault(platform, {}).setdefault(self.processor._normalize_name(msgname), {}).update({
+                "value": self.processor._normalize_value(value),
+                "nasa_name": msgname,
+                # der MessageProcessor entscheidet damit, ob ein wiederhergestellter Tageswert noch von heute ist
+                "nasa_last_seen": datetime.fromtimestamp(ts).isoformat(timespec="seconds"),
+            })
+            # Alter aus dem Snapshot übernehmen, damit die Freshness-Prüfung beim Polling greift
+            self._last_seen[msgname] = now - self.snapshot.age(msgname)
+            self._mark_populated(msgname)
+            restored += 1
+        _LOGGER.info("Restored %s of %s values from snapshot", restored, count)
+        return restored
+
+    async def _health_loop(self):
+        while self.running:
+            await self.clock.sleep(EHS_HEALTH_WINDOW)
+            previous = self.health.state
+            state = self.health.evaluate(self.clock.monotonic())
+            if state != previous:
+                _LOGGER.info("Connection health changed from %s to %s %s", previous, state, self.health.reasons)
+                await self.processor.protocol_message("NASA_EHSSENTINEL_CONNECTION_HEALTH", state)
+            if state == HEALTH_FAILED and self.producer.writer is not None:
+                # Verbindung schließen, _tcp_read endet und _tcp_loop verbindet neu
+                _LOGGER.warning("Valid frame throughput collapsed (%s), reconnecting", self.health.reasons)
+                self.producer.writer.close()
+
+    async def _snapshot_loop(self):
+        while self.running:
+            await self.clock.sleep(EHS_SNAPSHOT_SAVE_INTERVAL)
+            await self.snapshot.async_save()
+
+    def is_fresh(self, msgname, max_age) -> bool:
+        """Prüft, ob eine Nachricht innerhalb der letzten max_age Sekunden gesehen wurde."""
+        last_seen = self._last_seen.get(msgname)
+        if last_seen is None or max_age <= 0:
+            return False
+        return self.clock.monotonic() - last_seen < max_age
+
     def device_info(self) -> DeviceInfo:
         return DeviceInfo(
             identifiers = {("samsung_ehssentinel",)},
@@ -143,7 +255,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
     
     def register_entity_adder(self, category, adder):
         self._entity_adders[category] = adder
-        _LOGGER.debug(f"Entity adder registered: {self._entity_adders}")
+        _LOGGER.debug("Entity adder registered: %s", self._entity_adders)
 
     async def update_data_safe(self, parsed):
         async with self._data_lock:
@@ -181,6 +293,9 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
         _LOGGER.info("Starting EHS Sentinel Coordinator..")
         self._packet_logger = await self.setup_packet_logger()
         self._tcp_task = asyncio.create_task(self._tcp_loop())
+        self._poll_scheduler.start()
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop(), name="EHSSentinelCoordinator.snapshot")
+        self._health_task = asyncio.create_task(self._health_loop(), name="EHSSentinelCoordinator.health")
         if self.diagnostic_logs:
             try:
                 if self._diagnostic_task is None:
@@ -202,12 +317,20 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
             except asyncio.CancelledError:
                 _LOGGER.info("TCP task cancelled")
 
-        for poller_name, task in self._tcp_polling_tasks.items():
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                _LOGGER.info("Polling task cancelled")
+        await self._poll_scheduler.stop()
+
+        for task in (self._snapshot_task, self._health_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self.snapshot.async_save()
+
+        if self._packet_logger:
+            await self.hass.async_add_executor_job(self._packet_logger.stop)
+            self._packet_logger = None
         
         if self._diagnostic_task:
             self._diagnostic_task.cancel()
@@ -232,57 +355,47 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
 
     async def setup_packet_logger(self):
         return await self.hass.async_add_executor_job(self._setup_packet_logger_sync)
-    
-    async def _log_packet(self, message: str):
-        if self._packet_logger:
-            await self.hass.async_add_executor_job(
-                self._packet_logger.info, message
-            )
-    
-    def _setup_packet_logger_sync(self):
-        log_dir = Path(
-            self.hass.config.path("www", DOMAIN, "logs")
-        )
-        log_dir.mkdir(parents=True, exist_ok=True)
-
-        logger = logging.getLogger(f"{DOMAIN}.packet_logger")
-        logger.setLevel(logging.INFO)
-        logger.propagate = False # Verhindert doppelte Logs
-
-        handler = TimedRotatingFileHandler(
-            log_dir / "packet.log",
-            when="midnight",
-            interval=1,
-            backupCount=3,
-            encoding="utf-8",
-        )
 
-        handler.setFormatter(
-            logging.Formatter(
-                "[%(asctime)s.%(msecs)03d] %(message)s",
-                datefmt="%Y-%m-%d, %H:%M:%S",
-            )
-        )
-
-        
-        def namer(name):
-            return name + ".gz"
-
-        def rotator(source, dest):
-            with open(source, "rb") as f_in:
-                with gzip.open(dest, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            Path(source).unlink()  # Original löschen
-
-        handler.namer = namer
-        handler.rotator = rotator
-
-        logger.addHandler(handler)
-        return logger
+    def _setup_packet_logger_sync(self):
+        binary = self.packet_log_format == PACKET_LOG_FORMAT_BINARY
+        packet_logger = PacketLogger(Path(self.hass.config.path("www", DOMAIN, "logs")) / ("packet.ehscap" if binary else "packet.log"), binary=binary)
+        packet_logger.start()
+        return packet_logger
+
+    async def dump_capture(self, reason: str, force: bool = False):
+        """Schreibt den Ringpuffer nach www/ehs_sentinel/logs/capture_<reason>_<zeit>.ehscap, je Anlass höchstens alle EHS_CAPTURE_DUMP_COOLDOWN Sekunden."""
+        now = self.clock.monotonic()
+        last = self._capture_dumped_at.get(reason)
+        if not force and last is not None and now - last < EHS_CAPTURE_DUMP_COOLDOWN:
+            return None
+        self._capture_dumped_at[reason] = now
+        frames = self.capture_ring.snapshot()
+        path = Path(self.hass.config.path("www", DOMAIN, "logs")) / f"capture_{reason}_{datetime.fromtimestamp(self.clock.time()):%Y%m%d_%H%M%S}.ehscap"
+        try:
+            await self.hass.async_add_executor_job(self._dump_capture_sync, frames, path)
+        except Exception:
+            _LOGGER.exception("Error while writing packet capture %s", path)
+            return None
+        _LOGGER.warning("Wrote last %s packets to %s (%s)", len(frames), path, reason)
+        return path
+
+    def _dump_capture_sync(self, frames: list, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        dump_frames(frames, path)
+        for old in sorted(path.parent.glob("capture_*.ehscap"), key=lambda p: p.stat().st_mtime)[:-EHS_CAPTURE_DUMP_KEEP]:
+            old.unlink(missing_ok=True)
+
+    def _reconnect_delay(self) -> float:
+        """Wartezeit vor dem nächsten Verbindungsversuch, exponentiell wachsend mit Jitter."""
+        if self._reconnect_failures == 0:
+            return 0
+        delay = min(EHS_RECONNECT_BASE_DELAY * 2 ** (self._reconnect_failures - 1), EHS_RECONNECT_MAX_DELAY)
+        return delay / 2 + random.uniform(0, delay / 2)
 
     async def _tcp_loop(self):
         writer = None
         while self.running:
+            valid_before = self.health.valid_frames
             try:
                 _LOGGER.info("Attempting to connect to TCP device...")
                 reader, writer = await asyncio.open_connection(self.ip, self.port)
@@ -300,6 +413,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                         pass  # TCP_KEEPIDLE/INTVL/CNT not available on this platform
 
                 self.producer.set_writer(writer)
+                self.health.reset(self.clock.monotonic())
                 self._tcp_read_task = asyncio.create_task(self._tcp_read(reader))
                 self._tcp_write_task = asyncio.create_task(self._tcp_write())
 
@@ -315,16 +429,17 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                     except asyncio.CancelledError:
                         pass
             except (ConnectionRefusedError, ConnectionResetError, OSError) as e:
-                _LOGGER.error(f"TCP connection failed or lost: {e}")
-                await asyncio.sleep(5)  # wait before reconnect
+                _LOGGER.error("TCP connection failed or lost: %s", e)
             except asyncio.CancelledError:
                 _LOGGER.info("TCP loop cancelled")
                 break
             except Exception as e:
-                _LOGGER.error(f"Unexpected error in TCP loop: {e}")
+                _LOGGER.error("Unexpected error in TCP loop: %s", e)
                 _LOGGER.error(traceback.format_exc())
-                await asyncio.sleep(5)
             finally:
+                # Polling bis zur nächsten Verbindung anhalten, Adressen und Werte bleiben erhalten
+                self._poll_scheduler.pause()
+                self.producer.set_writer(None)
                 # Always close the writer so we don't leak sockets or leave
                 # zombie clients on the bridge side.
                 if writer is not None:
@@ -335,11 +450,28 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                         pass
                     writer = None
 
+            if not self.running:
+                break
+            # Verbindung hat gültige Daten geliefert: sofort neu verbinden, sonst exponentiell länger warten
+            if self.health.valid_frames > valid_before:
+                self._reconnect_failures = 0
+            delay = self._reconnect_delay()
+            self._reconnect_failures += 1
+            self.reconnects += 1
+            _LOGGER.info("Reconnecting in %.1fs (attempt %s)", delay, self._reconnect_failures)
+            await asyncio.sleep(delay)
+
         _LOGGER.info("TCP loop finished")
 
     async def _tcp_write(self):
         _LOGGER.info("Starting TCP write task")
         try:
+            if self._startup_complete and self.indoor_address is not None and self.outdoor_address is not None:
+                # Reconnect: Adressen und Werte sind bekannt, Startsequenz überspringen und Polling fortsetzen
+                _LOGGER.info("Reconnected, resuming polling")
+                self._poll_scheduler.resume()
+                return
+
             await asyncio.sleep(10)  # Initial delay before sending first request
 
             if self.indoor_address is None or self.outdoor_address is None:
@@ -352,70 +484,85 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                         _LOGGER.warning("Auto-detection of Indoor/Outdoor Unit Addresses timed out after 60 seconds.")
                         break
 
-            if self.writemode:
+            if self.writemode and len(self.snapshot.values) > 0:
+                # Werte kommen aus dem Snapshot, Polling sofort starten und nur veraltete Werte nachlesen
+                self._poll_scheduler.resume()
+                await self.refresh_stale_entities()
+            elif self.writemode:
                 await self.request_all_writable_entities() # Request all writable entities
                 await asyncio.sleep(300) # wait longer, all fsv are polled here, so we have most data available
             else:
                 await asyncio.sleep(20) # Wait for initial data to be processed
 
-            if self.polling:
-                for poller in self.polling_yaml['fetch_interval']:
-                    if poller['enable']:
-                        poller_name = poller['name']
-                        # Starte pro Poller nur einen Task, falls nicht schon laufend
-                        if poller_name not in self._tcp_polling_tasks or self._tcp_polling_tasks[poller_name].done():
-                            await asyncio.sleep(1)
-                            task = asyncio.create_task(self.make_default_request_packet(poller=poller))
-                            self._tcp_polling_tasks[poller_name] = task
+            # Scheduler immer fortsetzen, ohne aktive Gruppen wartet er nur auf neue Optionen
+            self._startup_complete = True
+            self._poll_scheduler.resume()
         except asyncio.CancelledError:
             _LOGGER.info("TCP write task cancelled")
         except Exception as e:
             _LOGGER.error("Unexpected error in TCP write task")
-            _LOGGER.error(f"{e}")
+            _LOGGER.error("%s", e)
             _LOGGER.error(traceback.format_exc())
 
+    def _writable_entities(self) -> list:
+        if not self.writemode or not self.nasa_repo:
+            return []
+        return [entity for entity in self.nasa_repo if self.nasa_repo[entity]['hass_opts']['writable']]
+
+    async def refresh_stale_entities(self):
+        """Liest writable Entities nach, die im Snapshot fehlen oder älter als snapshot_max_age sind, mit niedriger Priorität."""
+        entities = self._writable_entities()
+        stale = [entity for entity in entities if self.snapshot.age(entity) is None or self.snapshot.age(entity) > self.snapshot_max_age]
+        _LOGGER.info("Refreshing %s of %s writable entities older than %ss", len(stale), len(entities), self.snapshot_max_age)
+
+        chunksize = self.producer._CHUNKSIZE
+        for i in range(0, len(stale), chunksize):
+            try:
+                await self.producer.read_request(stale[i:i + chunksize], retry_mode=True)
+                await self._inc_stat("packets_requested", len(stale[i:i + chunksize]))
+            except (ConnectionResetError, BrokenPipeError, OSError) as e:
+                _LOGGER.warning("TCP connection lost while refreshing stale entities: %s", e)
+                return
+            except Exception as e:
+                _LOGGER.error("Unexpected error while refreshing stale entities: %s", e)
+                _LOGGER.error(traceback.format_exc())
+            # Pausen zwischen den Paketen, damit Polls und Schreibvorgänge Vorrang haben
+            await self.clock.sleep(EHS_SNAPSHOT_REFRESH_DELAY)
+
+        _LOGGER.info("Refreshing stale entities completed")
+
     async def request_all_writable_entities(self):
         _LOGGER.info("Requesting all writable entities")
-        entities = []
-        for entity in self.nasa_repo:
-            if self.nasa_repo[entity]['hass_opts']['writable'] and self.writemode:
-                _LOGGER.debug(f"Requesting writable entity: {entity}")
-                entities.append(entity)
+        entities = self._writable_entities()
 
         if len(entities) > 0:
             try:
                 await self.producer.read_request(entities, retry_mode=True)
                 await self._inc_stat("packets_requested", len(entities))
             except (ConnectionResetError, BrokenPipeError, OSError) as e:
-                _LOGGER.warning(f"TCP connection lost while requesting writable entities: {e}")
+                _LOGGER.warning("TCP connection lost while requesting writable entities: %s", e)
             except Exception as e:
-                _LOGGER.error(f"Unexpected error while requesting writable entities: {e}")
+                _LOGGER.error("Unexpected error while requesting writable entities: %s", e)
                 _LOGGER.error(traceback.format_exc())
         
         _LOGGER.info("Requesting all writable entities completed")
                     
-    async def make_default_request_packet(self, poller):
-        schedule_seconds = self.parse_time_string(poller['schedule'])
-        _LOGGER.info(f"Setting up Poller {poller['name']} every {schedule_seconds} seconds")
-        message_list = self.polling_yaml['groups'].get(poller['name'], [])
-
-        try:
-            while self.running:
-                try:
-                    await self.producer.read_request(message_list, retry_mode=True)
-                    await self._inc_stat("packets_requested")
-                except (ConnectionResetError, BrokenPipeError, OSError) as e:
-                    _LOGGER.warning(f"Polling '{poller['name']}': TCP connection lost: {e}")
-                    break  # raus aus Poller Task – wird neu gestartet vom Reconnect-Loop
-                except Exception as e:
-                    _LOGGER.error(f"Polling '{poller['name']}': Unexpected error")
-                    _LOGGER.error(f"Error: {e}")
-                    _LOGGER.error(traceback.format_exc())
-
-                await asyncio.sleep(schedule_seconds)
-                _LOGGER.debug(f"Refreshed Poller {poller['name']}")
-        except asyncio.CancelledError:
-            _LOGGER.info(f"Polling '{poller['name']}' task cancelled")
+    def update_polling(self, polling: bool, polling_yaml: str):
+        """Übernimmt geänderte Polling-Optionen im laufenden Scheduler, ohne Tasks neu zu starten."""
+        self.polling = polling
+        self.polling_yaml = yaml.safe_load(polling_yaml)
+        self._poll_scheduler.configure(self.polling_yaml if self.polling else None)
+        _LOGGER.info("Polling options updated: Polling: %s", self.polling)
+
+    async def poll_group(self, name, message_list, freshness_seconds=0):
+        # Werte, die kürzlich unaufgefordert auf dem Bus gesehen wurden, nicht erneut abfragen
+        stale_messages = [msg for msg in message_list if not self.is_fresh(msg, freshness_seconds)]
+        await self._inc_stat("polls_saved", len(message_list) - len(stale_messages))
+        if len(stale_messages) > 0:
+            await self.producer.read_request(stale_messages, retry_mode=True)
+            await self._inc_stat("packets_requested")
+            await self._inc_stat("polls_sent", len(stale_messages))
+        _LOGGER.debug("Refreshed Poller %s", name)
 
     def parse_time_string(self, time_str: str) -> int:
         match = re.match(r'^(\d+)([smh])$', time_str.strip(), re.IGNORECASE)
@@ -460,6 +607,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                             if current_byte == b'\x34':
                                 asyncio.create_task(self.process_buffer(data))
                             else:
+                                self.health.frame_invalid()
                                 _LOGGER.debug("Packet does not end properly, skip it...")
 
                             data = bytearray()
@@ -474,7 +622,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
         except asyncio.CancelledError:
             _LOGGER.info("TCP read task cancelled")
         except Exception as e:
-            _LOGGER.error(f"Error in TCP read loop: {e}")
+            _LOGGER.error("Error in TCP read loop: %s", e)
             _LOGGER.error(traceback.format_exc())
 
             #await asyncio.sleep(0.01)  # Short break to reduce CPU load
@@ -504,32 +652,44 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                         # Queue-Überwachung
                         qsize = self._packet_queue.qsize()
                         if qsize >= EHS_PACKET_QUEUE_MAXSIZE * EHS_PACKET_QUEUE_WARN_THRESHOLD:
-                            _LOGGER.warning(f"Packet-Queue zu {qsize}/{EHS_PACKET_QUEUE_MAXSIZE} belegt!")
+                            _LOGGER.warning("Packet-Queue zu %s/%s belegt!", qsize, EHS_PACKET_QUEUE_MAXSIZE)
                         if qsize >= EHS_PACKET_QUEUE_MAXSIZE:
                             _LOGGER.error("Packet-Queue voll, Packet verworfen!")
                             return 
                         await self._packet_queue.put(buffer[i:])
                     else:
-                        _LOGGER.debug(f"Packet too short, skip processing: {len(buffer)}")
+                        _LOGGER.debug("Packet too short, skip processing: %s", len(buffer))
                     break
 
     async def process_packet(self, buffer):
+        self.capture_ring.add(buffer)
         try:
             nasa_packet = NASAPacket()
-            nasa_packet.parse(buffer)
-            _LOGGER.debug(f"Received Packet: {nasa_packet}")
+            try:
+                nasa_packet.parse(buffer)
+            except NASAChecksumError:
+                self.health.frame_crc_error()
+                raise
+            except Exception:
+                self.health.frame_invalid()
+                raise
+            self.health.frame_valid(nasa_packet.packet_source_address_class.name)
+            _LOGGER.debug("Received Packet: %s", nasa_packet)
             if nasa_packet.packet_source_address_class in (AddressClassEnum.Outdoor, AddressClassEnum.Indoor):
                 if self.indoor_address is None and nasa_packet.packet_source_address_class == AddressClassEnum.Indoor:
                     self.indoor_address = {'class': nasa_packet.packet_source_address_class.value, 'channel': nasa_packet.packet_source_channel, 'address': nasa_packet.packet_source_address}
-                    _LOGGER.info(f"Auto-detected Indoor Unit Address: {self.indoor_address['class']:02X}.{self.indoor_address['channel']:02X}.{self.indoor_address['address']:02X}")
+                    _LOGGER.info("Auto-detected Indoor Unit Address: %02X.%02X.%02X", self.indoor_address['class'], self.indoor_address['channel'], self.indoor_address['address'])
                 if self.outdoor_address is None and nasa_packet.packet_source_address_class == AddressClassEnum.Outdoor:
                     self.outdoor_address = {'class': nasa_packet.packet_source_address_class.value, 'channel': nasa_packet.packet_source_channel, 'address': nasa_packet.packet_source_address}
-                    _LOGGER.info(f"Auto-detected Outdoor Unit Address: {self.outdoor_address['class']:02X}.{self.outdoor_address['channel']:02X}.{self.outdoor_address['address']:02X}")
+                    _LOGGER.info("Auto-detected Outdoor Unit Address: %02X.%02X.%02X", self.outdoor_address['class'], self.outdoor_address['channel'], self.outdoor_address['address'])
                 
                 # Schreibe Packet logs
-                await self._log_packet(
-                        " ".join(f"{b:02X}" for b in buffer)
-                    )
+                if self._packet_logger:
+                    self._packet_logger.log(buffer)
+
+                # Quittungen auf eigene Schreibanfragen über die Paketnummer zuordnen
+                if nasa_packet.packet_data_type in (DataType.Ack, DataType.Nack) and nasa_packet.packet_dest_address_class == AddressClassEnum.JIGTester:
+                    self.confirm_ack(nasa_packet.packet_number, nasa_packet.packet_data_type == DataType.Ack)
 
                 # verarbeite die Nachricht
                 await self.processor.process_message(nasa_packet)
@@ -539,16 +699,20 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                 if( nasa_packet.packet_source_address_class == AddressClassEnum.WiFiKit and all([tmpmsg.packet_message==0 for tmpmsg in nasa_packet.packet_messages])):
                     pass
                 else:
-                    _LOGGER.info(f"[extended_logging] Packet from {nasa_packet.packet_source_address_class} \n {nasa_packet}")
+                    _LOGGER.info("[extended_logging] Packet from %s \n %s", nasa_packet.packet_source_address_class, nasa_packet)
+                    # einzeilige Form zusätzlich nur mit Debug-Logging, z.B. zum Greppen über viele Pakete
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug("[extended_logging] %s", nasa_packet.compact())
             else:
                 await self._inc_stat("packets_processed_not_indoor_outdoor")
-                _LOGGER.debug(f"Packet not from Outdoor/Indoor Unit: {nasa_packet}")
+                _LOGGER.debug("Packet not from Outdoor/Indoor Unit: %s", nasa_packet)
             await self._inc_stat("packets_processed")
         except Exception as e:
             if self.extended_logging:
-                _LOGGER.warning(f"Error while processing the Packet: {e}")
-                _LOGGER.warning(f"                  Complete Packet: {[hex(x) for x in buffer]}")
+                _LOGGER.warning("Error while processing the Packet: %s", e)
+                _LOGGER.warning("                  Complete Packet: %s", [hex(x) for x in buffer])
                 _LOGGER.warning(traceback.format_exc())
+            await self.dump_capture("packet_error")
 
     def is_valid_rawvalue(self, rawvalue: bytes) -> bool:
         return all(0x20 <= b <= 0x7E or b in (0x00, 0xFF) for b in rawvalue)
@@ -568,7 +732,8 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
             else:
                 value = "".join([f"{int(x)}" for x in rawvalue])
 
-            logging.debug(f"Received String Message: {msgname} with raw value: {rawvalue}/{rawvalue.hex()}/{value}")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Received String Message: %s with raw value: %s/%s/%s", msgname, rawvalue, rawvalue.hex(), value)
         else:
             if 'arithmetic' in nasa_repo[msgname]:
                 arithmetic = nasa_repo[msgname]['arithmetic'].replace("value", 'packed_value')
@@ -617,7 +782,7 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                 total,
                 top,
             )
-            _LOGGER.info(f"[EHS-Sentinel Diagnostics] Current Packet Queue Size: {self._packet_queue.qsize()}")
+            _LOGGER.info("[EHS-Sentinel Diagnostics] Current Packet Queue Size: %s", self._packet_queue.qsize())
             async with self._stats_lock:
                 stats_snapshot = dict(self.stats)
             _LOGGER.info(
@@ -627,5 +792,45 @@ class EHSSentinelCoordinator(DataUpdateCoordinator):
                 stats_snapshot["packets_processed_not_indoor_outdoor"],
                 stats_snapshot["packets_requested"],
             )
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] PollCounters: sent=%s saved=%s",
+                stats_snapshot["polls_sent"],
+                stats_snapshot["polls_saved"],
+            )
+            writable_total = len(self._writable_entities())
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] Populated: %s/%s writable entities, last after %s s, snapshot values=%s",
+                writable_total - len(self._unpopulated),
+                writable_total,
+                round(self._last_populated_at - self._started_at, 1) if self._last_populated_at is not None else None,
+                len(self.snapshot.values),
+            )
+            if self._packet_logger:
+                _LOGGER.info(
+                    "[EHS-Sentinel Diagnostics] PacketLogger: %s",
+                    self._packet_logger.stats(),
+                )
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] CaptureRing: frames=%s/%s total=%s truncated=%s",
+                len(self.capture_ring),
+                self.capture_ring.capacity,
+                self.capture_ring.total,
+                self.capture_ring.truncated,
+            )
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] ConnectionHealth: %s",
+                self.health.as_dict(),
+            )
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] ResponseTimes: %s",
+                self.producer.rtt.stats(),
+            )
+            now = self.clock.monotonic()
+            _LOGGER.info(
+                "[EHS-Sentinel Diagnostics] PollScheduler: paused=%s next_due=%s adaptive(min/avg/max)=%s",
+                self._poll_scheduler.paused,
+                {group.name: round(group.next_due - now) for group in self._poll_scheduler.groups.values()},
+                self._poll_scheduler.adaptive_summary(),
+            )
         except Exception:
             _LOGGER.exception("Error while collecting diagnostics")
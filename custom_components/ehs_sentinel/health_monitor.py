@@ -0,0 +1,135 @@
+HEALTH_STARTING = "starting"
+HEALTH_OK = "healthy"
+HEALTH_DEGRADED = "degraded"
+HEALTH_FAILED = "failed"
+
+
+class HealthMonitor:
+    """
+    Verbindungszustand aus Frame-Zählern.
+
+    Je Zeitfenster werden die Rate gültiger Frames, der Anteil an CRC-Fehlern und die Rate je Quelle
+    mit einer gelernten Baseline (EWMA über gesunde Fenster) verglichen. Gefüttert wird nur
+    pro Frame, nicht pro Byte.
+    """
+
+    ALPHA = 0.1
+    WARMUP_WINDOWS = 3
+    DEGRADED_RATIO = 0.5
+    FAILED_RATIO = 0.1
+    FAILED_WINDOWS = 2
+    CRC_DEGRADED_RATIO = 0.1
+    SOURCE_MIN_RATE = 0.05  # Quellen mit weniger Frames pro Sekunde werden nicht überwacht
+
+    def __init__(self):
+        self.state = HEALTH_STARTING
+        self.reasons = []
+        self.valid_frames = 0
+        self.crc_errors = 0
+        self.invalid_frames = 0
+        self.baseline = None
+        self.source_baseline = {}
+        self.last_rates = {}
+        self._windows = 0
+        self._failed_windows = 0
+        self._window_started = None
+        self._window_sources = {}
+        self._window_crc = 0
+        self._window_invalid = 0
+
+    def frame_valid(self, source: str):
+        self.valid_frames += 1
+        self._window_sources[source] = self._window_sources.get(source, 0) + 1
+
+    def frame_crc_error(self):
+        self.crc_errors += 1
+        self._window_crc += 1
+
+    def frame_invalid(self):
+        self.invalid_frames += 1
+        self._window_invalid += 1
+
+    def reset(self, now: float):
+        """Neues Fenster beginnen, z.B. nach einem Reconnect. Die gelernte Baseline bleibt erhalten."""
+        self._window_started = now
+        self._window_sources = {}
+        self._window_crc = 0
+        self._window_invalid = 0
+        self._failed_windows = 0
+
+    def evaluate(self, now: float) -> str:
+        """Schließt das aktuelle Fenster ab und bestimmt den Zustand."""
+        if self._window_started is None:
+            self.reset(now)
+            return self.state
+        duration = now - self._window_started
+        if duration <= 0:
+            return self.state
+
+        valid = sum(self._window_sources.values())
+        total = valid + self._window_crc + self._window_invalid
+        rate = valid / duration
+        crc_ratio = self._window_crc / total if total > 0 else 0.0
+        source_rates = {source: count / duration for source, count in self._window_sources.items()}
+        self.last_rates = {"valid": round(rate, 2), "crc_ratio": round(crc_ratio, 3), "sources": {k: round(v, 2) for k, v in source_rates.items()}}
+
+        state = HEALTH_OK
+        reasons = []
+        if total > 0 and valid == 0:
+            # nur noch Müll auf der Leitung, dafür braucht es keine Baseline
+            state = HEALTH_FAILED
+            reasons.append("no valid frames")
+        elif self.baseline is None or self._windows < self.WARMUP_WINDOWS:
+            state = HEALTH_STARTING
+        elif rate < self.baseline * self.FAILED_RATIO:
+            state = HEALTH_FAILED
+            reasons.append(f"valid frame rate {rate:.2f}/s, baseline {self.baseline:.2f}/s")
+        elif rate < self.baseline * self.DEGRADED_RATIO:
+            state = HEALTH_DEGRADED
+            reasons.append(f"valid frame rate {rate:.2f}/s, baseline {self.baseline:.2f}/s")
+
+        if crc_ratio > self.CRC_DEGRADED_RATIO and state in (HEALTH_OK, HEALTH_STARTING):
+            state = HEALTH_DEGRADED
+            reasons.append(f"crc error ratio {crc_ratio:.1%}")
+
+        if state == HEALTH_OK:
+            silent = [source for source, base in self.source_baseline.items() if base >= self.SOURCE_MIN_RATE and source_rates.get(source, 0) < base * self.FAILED_RATIO]
+            if len(silent) > 0:
+                state = HEALTH_DEGRADED
+                reasons.append(f"no frames from {', '.join(silent)}")
+
+        # Baseline nur aus unauffälligen Fenstern lernen
+        if state in (HEALTH_OK, HEALTH_STARTING) and valid > 0:
+            self.baseline = rate if self.baseline is None else (1 - self.ALPHA) * self.baseline + self.ALPHA * rate
+            for source in set(self.source_baseline) | set(source_rates):
+                current = source_rates.get(source, 0.0)
+                base = self.source_baseline.get(source)
+                self.source_baseline[source] = current if base is None else (1 - self.ALPHA) * base + self.ALPHA * current
+
+        # Ausfall erst nach mehreren Fenstern in Folge melden
+        if state == HEALTH_FAILED:
+            self._failed_windows += 1
+            if self._failed_windows < self.FAILED_WINDOWS:
+                state = HEALTH_DEGRADED
+        else:
+            self._failed_windows = 0
+
+        self._windows += 1
+        self.state = state
+        self.reasons = reasons
+        self._window_started = now
+        self._window_sources = {}
+        self._window_crc = 0
+        self._window_invalid = 0
+        return state
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "reasons": self.reasons,
+            "baseline": round(self.baseline, 2) if self.baseline is not None else None,
+            "last": self.last_rates,
+            "valid_frames": self.valid_frames,
+            "crc_errors": self.crc_errors,
+            "invalid_frames": self.invalid_frames,
+        }
@@ -2,6 +2,7 @@ import logging, traceback, random
 from datetime import datetime, timedelta
 from homeassistant.helpers.entity import Entity
 from .const import PLATFORM_SENSOR
+from .clock import Clock
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,12 +47,14 @@ DAILY_MESSAGES = ['NASA_EHSSENTINEL_DAILY_MINUTES_ACTIVE_DHW_MODE', 'NASA_EHSSEN
 class MessageProcessor:
     """Processes NASA packages and creates sensors in Home Assistant."""
 
-    def __init__(self, hass, coordinator):
+    def __init__(self, hass, coordinator, clock: Clock = None):
         self.hass = hass
         self.coordinator = coordinator
+        # Zeitquelle für Energie-Deltas und Tageswechsel, bei Replays die Zeit der Aufzeichnung
+        self.clock = clock or coordinator.clock
         self.entities = {}
         self.value_store = {}
-        self.dhw_power_store = {'val': 'OFF', 'dt': datetime.now().isoformat()} 
+        self.dhw_power_store = {'val': 'OFF', 'dt': self.clock.now().isoformat()} 
         self.set_mode = None
         self.last_dt = None
 
@@ -63,19 +66,20 @@ class MessageProcessor:
                 try:
                     msgvalue = await self.coordinator.determine_value(msg.packet_payload, msgname, msg.packet_message_type)
                 except Exception:
-                    _LOGGER.error(f"Error determining value for message {msgname} with payload {msg.packet_payload}")
-                    _LOGGER.error(f"Packet details: {packet}")
+                    _LOGGER.error("Error determining value for message %s with payload %s", msgname, msg.packet_payload)
+                    _LOGGER.error("Packet details: %s", packet)
                     continue
-                _LOGGER.debug(f"Processing message {msgname} with value {msgvalue}")
+                self.coordinator.mark_seen(msgname, msgvalue)
+                _LOGGER.debug("Processing message %s with value %s", msgname, msgvalue)
                 await self.protocol_message(msgname, msgvalue)
 
     async def protocol_message(self, msgname, msgvalue):
-        dt = datetime.now()
+        dt = self.clock.now()
 
         if self.last_dt is not None:
             if datetime.fromisoformat(self.last_dt).date() < dt.date():
                 if self.coordinator.extended_logging:
-                    _LOGGER.info(f"New day detected. Resetting daily counters.")
+                    _LOGGER.info("New day detected. Resetting daily counters.")
                 self.last_dt = dt.isoformat()
                 for daily_msg in DAILY_MESSAGES:
                     await self.protocol_message(daily_msg, 0)
@@ -92,16 +96,16 @@ class MessageProcessor:
             try:
                 await self._handle_operation_status(msgvalue)
             except Exception as e:
-                _LOGGER.error(f"Error handling operation status for {msgname}: {e}")
+                _LOGGER.error("Error handling operation status for %s: %s", msgname, e)
                 traceback.print_exc()
 
         # kalukuliere Minuten/Wattstunden in DHW/HEAT Mode
         if msgname in DELTA_SOURCES:
-            _LOGGER.debug(f"Handling mode delta for {msgname} with value {msgvalue}")
+            _LOGGER.debug("Handling mode delta for %s with value %s", msgname, msgvalue)
             try:
                 await self._handle_mode_delta(msgname, msgvalue, dt)
             except Exception as e:
-                _LOGGER.error(f"Error handling mode delta for {msgname}: {e}")
+                _LOGGER.error("Error handling mode delta for %s: %s", msgname, e)
                 traceback.print_exc()
 
         # Spezielle Handhabung für DHW Power Modus
@@ -109,7 +113,7 @@ class MessageProcessor:
             try:
                 self._update_mode(msgvalue, dt)
             except Exception as e:
-                _LOGGER.error(f"Error updating mode for {msgname}: {e}")
+                _LOGGER.error("Error updating mode for %s: %s", msgname, e)
                 traceback.print_exc()
 
         # Spezielle Handhabung für Heat Output
@@ -117,7 +121,7 @@ class MessageProcessor:
             try:
                 await self._handle_heat_output(msgname, msgvalue, dt)
             except Exception as e:
-                _LOGGER.error(f"Error handling heat output for {msgname}: {e}")
+                _LOGGER.error("Error handling heat output for %s: %s", msgname, e)
                 traceback.print_exc()
 
         # Spezielle Handhabung für COP Berechnung
@@ -125,7 +129,7 @@ class MessageProcessor:
             try:
                 await self._handle_cop(msgname, msgvalue, dt)
             except Exception as e:
-                _LOGGER.error(f"Error handling COP for {msgname}: {e}")
+                _LOGGER.error("Error handling COP for %s: %s", msgname, e)
                 traceback.print_exc()
 
         # SollVL - Wenn Mode AUTO dann gleich sensor.samsung_ehssentinel_intempwaterlawf, wenn HEAT dann sensor.samsung_ehssentinel_indoorsettempwaterout bei Zone 1 und sensor.samsung_ehssentinel_intempwateroutlettargetzone2f bei Zone 2
@@ -133,7 +137,7 @@ class MessageProcessor:
             try:
                 await self._handle_sollvl(msgname, msgvalue, dt)
             except Exception as e:
-                _LOGGER.error(f"Error handling SollVL for {msgname}: {e}")
+                _LOGGER.error("Error handling SollVL for %s: %s", msgname, e)
                 traceback.print_exc()
 
     
@@ -203,38 +207,38 @@ class MessageProcessor:
             tmpval = 'ON' if msgvalue == 'TANK' else 'OFF'
             if self.dhw_power_store.get('val') != tmpval:
                 if self.coordinator.extended_logging:
-                    _LOGGER.info(f"Updating DHW/HEAT mode to {tmpval}({msgvalue}) based on DHW_VALVE change from {self.dhw_power_store.get('val')} to {tmpval}")
+                    _LOGGER.info("Updating DHW/HEAT mode to %s(%s) based on DHW_VALVE change from %s to %s", tmpval, msgvalue, self.dhw_power_store.get('val'), tmpval)
                 self.dhw_power_store['val'] = tmpval
                 if self.value_store['ENUM_IN_FSV_3011']['val'] == 'No':
                     self.dhw_power_store['val'] = 'OFF'  # Override auf OFF, wenn FSV 3011 "No" ist, da dann kein Warmwasserbetrieb möglich ist
                     if self.coordinator.extended_logging:
-                        _LOGGER.info(f"Overriding DHW mode to OFF because ENUM_IN_FSV_3011 is {self.value_store['ENUM_IN_FSV_3011']['val']}")
+                        _LOGGER.info("Overriding DHW mode to OFF because ENUM_IN_FSV_3011 is %s", self.value_store['ENUM_IN_FSV_3011']['val'])
                 self.dhw_power_store['dt'] = dt
     
     async def _handle_mode_delta(self, msgname, msgvalue, dt):
         # Initialisiere nur den betroffenen Key falls nötig
         if self.value_store.get(msgname, {}).get('val', None) is None:
             if self.coordinator.extended_logging:
-                _LOGGER.info(f"Initializing value store for {msgname} as it was not set.")
+                _LOGGER.info("Initializing value store for %s as it was not set.", msgname)
             for k in [msgname] + list(DELTA_SOURCES[msgname]):  # Alle abhängigen Keys initialisieren
                 if self.value_store.get(k, {}).get('val', None) is None:
                     sensor_data = self.coordinator.data.get(PLATFORM_SENSOR, {}).get(self._normalize_name(k), {})
                     if sensor_data.get('value', None) is not None:
-                        tmpDt = sensor_data.get('nasa_last_seen', dt)
+                        tmpDt = sensor_data.get('nasa_last_seen') or dt
                         if datetime.fromisoformat(tmpDt).date() == datetime.fromisoformat(dt).date() or k not in DAILY_MESSAGES:  # Nur initialisieren, wenn der letzte Stand von heute ist oder es kein Tageswert ist
                             self.value_store[k] = {
                                 'val': sensor_data.get('value', None),
                                 'dt': tmpDt
                             }
                             if self.coordinator.extended_logging:
-                                _LOGGER.info(f"Initialized value store for {k} with value {sensor_data.get('value', None)} and timestamp {tmpDt}")
+                                _LOGGER.info("Initialized value store for %s with value %s and timestamp %s", k, sensor_data.get('value', None), tmpDt)
                         else: 
                             if self.coordinator.extended_logging:                  
-                                _LOGGER.info(f"Setting value for {k} to 0 because last seen date is not today.")
+                                _LOGGER.info("Setting value for %s to 0 because last seen date is not today.", k)
                             await self.protocol_message(k, 0) # Setze Tageswerte auf 0, wenn der letzte Stand von einem anderen Tag ist
                     else:
                         if self.coordinator.extended_logging:
-                            _LOGGER.info(f"No value found for {k} during initialization of mode delta handling")
+                            _LOGGER.info("No value found for %s during initialization of mode delta handling", k)
 
         # Prüfe, ob alle Keys initialisiert sind
         # if not all(k in self.value_store for k in DELTA_SOURCES):
@@ -242,7 +246,7 @@ class MessageProcessor:
 
         old = self.value_store.get(msgname)
         if self.coordinator.extended_logging:
-            _LOGGER.info(f"Handling mode delta for {msgname}. Old value: {old}, New value: {msgvalue}")
+            _LOGGER.info("Handling mode delta for %s. Old value: %s, New value: %s", msgname, old, msgvalue)
         if not old or old['val'] is None:
             return
         
@@ -267,13 +271,13 @@ class MessageProcessor:
             daily_heat_val = round(self.value_store.get(daily_heat, {}).get('val', 0) or 0, 2)
             daily_val = round(self.value_store.get(daily, {}).get('val', 0) or 0, 2)
         except Exception as e:
-            _LOGGER.error(f"Error retrieving values for mode delta calculation: {e}")
+            _LOGGER.error("Error retrieving values for mode delta calculation: %s", e)
             return
 
         try:    
             await self.protocol_message(daily, daily_val + delta)
         except Exception as e:
-            _LOGGER.error(f"Error updating daily total for {daily}: {e}")
+            _LOGGER.error("Error updating daily total for %s: %s", daily, e)
             traceback.print_exc()
 
         ## Delta-Verteilung je nach Modus
@@ -295,9 +299,9 @@ class MessageProcessor:
 
         if old_dt <= mode_dt < new_dt and self.value_store['ENUM_IN_FSV_3011']['val'] != 'No':
             if self.coordinator.extended_logging:
-                _LOGGER.info(f"Splitting delta of {delta} between main target {main_target} and secondary target {sec_target} based on mode change timestamp")
-                _LOGGER.info(f"Mode change timestamp: {mode_dt}, Old value timestamp: {old_dt}, Delta time: {delta_time} seconds")
-                _LOGGER.info(f"Applying delta of {delta} split into {delta * (mode_dt - old_dt).total_seconds() / delta_time} for main target {main_target} and {delta * (new_dt - mode_dt).total_seconds() / delta_time} for secondary target {sec_target}")
+                _LOGGER.info("Splitting delta of %s between main target %s and secondary target %s based on mode change timestamp", delta, main_target, sec_target)
+                _LOGGER.info("Mode change timestamp: %s, Old value timestamp: %s, Delta time: %s seconds", mode_dt, old_dt, delta_time)
+                _LOGGER.info("Applying delta of %s split into %s for main target %s and %s for secondary target %s", delta, delta * (mode_dt - old_dt).total_seconds() / delta_time, main_target, delta * (new_dt - mode_dt).total_seconds() / delta_time, sec_target)
             t1 = (mode_dt - old_dt).total_seconds()
             t2 = delta_time - t1
             d1 = delta * round(t1 / delta_time, 2)
@@ -308,9 +312,9 @@ class MessageProcessor:
             await self.protocol_message(sec_daily, round(sec_daily_val + d2, 2))
         else:
             if self.coordinator.extended_logging: 
-                _LOGGER.info(f"Applying full delta to main target {main_target} as mode change is more recent than last value change")
-                _LOGGER.info(f"Mode change timestamp: {mode_dt}, Old value timestamp: {old_dt}, Delta time: {delta_time} seconds")
-                _LOGGER.info(f"Applying delta of {delta} to main target {main_target} with old value {main_val}")
+                _LOGGER.info("Applying full delta to main target %s as mode change is more recent than last value change", main_target)
+                _LOGGER.info("Mode change timestamp: %s, Old value timestamp: %s, Delta time: %s seconds", mode_dt, old_dt, delta_time)
+                _LOGGER.info("Applying delta of %s to main target %s with old value %s", delta, main_target, main_val)
             await self.protocol_message(main_target, round(main_val + delta, 2))
             await self.protocol_message(main_daily, round(main_daily_val + delta, 2))
             
@@ -372,13 +376,13 @@ class MessageProcessor:
     async def development_tool(self, tool_name):
         if tool_name == "set_mode_heat":
             self.set_mode = 'HEAT'
-            _LOGGER.info(f"Set mode to {self.set_mode}")
+            _LOGGER.info("Set mode to %s", self.set_mode)
         elif tool_name == "set_mode_dhw":
             self.set_mode = 'DHW'
-            _LOGGER.info(f"Set mode to {self.set_mode}")
+            _LOGGER.info("Set mode to %s", self.set_mode)
         elif tool_name == "disable_set_mode":
             self.set_mode = None
-            _LOGGER.info(f"Disabled DHW/HEAT mode tracking")
+            _LOGGER.info("Disabled DHW/HEAT mode tracking")
         elif tool_name == "reset_daily_counters" or tool_name == "reset_all_counters":
             await self.protocol_message("NASA_EHSSENTINEL_DAILY_MINUTES_ACTIVE_DHW_MODE", 0) 
             await self.protocol_message("NASA_EHSSENTINEL_DAILY_MINUTES_ACTIVE_HEAT_MODE", 0)
@@ -405,4 +409,4 @@ class MessageProcessor:
                 await self.protocol_message("NASA_EHSSENTINEL_TOTAL_COP_HEAT_MODE", 0)
                 _LOGGER.info("Reset total counters for minutes active, consumed power and generated power in both modes")
         else:
-            _LOGGER.warning(f"Unknown development tool requested: {tool_name}")
\ No newline at end of file
+            _LOGGER.warning("Unknown development tool requested: %s", tool_name)
\ No newline at end of file
@@ -3,17 +3,30 @@ import asyncio
 
 from .nasa_message import NASAMessage
 from .nasa_packet import NASAPacket, AddressClassEnum, PacketType, DataType
+from .rtt_estimator import RttTracker, backoff_delay
 
 _LOGGER = logging.getLogger(__name__)
 
 class MessageProducer:
     """Erzeugt und sendet Nachrichten an das EHS Sentinel System."""
     _CHUNKSIZE = 10
+    _MAX_RETRIES = 3
+    _RTO_INITIAL = 4.0
+    _RTO_MIN = 0.3
+    _RTO_MAX = 10.0
+    _BACKOFF_BASE = 0.25
+    _ACK_PROBE_TIMEOUT = 1.0
+    _PIPELINE_GAP = 0.05
 
     def __init__(self, hass, coordinator):
         self.hass = hass
         self.coordinator = coordinator
         self.writer = None
+        self.rtt = RttTracker(self._RTO_INITIAL, self._RTO_MIN, self._RTO_MAX)
+        self._packet_number = 0
+        self._ack_support = {}  # Ziel -> True (quittiert Writes), False (Probe ohne Ack), fehlt = unbekannt
+        self._unawaited_acks = {}  # Paketnummer -> Ziel, Writes an Ziele ohne Ack, auf die nicht gewartet wird
+        self._verification_tasks = set()
 
     def set_writer(self, writer):
         """Setzt den Writer für die serielle Kommunikation."""
@@ -25,44 +38,49 @@ class MessageProducer:
             _LOGGER.error("Cannot send read request: Indoor or Outdoor Unit Address is not set. Wait till auto-detection is complete.")
             return False
         
-        max_retries = 3
         chunks = [list_of_messages[i:i + self._CHUNKSIZE] for i in range(0, len(list_of_messages), self._CHUNKSIZE)]
 
         for chunk in chunks:
             messages = [self._build_message(x) for x in chunk]
             nasa_packet = self._build_default_read_packet()
             nasa_packet.set_packet_messages(messages)
+            nasa_packet.set_packet_number(self._next_packet_number())
 
             if "ENUM_IN_CHILLLER_SETTING_SILENT_LEVEL" in list_of_messages:
-                nasa_packet.set_packet_dest_address_class(AddressClassEnum(self.coordinator.outdoor_address['class']))
-                nasa_packet.set_packet_dest_channel(self.coordinator.outdoor_address['channel'])
-                nasa_packet.set_packet_dest_address(self.coordinator.outdoor_address['address'])
+                self._set_outdoor_destination(nasa_packet)
 
             await asyncio.sleep(0.5)
 
             events = [self.coordinator.create_read_confirmation(message) for message in chunk] if retry_mode else []
-
-            # Wrap every event.wait() in wait_for() so no task runs forever
-            tasks = [asyncio.create_task(asyncio.wait_for(event.wait(), timeout=4), name=f"EHSSentinelCoordinator.MessageProducer.read_request.{i}") for i, event in enumerate(events)]
+            tasks = [asyncio.create_task(event.wait(), name=f"EHSSentinelCoordinator.MessageProducer.read_request.{i}") for i, event in enumerate(events)]
+            estimator = self.rtt.get(self._destination_key(nasa_packet))
 
             try:
-                for attempt in range(max_retries):
+                for attempt in range(self._MAX_RETRIES):
+                    sent_at = asyncio.get_running_loop().time()
                     await self._write_packet_to_serial(nasa_packet)
 
-                    if retry_mode:
-                        done, pending = await asyncio.wait(tasks, timeout=4, return_when=asyncio.ALL_COMPLETED)
-                        if len(done) < len(tasks):
-                            if self.coordinator.extended_logging:
-                                _LOGGER.info(f"No confirmation for {chunk} after 4s (attempt {attempt+1}/{max_retries})")
-                            if attempt == max_retries - 1:
-                                _LOGGER.error(f"Read failed for {chunk} after {max_retries} attempts")
-                                if self.coordinator.extended_logging:
-                                    _LOGGER.info(f"Failed NasaPacket: {nasa_packet}")
-                                return False
-                        else:
-                            break  # Erfolg
-                    else:
+                    if not retry_mode:
                         break  # Kein retry mode → sofort raus
+
+                    timeout = estimator.timeout(attempt)
+                    pending = [task for task in tasks if not task.done()]
+                    done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.ALL_COMPLETED)
+                    if len(pending) == 0:
+                        # Karn: nur Antworten auf den ersten Versuch sind eindeutig einer Anfrage zuzuordnen
+                        if attempt == 0:
+                            estimator.add_sample(asyncio.get_running_loop().time() - sent_at)
+                        break  # Erfolg
+
+                    estimator.on_timeout()
+                    if self.coordinator.extended_logging:
+                        _LOGGER.info("No confirmation for %s after %.2fs (attempt %s/%s)", chunk, timeout, attempt + 1, self._MAX_RETRIES)
+                    if attempt == self._MAX_RETRIES - 1:
+                        _LOGGER.error("Read failed for %s after %s attempts", chunk, self._MAX_RETRIES)
+                        if self.coordinator.extended_logging:
+                            _LOGGER.info("Failed NasaPacket: %s", nasa_packet)
+                        return False
+                    await asyncio.sleep(backoff_delay(attempt, self._BACKOFF_BASE, estimator.rto))
             finally:
                 # Garantierter Cleanup — egal ob Erfolg, Fehler oder HA-Shutdown
                 for task in tasks:
@@ -74,6 +92,59 @@ class MessageProducer:
                 for message in chunk:
                     self.coordinator._read_confirmations.pop(message, None)
 
+    async def read_batch(self, list_of_messages: list, timeout: float) -> set:
+        """
+        Liest viele Nachrichten gepipelined, z.B. für den FSV Export.
+
+        Alle Read-Pakete werden direkt nacheinander gesendet, erst danach wird gemeinsam auf die
+        Antworten gewartet. Fehlende Antworten werden erneut angefragt, insgesamt aber höchstens
+        timeout Sekunden gewartet. Liefert die Namen der beantworteten Nachrichten.
+        """
+        if self.coordinator.indoor_address is None or self.coordinator.outdoor_address is None:
+            _LOGGER.error("Cannot send read request: Indoor or Outdoor Unit Address is not set. Wait till auto-detection is complete.")
+            return set()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        estimator = self.rtt.get(self._destination_key(self._build_default_read_packet()))
+        events = {msgname: self.coordinator.create_read_confirmation(msgname) for msgname in dict.fromkeys(list_of_messages)}
+        missing = list(events)
+
+        try:
+            for attempt in range(self._MAX_RETRIES):
+                for chunk in self._chunk_by_destination(missing):
+                    nasa_packet = self._build_default_read_packet()
+                    nasa_packet.set_packet_messages([self._build_message(x) for x in chunk])
+                    nasa_packet.set_packet_number(self._next_packet_number())
+                    if self.coordinator.nasa_repo[chunk[0]].get('dest_address_class') == 'Outdoor':
+                        self._set_outdoor_destination(nasa_packet)
+                    await self._write_packet_to_serial(nasa_packet)
+                    await asyncio.sleep(self._PIPELINE_GAP)
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                tasks = [asyncio.create_task(events[msgname].wait()) for msgname in missing]
+                try:
+                    await asyncio.wait(tasks, timeout=min(remaining, estimator.timeout(attempt)), return_when=asyncio.ALL_COMPLETED)
+                finally:
+                    for task in tasks:
+                        if not task.done():
+                            task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+                missing = [msgname for msgname in missing if not events[msgname].is_set()]
+                if len(missing) == 0:
+                    break
+                if self.coordinator.extended_logging:
+                    _LOGGER.info("Batched read: %s of %s messages not answered yet (attempt %s/%s)", len(missing), len(events), attempt + 1, self._MAX_RETRIES)
+        finally:
+            for msgname, event in events.items():
+                if self.coordinator._read_confirmations.get(msgname) is event:
+                    self.coordinator._read_confirmations.pop(msgname, None)
+
+        return {msgname for msgname, event in events.items() if event.is_set()}
+
     async def write_request(self, message: str | list, 
                             value: str | int | list, 
                             read_request_after=False, 
@@ -98,8 +169,8 @@ class MessageProducer:
 
         message = [tmp.strip() for tmp in message]
         value = [self._decode_value(tmp_msg, tmp_value) for tmp_msg, tmp_value in dict(zip(message, value)).items()]
-        _LOGGER.debug(f"Decoded Values for Messages {message}: {value}")
-        max_retries = 3
+        _LOGGER.debug("Decoded Values for Messages %s: %s", message, value)
+        max_retries = self._MAX_RETRIES
         nasamessages = [self._build_message(tmp_message, tmp_value) for tmp_message, tmp_value in zip(message, value)]
         nasa_packet = self._build_default_request_packet()
         nasa_packet.set_packet_messages(nasamessages)
@@ -126,73 +197,300 @@ class MessageProducer:
         if 'dest_address_class' in self.coordinator.nasa_repo[message[0]] and dest_address_class is None:
             dest_address_class = self.coordinator.nasa_repo[message[0]]['dest_address_class']
             if dest_address_class == 'Outdoor':
-                nasa_packet.set_packet_dest_address_class(AddressClassEnum(self.coordinator.outdoor_address['class']))
-                nasa_packet.set_packet_dest_channel(self.coordinator.outdoor_address['channel'])
-                nasa_packet.set_packet_dest_address(self.coordinator.outdoor_address['address'])
+                self._set_outdoor_destination(nasa_packet)
 
+        nasa_packet.set_packet_number(self._next_packet_number())
         nasa_packet.to_raw()
 
         events = []
         determinated_values = []
         
         if read_request_after:
-            # for each nasamessage determine expected value and create a confirmation event
-            for nm, msgname in zip(nasamessages, message):
-                try:
-                    det_val = await self.coordinator.determine_value(nm.packet_payload, msgname, nm.packet_message_type)
-                except Exception:
-                    det_val = None
-                determinated_values.append(det_val)
-                events.append(self.coordinator.create_write_confirmation(msgname, det_val))
+            events, determinated_values = await self._create_write_confirmations(message, nasamessages)
 
-        for attempt in range(max_retries):
-            _LOGGER.info(f"Write request for {"/".join(message)} with target value: {determinated_values}")
-            _LOGGER.debug(f"Sending NASA packet: {nasa_packet}") #TODO set debug again
+        _LOGGER.info("Write request for %s with target value: %s", '/'.join(message), determinated_values)
+
+        # Bestätigung über Ack/Nack des Geräts, Retries erst wenn das Ziel schon einmal quittiert hat
+        acked = await self._send_and_wait_for_ack(nasa_packet, max_retries)
 
+        if acked is False:
+            _LOGGER.error("Write for %s was rejected with Nack", '/'.join(message))
+            self._cleanup_write_confirmations(message, events)
+            return False
+
+        if acked is True:
+            if read_request_after:
+                # Rücklesen nur noch zur Kontrolle und im Hintergrund
+                task = asyncio.create_task(self._verify_write(message, events), name="EHSSentinelCoordinator.MessageProducer.verify_write")
+                self._verification_tasks.add(task)
+                task.add_done_callback(self._verification_tasks.discard)
+            return True
+
+        if not read_request_after:
+            if self._ack_support.get(self._destination_key(nasa_packet)):
+                _LOGGER.error("Write failed for %s, no Ack after %s attempts", '/'.join(message), max_retries)
+                await self.coordinator.dump_capture("write_failed")
+                return False
+            return True
+
+        # keine Quittung erhalten: Bestätigung wie bisher über Rücklesen des Werts
+        return await self._confirm_by_read_back(nasa_packet, message, events, max_retries)
+
+    async def _send_and_wait_for_ack(self, nasa_packet: NASAPacket, attempts: int):
+        """
+        Sendet das Paket und wartet auf Ack/Nack. Liefert True (Ack), False (Nack) oder None (keine Antwort).
+
+        Solange ein Ziel noch nie quittiert hat, wird nur einmal kurz (_ACK_PROBE_TIMEOUT) gewartet.
+        Bleibt diese Probe ohne Ack, wird für das Ziel danach gar nicht mehr gewartet, damit Geräte/Bridges
+        ohne Ack nicht bei jedem Schreiben in den Timeout laufen. Ein spätes Ack schaltet es wieder ein
+        (on_unawaited_ack), registriert wird dafür nur die Paketnummer, keine Future.
+        """
+        key = self._destination_key(nasa_packet)
+        supported = self._ack_support.get(key)
+        estimator = self.rtt.get(key)
+        # die Paketnummer gehört ab jetzt diesem Write, auch wenn sie nach 256 Paketen wieder vergeben wird
+        self._unawaited_acks.pop(nasa_packet.packet_number, None)
+        if supported is False:
+            self._unawaited_acks[nasa_packet.packet_number] = key
+            _LOGGER.debug("Sending NASA packet: %s", nasa_packet)
             await self._write_packet_to_serial(nasa_packet)
+            return None
+        if supported is not True:
+            attempts = 1
+        future = self.coordinator.create_ack_confirmation(nasa_packet.packet_number)
+        try:
+            for attempt in range(attempts):
+                nasa_packet.set_packet_retry_count(min(attempt, 3))
+                _LOGGER.debug("Sending NASA packet: %s", nasa_packet)
+                sent_at = asyncio.get_running_loop().time()
+                await self._write_packet_to_serial(nasa_packet)
+
+                timeout = estimator.timeout(attempt)
+                if not supported:
+                    timeout = min(timeout, self._ACK_PROBE_TIMEOUT)
+                try:
+                    acked = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if supported:
+                        estimator.on_timeout()
+                    if self.coordinator.extended_logging:
+                        _LOGGER.info("No Ack for packet number %s after %.2fs (attempt %s/%s)", nasa_packet.packet_number, timeout, attempt + 1, attempts)
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(backoff_delay(attempt, self._BACKOFF_BASE, estimator.rto))
+                    continue
+
+                if attempt == 0:
+                    estimator.add_sample(asyncio.get_running_loop().time() - sent_at)
+                self._ack_support[key] = True
+                return acked
+            if supported is None:
+                _LOGGER.info("No Ack from %s, confirming writes by read back from now on", key)
+                self._ack_support[key] = False
+            return None
+        finally:
+            self.coordinator._ack_confirmations.pop(nasa_packet.packet_number, None)
+            if not future.done():
+                future.cancel()
+
+    def on_unawaited_ack(self, packet_number: int):
+        """Ack/Nack ohne wartenden Write: kam es von einem Ziel ohne Ack-Unterstützung, wird dort wieder gewartet."""
+        key = self._unawaited_acks.pop(packet_number, None)
+        if key is not None and self._ack_support.get(key) is False:
+            _LOGGER.info("Received Ack from %s, waiting for Acks again", key)
+            self._ack_support[key] = True
+
+    async def _verify_write(self, message: list, events: list):
+        """Liest die geschriebenen Werte einmal zurück und meldet Abweichungen."""
+        try:
+            estimator = self.rtt.get(self._destination_key(self._build_default_read_packet()))
+            await self.read_request(message)
+            tasks = [asyncio.create_task(ev.wait()) for ev in events if not ev.is_set()]
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=estimator.timeout(1), return_when=asyncio.ALL_COMPLETED)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                # Bestätigungen, die inzwischen von einem neueren Write ersetzt wurden, nicht melden
+                mismatched = [msgname for msgname, ev in zip(message, events) if not ev.is_set() and self._owns_write_confirmation(msgname, ev)]
+                if len(mismatched) > 0:
+                    _LOGGER.warning("Write for %s was acknowledged, but the read back value does not match yet", '/'.join(mismatched))
+        except Exception as e:
+            _LOGGER.warning("Read back verification for %s failed: %s", '/'.join(message), e)
+        finally:
+            self._cleanup_write_confirmations(message, events)
+
+    async def _confirm_by_read_back(self, nasa_packet: NASAPacket, message: list, events: list, max_retries: int):
+        # Bestätigt wird über das Rücklesen, daher zählt die Antwortzeit des Read-Ziels
+        estimator = self.rtt.get(self._destination_key(self._build_default_read_packet()))
+
+        for attempt in range(max_retries):
+            # beim ersten Versuch wurde das Paket bereits beim Warten auf das Ack gesendet
+            if attempt > 0:
+                _LOGGER.debug("Sending NASA packet: %s", nasa_packet)
+                await self._write_packet_to_serial(nasa_packet)
+                # dem Gerät etwa eine Antwortzeit zum Übernehmen geben, bevor zurückgelesen wird
+                await asyncio.sleep(min(estimator.srtt or 1, 1))
+            await self.read_request(message)
+
+            timeout = estimator.timeout(attempt)
+            tasks = [asyncio.create_task(ev.wait()) for ev in events if not ev.is_set()]
             
-            if read_request_after:
-                await asyncio.sleep(1)
-                await self.read_request(message)
+            try:
+                done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.ALL_COMPLETED) if tasks else (set(), set())
+                if len(pending) > 0:
+                    estimator.on_timeout()
+                    _LOGGER.warning("No confirmation for %s after %.2fs (attempt %s/%s)", '/'.join(message), timeout, attempt + 1, max_retries)
+                    if attempt == max_retries - 1:
+                        _LOGGER.error("Write failed for %s after %s attempts", '/'.join(message), max_retries)
+                        if self.coordinator.extended_logging:
+                            _LOGGER.info("Failed NasaPacket: %s", nasa_packet)
+                        self._cleanup_write_confirmations(message, events)
+                        await self.coordinator.dump_capture("write_failed")
+                        return False
+                    # else retry loop
+                    await asyncio.sleep(backoff_delay(attempt, self._BACKOFF_BASE, estimator.rto))
+                else:
+                    # success
+                    break
+            finally:
+                for t in tasks:
+                    if not t.done():
+                        t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
-                # create wait tasks for all events (use wait_for wrapped tasks so they time out)
-                tasks = [asyncio.create_task(asyncio.wait_for(ev.wait(), timeout=3)) for ev in events]
-                
-                try:
-                    done, pending = await asyncio.wait(tasks, timeout=3, return_when=asyncio.ALL_COMPLETED)
-                    if len(done) < len(tasks):
-                        _LOGGER.warning(f"No confirmation for {"/".join(message)} after 3s (attempt {attempt+1}/{max_retries})")
-                        if attempt == max_retries - 1:
-                            _LOGGER.error(f"Write failed for {"/".join(message)} after {max_retries} attempts")
-                            if self.coordinator.extended_logging:
-                                _LOGGER.info(f"Failed NasaPacket: {nasa_packet}")
-                            # cleanup tasks before returning
-                            for t in tasks:
-                                if not t.done():
-                                    t.cancel()
-                            await asyncio.gather(*tasks, return_exceptions=True)
-                            # cleanup confirmations
-                            for msgname in message:
-                                self.coordinator._write_confirmations.pop(msgname, None)
-                                
-                            return False
-                        # else retry loop
-                    else:
-                        # success
-                        break
-                finally:
-                    for t in tasks:
-                        if not t.done():
-                            t.cancel()
-                    await asyncio.gather(*tasks, return_exceptions=True)
-            else:
+        self._cleanup_write_confirmations(message, events)
+        return True
+
+    async def write_batch(self, values: dict) -> dict:
+        """
+        Schreibt viele Werte mit möglichst wenigen Frames, z.B. beim FSV Import.
+
+        Die Werte werden je Ziel (Indoor/Outdoor) in Pakete mit bis zu _CHUNKSIZE Nachrichten gepackt
+        und danach gemeinsam zurückgelesen. Nicht bestätigte Werte werden erneut geschrieben.
+        Liefert je Key True (bestätigt) oder False.
+        """
+        results = {}
+
+        if self.coordinator.indoor_address is None or self.coordinator.outdoor_address is None:
+            _LOGGER.error("Cannot send write request: Indoor or Outdoor Unit Address is not set. Wait till auto-detection is complete.")
+            return {key.strip(): False for key in values}
+
+        nasamessages = {}
+        for key, value in values.items():
+            key = key.strip()
+            try:
+                nasamessages[key] = self._build_message(key, self._decode_value(key, f"{value}"))
+            except Exception as e:
+                _LOGGER.error("Cannot write %s with value %s: %s", key, value, e)
+                results[key] = False
+
+        # Bestätigt wird über das Rücklesen, daher zählt die Antwortzeit des Read-Ziels
+        estimator = self.rtt.get(self._destination_key(self._build_default_read_packet()))
+
+        for attempt in range(self._MAX_RETRIES):
+            if len(nasamessages) == 0:
+                break
+
+            confirmations = {}
+            all_acked = True
+            for chunk in self._chunk_by_destination(list(nasamessages)):
+                chunk_messages = [nasamessages[key] for key in chunk]
+                events, determinated_values = await self._create_write_confirmations(chunk, chunk_messages)
+                nasa_packet = self._build_default_request_packet()
+                nasa_packet.set_packet_messages(chunk_messages)
+                if self.coordinator.nasa_repo[chunk[0]].get('dest_address_class') == 'Outdoor':
+                    self._set_outdoor_destination(nasa_packet)
+                nasa_packet.set_packet_number(self._next_packet_number())
+                nasa_packet.to_raw()
+
+                _LOGGER.info("Batched write request for %s with target values: %s", '/'.join(chunk), determinated_values)
+                acked = await self._send_and_wait_for_ack(nasa_packet, self._MAX_RETRIES)
+                if acked is False:
+                    _LOGGER.error("Write for %s was rejected with Nack", '/'.join(chunk))
+                    self._cleanup_write_confirmations(chunk, events)
+                    for key in chunk:
+                        results[key] = False
+                        del nasamessages[key]
+                    continue
+                all_acked = all_acked and acked is True
+                confirmations.update(zip(chunk, events))
+
+            if len(confirmations) == 0:
                 break
 
-        # cleanup write confirmations for all message names
+            if not all_acked:
+                # dem Gerät etwa eine Antwortzeit zum Übernehmen geben, bevor zurückgelesen wird
+                await asyncio.sleep(min(estimator.srtt or 1, 1))
+
+            # ein gemeinsames Rücklesen für alle geschriebenen Werte
+            await self.read_request(list(confirmations))
+            timeout = estimator.timeout(attempt)
+            tasks = [asyncio.create_task(ev.wait()) for ev in confirmations.values() if not ev.is_set()]
+            try:
+                if tasks:
+                    await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.ALL_COMPLETED)
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self._cleanup_write_confirmations(list(confirmations), list(confirmations.values()))
+
+            for key, event in confirmations.items():
+                if event.is_set():
+                    results[key] = True
+                    del nasamessages[key]
+
+            if len(nasamessages) > 0 and attempt < self._MAX_RETRIES - 1:
+                estimator.on_timeout()
+                _LOGGER.warning("No confirmation for %s after %.2fs (attempt %s/%s)", '/'.join(nasamessages), timeout, attempt + 1, self._MAX_RETRIES)
+                await asyncio.sleep(backoff_delay(attempt, self._BACKOFF_BASE, estimator.rto))
+
+        for key in nasamessages:
+            _LOGGER.error("Write failed for %s after %s attempts", key, self._MAX_RETRIES)
+            results[key] = False
+        if len(nasamessages) > 0:
+            await self.coordinator.dump_capture("write_failed")
+
+        return results
+
+    async def _create_write_confirmations(self, message: list, nasamessages: list):
+        """Ermittelt je Nachricht den erwarteten Wert und legt dafür ein Bestätigungs-Event an."""
+        events = []
+        determinated_values = []
+        for nm, msgname in zip(nasamessages, message):
+            try:
+                det_val = await self.coordinator.determine_value(nm.packet_payload, msgname, nm.packet_message_type)
+            except Exception:
+                det_val = None
+            determinated_values.append(det_val)
+            events.append(self.coordinator.create_write_confirmation(msgname, det_val))
+        return events, determinated_values
+
+    def _chunk_by_destination(self, message: list) -> list:
+        """Teilt Nachrichten nach Ziel (dest_address_class aus dem NASA Repository) in Pakete auf."""
+        groups = {}
         for msgname in message:
-            self.coordinator._write_confirmations.pop(msgname, None)
+            groups.setdefault(self.coordinator.nasa_repo[msgname].get('dest_address_class', 'Indoor'), []).append(msgname)
+        return [keys[i:i + self._CHUNKSIZE] for keys in groups.values() for i in range(0, len(keys), self._CHUNKSIZE)]
 
-        return True
+    def _set_outdoor_destination(self, nasa_packet: NASAPacket):
+        nasa_packet.set_packet_dest_address_class(AddressClassEnum(self.coordinator.outdoor_address['class']))
+        nasa_packet.set_packet_dest_channel(self.coordinator.outdoor_address['channel'])
+        nasa_packet.set_packet_dest_address(self.coordinator.outdoor_address['address'])
+
+    def _owns_write_confirmation(self, msgname, event) -> bool:
+        return self.coordinator._write_confirmations.get(msgname, {}).get("event") is event
+
+    def _cleanup_write_confirmations(self, message: list, events: list = None):
+        for i, msgname in enumerate(message):
+            # nur die eigene Bestätigung entfernen, nicht die eines neueren Writes auf dieselbe Nachricht
+            if events is None or i >= len(events) or self._owns_write_confirmation(msgname, events[i]):
+                self.coordinator._write_confirmations.pop(msgname, None)
+
+    def _next_packet_number(self) -> int:
+        self._packet_number = (self._packet_number + 1) & 0xFF
+        return self._packet_number
 
     def _search_nasa_enumkey_for_value(self, message, value):
         if 'type' in self.coordinator.nasa_repo[message] and self.coordinator.nasa_repo[message]['type'] == 'ENUM':
@@ -222,7 +520,7 @@ class MessageProducer:
                     try:
                         return int(eval(arithmetic))
                     except Exception as e:
-                        _LOGGER.warning(f"Arithmetic Function couldn't been applied for Message {message}, using raw value: reverse-arithmetic = {arithmetic} {e} {value}")
+                        _LOGGER.warning("Arithmetic Function couldn't been applied for Message %s, using raw value: reverse-arithmetic = %s %s %s", message, arithmetic, e, value)
                         return value
                 else:
                     value = int(value)
@@ -250,6 +548,9 @@ class MessageProducer:
         tmpmsg.set_packet_payload_raw(value_raw)
         return tmpmsg
 
+    def _destination_key(self, packet: NASAPacket) -> str:
+        return f"{packet.packet_dest_address_class.value:02X}.{packet.packet_dest_channel:02X}.{packet.packet_dest_address:02X}"
+
     def _extract_address(self, messagename) -> int:
         return int(self.coordinator.nasa_repo[messagename]['address'], 16)
 
@@ -286,6 +587,9 @@ class MessageProducer:
         return nasa_msg
 
     async def _write_packet_to_serial(self, packet: NASAPacket):
+        if self.writer is None:
+            raise ConnectionError("Not connected to the TCP device")
         final_packet = packet.to_raw()
+        self.coordinator.capture_ring.add(final_packet)
         self.writer.write(final_packet)
         await self.writer.drain()
\ No newline at end of file
@@ -69,4 +69,8 @@ class NASAMessage:
         )
     
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+    def compact(self) -> str:
+        """Einzeilige Darstellung für das Packet-Logging, z.B. 0x4201=00fa"""
+        return f"0x{self.packet_message:04x}={self.packet_payload.hex()}"
\ No newline at end of file
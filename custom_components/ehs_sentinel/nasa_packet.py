@@ -64,6 +64,9 @@ class DataType(Enum):
     Ack = 6
     Nack = 7
 
+class NASAChecksumError(ValueError):
+    """Raised when the CRC16 of a received packet does not match its content."""
+
 class NASAPacket:
     """
     A class to represent a NASA Packet.
@@ -96,6 +99,10 @@ class NASAPacket:
             raise ValueError("Data too short to be a valid NASAPacket")
         
         crc_checkusm=binascii.crc_hqx(bytearray(packet[3:-3]), 0)
+        packet_crc16 = ((packet[-3] << 8) | packet[-2])
+        # vor dem Zerlegen prüfen, damit beschädigte Pakete immer als Checksummenfehler erkannt werden
+        if crc_checkusm != packet_crc16:
+            raise NASAChecksumError(f"Checksum for package could not be validated. Calculated: {crc_checkusm} in packet: {packet_crc16}: packet:{bytes(packet).hex()}")
 
         self.packet_start = packet[0]
         self.packet_size = ((packet[1] << 8) | packet[2])
@@ -131,9 +138,6 @@ class NASAPacket:
         self.packet_end = packet[-1]
         self.packet_messages = self._extract_messages(0, self.packet_capacity, packet[13:-3], [])
 
-        if crc_checkusm != self.packet_crc16:
-            raise ValueError(f"Checksum for package could not be validated. Calculated: {crc_checkusm} in packet: {self.packet_crc16}: packet:{self}")
-
     def _extract_messages(self, depth: int, capacity: int, msg_rest: bytearray, return_list: list):
         if depth > capacity or len(msg_rest) <= 2:
             return return_list
@@ -193,6 +197,18 @@ class NASAPacket:
 
     def __repr__(self):
         return self.__str__()
+
+    def compact(self) -> str:
+        """
+        Einzeilige Darstellung für extended_logging, z.B.
+        Indoor(20.00.00)>JIGTester(80.00.ff) Response #12 [0x4201=00fa 0x4236=0190]
+        """
+        messages = " ".join(msg.compact() for msg in self.packet_messages)
+        return (
+            f"{self.packet_source_address_class.name}({self.packet_source_address_class.value:02x}.{self.packet_source_channel:02x}.{self.packet_source_address:02x})>"
+            f"{self.packet_dest_address_class.name}({self.packet_dest_address_class.value:02x}.{self.packet_dest_channel:02x}.{self.packet_dest_address:02x}) "
+            f"{self.packet_data_type.name} #{self.packet_number} [{messages}]"
+        )
     
     # Setter methods
     def set_packet_source_address_class(self, value: AddressClassEnum):
@@ -0,0 +1,255 @@
+import bisect
+import gzip
+import io
+import os
+import re
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Binäres Aufzeichnungsformat für Rohpakete (packet.ehscap) und gemeinsamer Reader für
+# Binär- und Textlogs (packet.log), jeweils auch gzip- bzw. zstd-komprimiert.
+#
+# Aufbau: MAGIC, danach Records aus <HQ (Länge, monotone Zeit in ns) und dem Rohframe.
+# Ein Record mit Länge 0 ist ein Segment-Marker, ihm folgt <q mit der Wanduhrzeit in ns
+# zum monotonen Zeitstempel des Markers. Jedes Öffnen zum Schreiben beginnt ein neues
+# Segment, so bleiben angehängte Aufzeichnungen über Neustarts hinweg auswertbar.
+#
+# Zu jeder Aufzeichnung (Text oder Binär) kann eine Indexdatei <datei>.idx existieren: INDEX_MAGIC und
+# danach <qqQ Einträge (Wanduhrzeit in ns, monotone Zeit in ns, Offset eines Record- bzw. Zeilenanfangs).
+# Die Wanduhrzeit eines Eintrags ist mit dem Offset des Segment-Markers berechnet, der für den Record gilt,
+# so liefert ein Lesen ab einem Indexeintrag dieselben Zeitstempel wie ein Lesen von vorn.
+# Bei rotierten .gz Dateien beginnt an jedem Offset ein eigener gzip-Member, so kann auch dort
+# direkt an einen Zeitpunkt gesprungen werden.
+
+MAGIC = b"EHSCAP1\n"
+RECORD = struct.Struct("<HQ")
+SEGMENT = struct.Struct("<q")
+
+INDEX_MAGIC = b"EHSIDX1\n"
+INDEX_ENTRY = struct.Struct("<qqQ")
+INDEX_INTERVAL_NS = 60 * 10**9  # ein Indexeintrag je Minute
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+TEXT_LINE = re.compile(r"\[(\d{4}-\d{2}-\d{2}), (\d{2}:\d{2}:\d{2}\.\d{3})\] ([0-9A-Fa-f ]+)$")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compressed captures need the 'zstandard' package") from e
+    return zstandard
+
+
+def format_text_line(ts: float, frame: bytes) -> str:
+    """Zeile im Format von packet.log, z.B. [2026-10-19, 12:00:00.123] 32 00 11 ..."""
+    stamp = datetime.fromtimestamp(ts)
+    return f"[{stamp:%Y-%m-%d, %H:%M:%S}.{stamp.microsecond // 1000:03d}] {frame.hex(' ').upper()}\n"
+
+
+def parse_text_line(line: str):
+    """Liefert (Wanduhrzeit in s, Frame) oder None."""
+    match = TEXT_LINE.match(line.strip())
+    if not match:
+        return None
+    ts = datetime.strptime(f"{match.group(1)} {match.group(2)}", "%Y-%m-%d %H:%M:%S.%f").timestamp()
+    return ts, bytes.fromhex(match.group(3))
+
+
+def open_compressed(path, mode: str = "rb"):
+    """Öffnet eine Datei binär, .gz und .zst werden transparent (de)komprimiert."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        zstandard = _zstd()
+        if "r" in mode:
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(open(path, mode), closefd=True)
+    return open(path, mode)
+
+
+def is_capture_path(path) -> bool:
+    """Binärformat anhand des Dateinamens, z.B. packet.ehscap, packet.ehscap.zst oder packet.ehscap.2026-10-19.gz"""
+    return ".ehscap" in Path(path).name
+
+
+def pack_record(mono_ns: int, frame: bytes) -> bytes:
+    return RECORD.pack(len(frame), mono_ns) + frame
+
+
+def pack_segment(mono_ns: int = None, wall_ns: int = None) -> bytes:
+    mono_ns = time.monotonic_ns() if mono_ns is None else mono_ns
+    wall_ns = time.time_ns() if wall_ns is None else wall_ns
+    return RECORD.pack(0, mono_ns) + SEGMENT.pack(wall_ns)
+
+
+class CaptureWriter:
+    """Schreibt Records in ein geöffnetes Binärfile, bei einem neuen File zuerst MAGIC."""
+
+    def __init__(self, fileobj, new_file: bool = True):
+        self.fileobj = fileobj
+        if new_file:
+            self.fileobj.write(MAGIC)
+        self.fileobj.write(pack_segment())
+
+    def write(self, mono_ns: int, frame: bytes):
+        self.fileobj.write(pack_record(mono_ns, frame))
+
+
+def index_path(path) -> Path:
+    return Path(f"{path}.idx")
+
+
+class CaptureIndex:
+    """Dünn besetzter Zeitindex, wird parallel zur Aufzeichnung fortgeschrieben."""
+
+    def __init__(self, path, interval_ns: int = INDEX_INTERVAL_NS):
+        self.interval_ns = interval_ns
+        self._last_wall_ns = None
+        self._file = open(index_path(path), "ab")
+        if self._file.tell() == 0:
+            self._file.write(INDEX_MAGIC)
+
+    def add(self, wall_ns: int, mono_ns: int, offset: int, force: bool = False):
+        """Eintrag für einen Record am Offset, wenn seit dem letzten Eintrag interval_ns vergangen sind."""
+        if force or self._last_wall_ns is None or wall_ns - self._last_wall_ns >= self.interval_ns:
+            self._file.write(INDEX_ENTRY.pack(wall_ns, mono_ns, offset))
+            self._last_wall_ns = wall_ns
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_index(path) -> list:
+    """Liefert die Einträge [(wall_ns, mono_ns, offset), ...] oder eine leere Liste ohne (gültigen) Index."""
+    try:
+        with open(index_path(path), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    if not data.startswith(INDEX_MAGIC):
+        return []
+    body = data[len(INDEX_MAGIC):]
+    body = body[:len(body) - len(body) % INDEX_ENTRY.size]
+    return list(INDEX_ENTRY.iter_unpack(body))
+
+
+def compress_indexed(source, target, chunk_size: int = 1024 * 1024):
+    """
+    Komprimiert eine Aufzeichnung nach gzip, mit einem gzip-Member je Indexblock.
+
+    Der Index wird mit den Offsets im komprimierten File nach <target>.idx übernommen,
+    die Quelle und ihr Index werden anschließend gelöscht.
+    """
+    entries = read_index(source)
+    size = os.path.getsize(source)
+    starts = sorted({0} | {offset for _, _, offset in entries if offset < size})
+    compressed = {}
+    with open(source, "rb") as f_in, open(target, "wb") as f_out:
+        for i, block_start in enumerate(starts):
+            block_end = starts[i + 1] if i + 1 < len(starts) else size
+            compressed[block_start] = f_out.tell()
+            f_in.seek(block_start)
+            remaining = block_end - block_start
+            with gzip.GzipFile(fileobj=f_out, mode="wb") as member:
+                while remaining > 0:
+                    chunk = f_in.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    member.write(chunk)
+                    remaining -= len(chunk)
+    if len(entries) > 0:
+        with open(index_path(target), "wb") as f:
+            f.write(INDEX_MAGIC)
+            for wall_ns, mono_ns, offset in entries:
+                if offset in compressed:
+                    f.write(INDEX_ENTRY.pack(wall_ns, mono_ns, compressed[offset]))
+    Path(source).unlink()
+    index_path(source).unlink(missing_ok=True)
+
+
+def _read_capture(fileobj, offset=None):
+    header = RECORD.size
+    while True:
+        head = fileobj.read(header)
+        if len(head) < header:
+            return
+        length, mono_ns = RECORD.unpack(head)
+        if length == 0:
+            wall = fileobj.read(SEGMENT.size)
+            if len(wall) < SEGMENT.size:
+                return
+            offset = SEGMENT.unpack(wall)[0] - mono_ns
+            continue
+        frame = fileobj.read(length)
+        if len(frame) < length:
+            return  # abgeschnittener letzter Record, z.B. während noch geschrieben wird
+        yield (mono_ns + offset) / 1e9 if offset is not None else mono_ns / 1e9, mono_ns, frame
+
+
+def _read_text(fileobj):
+    for line in io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace"):
+        parsed = parse_text_line(line)
+        if parsed is not None:
+            ts, frame = parsed
+            yield ts, int(ts * 1e9), frame
+
+
+def _compression(path):
+    with open(path, "rb") as raw:
+        magic = raw.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gz"
+    if magic == ZSTD_MAGIC:
+        return "zst"
+    return None
+
+
+def _stream(raw, compression):
+    if compression == "gz":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "zst":
+        return io.BufferedReader(_zstd().ZstdDecompressor().stream_reader(raw, closefd=False))
+    return raw
+
+
+def read_packets(path, start: float = None, end: float = None):
+    """
+    Liefert (Wanduhrzeit in s, monotone Zeit in ns, Frame) für jedes Paket aus einem Binär- oder Textlog.
+
+    Format und Kompression werden am Dateiinhalt erkannt. Bei Textlogs entspricht die
+    monotone Zeit der Wanduhrzeit, da dort nur diese aufgezeichnet ist. Mit start/end
+    (Wanduhrzeit in s) wird nur dieses Zeitfenster geliefert, existiert ein Index, wird
+    direkt an den Anfang des Fensters gesprungen. zstd Dateien werden immer von vorn gelesen.
+    """
+    compression = _compression(path)
+    with open(path, "rb") as raw:
+        stream = _stream(raw, compression)
+        binary = stream.peek(len(MAGIC))[:len(MAGIC)] == MAGIC
+        offset = None
+
+        entries = read_index(path) if start is not None and compression != "zst" else []
+        pos = bisect.bisect_right([wall_ns for wall_ns, _, _ in entries], int(start * 1e9)) - 1 if len(entries) > 0 else -1
+        if pos >= 0:
+            wall_ns, mono_ns, file_offset = entries[pos]
+            raw.seek(file_offset)
+            stream = _stream(raw, compression)
+            offset = wall_ns - mono_ns
+        elif binary:
+            stream.read(len(MAGIC))
+
+        packets = _read_capture(stream, offset) if binary else _read_text(stream)
+        for packet in packets:
+            if start is not None and packet[0] < start:
+                continue
+            if end is not None and packet[0] > end:
+                break
+            yield packet
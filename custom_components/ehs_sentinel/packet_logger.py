@@ -0,0 +1,215 @@
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from .packet_capture import MAGIC, CaptureIndex, compress_indexed, format_text_line, pack_record, pack_segment
+
+_LOGGER = logging.getLogger(__name__)
+
+ROTATION_NICE = 10  # niedrigere Priorität für den Kompressions-Thread (nur Linux, sonst ignoriert)
+
+
+class RotationWorker(threading.Thread):
+    """
+    Komprimiert umbenannte Logs des Vortags im Hintergrund zu .gz und räumt alte Dateien auf.
+
+    Läuft mit niedriger Priorität, damit das Schreiben neuer Pakete nie auf die Kompression wartet.
+    """
+
+    def __init__(self, path: Path, backup_count: int):
+        super().__init__(name="EHSSentinelLogRotation", daemon=True)
+        self.path = path
+        self.backup_count = backup_count
+        self.compressed = 0
+        self._jobs = queue.Queue()
+
+    def submit(self, rotated: Path):
+        self._jobs.put(rotated)
+
+    def stop(self, timeout: float = 1):
+        """Nicht fertig komprimierte Dateien werden beim nächsten Start übernommen."""
+        self._jobs.put(None)
+        self.join(timeout)
+
+    def pending(self) -> list:
+        """Umbenannte, noch nicht komprimierte Dateien, z.B. nach einem Neustart während der Kompression."""
+        pattern = re.compile(rf"^{re.escape(self.path.name)}\.\d{{4}}-\d{{2}}-\d{{2}}$")
+        return sorted(p for p in self.path.parent.glob(f"{self.path.name}.*") if pattern.match(p.name))
+
+    def run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), ROTATION_NICE)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            rotated = self._jobs.get()
+            if rotated is None:
+                break
+            try:
+                target = rotated.with_name(f"{rotated.name}.gz")
+                started = time.monotonic()
+                compress_indexed(rotated, target)  # löscht Original und Index
+                self.compressed += 1
+                _LOGGER.debug("Compressed %s in %.1fs", target, time.monotonic() - started)
+                self._cleanup()
+            except Exception:
+                _LOGGER.exception("Error while compressing %s", rotated)
+
+    def _cleanup(self):
+        rotated = sorted(self.path.parent.glob(f"{self.path.name}.*.gz"))
+        for old in rotated[:-self.backup_count] if self.backup_count > 0 else []:
+            old.unlink()
+            old.with_name(f"{old.name}.idx").unlink(missing_ok=True)
+
+
+class PacketLogger(threading.Thread):
+    """
+    Schreibt empfangene Rohpakete in einem eigenen Thread nach packet.log bzw. packet.ehscap.
+
+    Der Event-Loop hängt nur (monotone Zeit in ns, Bytes) an eine deque an, append/popleft sind ohne
+    zusätzliches Lock threadsicher. Formatierung und gepuffertes Schreiben laufen komplett in diesem
+    Thread. Zur täglichen Rotation wird nur umbenannt (packet.log.YYYY-MM-DD), die Kompression nach .gz
+    übernimmt der RotationWorker im Hintergrund. Geschrieben wird gesammelt,
+    sobald flush_size Pakete anstehen oder spätestens nach flush_interval Sekunden.
+    Mit binary=True wird das Binärformat aus packet_capture statt Hex-Text geschrieben. Zu jeder
+    Datei wird ein Zeitindex (.idx) geführt, rotierte Dateien bleiben darüber per gzip-Member durchsuchbar.
+    """
+
+    def __init__(self, path: Path, binary: bool = False, flush_interval: float = 1.0, flush_size: int = 256, max_queue: int = 10000, backup_count: int = 3):
+        super().__init__(name="EHSSentinelPacketLogger", daemon=True)
+        self.path = Path(path)
+        self.binary = binary
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_queue = max_queue
+        self.backup_count = backup_count
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._file = None
+        self._file_date = None
+        self._index = None
+        self._offset = 0
+        self._segment_offset = None  # Wanduhr - monotone Zeit in ns aus dem Segment-Marker der offenen Datei
+        self._rotation = RotationWorker(self.path, backup_count)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def log(self, packet: bytes):
+        """Aus dem Event-Loop aufrufen, blockiert nie."""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append((time.monotonic_ns(), bytes(packet)))
+        if len(self._queue) >= self.flush_size:
+            self._wakeup.set()
+
+    def stop(self, timeout: float = 5):
+        """Restliche Pakete schreiben und den Thread beenden (blockierend, im Executor aufrufen)."""
+        self._stopping = True
+        self._wakeup.set()
+        self.join(timeout)
+        self._rotation.stop()
+
+    def stats(self) -> dict:
+        return {"queued": self.queue_depth, "written": self.written, "dropped": self.dropped, "batches": self.batches, "compressed": self._rotation.compressed}
+
+    def run(self):
+        self._rotation.start()
+        for rotated in self._rotation.pending():
+            self._rotation.submit(rotated)
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._write_batch()
+            except Exception:
+                _LOGGER.exception("Error while writing packet log")
+            if self._stopping and len(self._queue) == 0:
+                break
+        self._close()
+
+    def _write_batch(self):
+        count = len(self._queue)
+        if count == 0:
+            return
+        # Zeitstempel und Index mit dem Offset des Segment-Markers, so wie ihn auch read_packets verwendet
+        offset = self._segment_offset if self._file is not None else time.time_ns() - time.monotonic_ns()
+        records = []
+        for _ in range(count):
+            mono_ns, packet = self._queue.popleft()
+            ts = (mono_ns + offset) / 1e9
+            date = datetime.fromtimestamp(ts).date()
+            if date != self._file_date:
+                self._write_records(records)
+                records = []
+                self._open(date)
+                offset = self._segment_offset
+                ts = (mono_ns + offset) / 1e9
+            if self.binary:
+                record = pack_record(mono_ns, packet)
+            else:
+                record = format_text_line(ts, packet).encode()
+            self._index.add(mono_ns + offset, mono_ns, self._offset)
+            self._offset += len(record)
+            records.append(record)
+        self._write_records(records)
+        self._file.flush()
+        self._index.flush()
+        self.batches += 1
+
+    def _write_records(self, records: list):
+        if len(records) > 0:
+            self._file.write(b"".join(records))
+            self.written += len(records)
+
+    def _open(self, date):
+        """Öffnet packet.log für das Datum und rotiert eine Datei vom Vortag."""
+        file_date = self._file_date
+        self._close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if file_date is None:
+                # beim Start zählt das Datum der letzten Änderung
+                file_date = datetime.fromtimestamp(self.path.stat().st_mtime).date()
+            if file_date != date:
+                self._rotate(file_date)
+        self._file = open(self.path, "ab", buffering=64 * 1024)
+        self._file_date = date
+        mono_ns, wall_ns = time.monotonic_ns(), time.time_ns()
+        self._segment_offset = wall_ns - mono_ns
+        if self.binary:
+            if self._file.tell() == 0:
+                self._file.write(MAGIC)
+            self._file.write(pack_segment(mono_ns, wall_ns))
+        self._offset = self._file.tell()
+        self._index = CaptureIndex(self.path)
+
+    def _rotate(self, file_date):
+        # nur umbenennen, damit sofort weitergeschrieben werden kann
+        rotated = self.path.with_name(f"{self.path.name}.{file_date:%Y-%m-%d}")
+        index = self.path.with_name(f"{self.path.name}.idx")
+        self.path.rename(rotated)
+        if index.exists():
+            index.rename(rotated.with_name(f"{rotated.name}.idx"))
+        self._rotation.submit(rotated)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_date = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import zlib
+
+from .clock import Clock
+from .adaptive_polling import AdaptiveInterval
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollGroup:
+    """Eine Gruppe aus der polling_yaml mit Intervall und nächstem Fälligkeitszeitpunkt."""
+
+    def __init__(self, name: str, period: float, freshness: float, messages: list, adaptive: dict[str, AdaptiveInterval] = None):
+        self.name = name
+        self.period = period
+        self.freshness = freshness
+        self.messages = messages
+        self.adaptive = adaptive
+        self.next_due = None
+
+    def due_messages(self, now: float) -> list:
+        """Liefert die jetzt abzufragenden Nachrichten, im adaptiven Modus nur die fälligen Adressen."""
+        if self.adaptive is None:
+            return self.messages
+        messages = [msg for msg in self.messages if self.adaptive[msg].due(now)]
+        for msg in messages:
+            self.adaptive[msg].on_poll(now)
+        return messages
+
+    def __repr__(self):
+        return f"PollGroup(name={self.name}, period={self.period}, freshness={self.freshness}, messages={len(self.messages)}, adaptive={self.adaptive is not None}, next_due={self.next_due})"
+
+
+class PollScheduler:
+    """
+    Ein einziger Task, der alle Poll-Gruppen bedient.
+
+    Gruppen mit gleichem Intervall werden gleichmäßig über ihre Periode verteilt,
+    zusätzlich mit einem deterministischen Jitter aus dem Gruppennamen, damit nicht
+    alle Gruppen in derselben Sekunde den Bus belasten.
+    """
+
+    def __init__(self, coordinator, clock: Clock = None):
+        self.coordinator = coordinator
+        self.clock = clock or Clock()
+        self.groups: dict[str, PollGroup] = {}
+        self._adaptive_index: dict[str, list[AdaptiveInterval]] = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._paused = True
+
+    def configure(self, polling_yaml: dict | None):
+        """Übernimmt die Gruppen aus der polling_yaml, ohne den Scheduler-Task neu zu starten."""
+        new_groups = {}
+        if polling_yaml:
+            for poller in polling_yaml.get('fetch_interval', []) or []:
+                if not poller.get('enable', False):
+                    continue
+                name = poller['name']
+                period = self.coordinator.parse_time_string(poller['schedule'])
+                freshness = self.coordinator.parse_time_string(poller['freshness']) if poller.get('freshness') else 0
+                messages = list(dict.fromkeys((polling_yaml.get('groups', {}) or {}).get(name, []) or []))
+                old_group = self.groups.get(name)
+
+                adaptive = None
+                if poller.get('adaptive', False):
+                    adaptive = self._build_adaptive(poller, messages, period, old_group)
+                    # im adaptiven Modus tickt die Gruppe mit dem kleinsten Intervall ihrer Adressen
+                    period = min([interval.min_interval for interval in adaptive.values()], default=period)
+
+                group = PollGroup(name, period, freshness, messages, adaptive)
+                if old_group is not None and old_group.period == period:
+                    group.next_due = old_group.next_due
+                new_groups[name] = group
+
+        self.groups = new_groups
+        self._adaptive_index = {}
+        for group in self.groups.values():
+            for msg, interval in (group.adaptive or {}).items():
+                self._adaptive_index.setdefault(msg, []).append(interval)
+        self._stagger([group for group in self.groups.values() if group.next_due is None])
+        _LOGGER.info("Poll scheduler configured with groups: %s", list(self.groups.values()))
+        self._wakeup.set()
+
+    def _build_adaptive(self, poller: dict, messages: list, period: float, old_group: PollGroup | None) -> dict[str, AdaptiveInterval]:
+        """Erzeugt die adaptiven Intervalle je Adresse, bestehender Zustand bleibt bei Neukonfiguration erhalten."""
+        min_interval = self.coordinator.parse_time_string(poller['min_interval']) if poller.get('min_interval') else period
+        max_interval = self.coordinator.parse_time_string(poller['max_interval']) if poller.get('max_interval') else min_interval * 16
+        overrides = poller.get('overrides', {}) or {}
+
+        adaptive = {}
+        for msg in messages:
+            override = overrides.get(msg, {}) or {}
+            msg_min = self.coordinator.parse_time_string(override['min_interval']) if override.get('min_interval') else min_interval
+            msg_max = self.coordinator.parse_time_string(override['max_interval']) if override.get('max_interval') else max(max_interval, msg_min)
+
+            interval = (old_group.adaptive or {}).get(msg) if old_group is not None else None
+            if interval is not None:
+                interval.set_bounds(msg_min, msg_max)
+            else:
+                interval = AdaptiveInterval(msg_min, msg_max)
+            adaptive[msg] = interval
+        return adaptive
+
+    def observe(self, msgname: str, value):
+        """Meldet einen empfangenen Wert an die adaptiven Intervalle der Adresse."""
+        intervals = self._adaptive_index.get(msgname)
+        if intervals:
+            now = self.clock.monotonic()
+            for interval in intervals:
+                interval.on_value(value, now)
+
+    def adaptive_summary(self) -> dict:
+        """Minimales, mittleres und maximales aktuelles Intervall je adaptiver Gruppe (für Diagnostics)."""
+        summary = {}
+        for group in self.groups.values():
+            if group.adaptive:
+                intervals = [interval.interval for interval in group.adaptive.values()]
+                summary[group.name] = (min(intervals), round(sum(intervals) / len(intervals)), max(intervals))
+        return summary
+
+    def _stagger(self, groups: list[PollGroup]):
+        """Verteilt die Startzeitpunkte der Gruppen gleichmäßig über ihre Periode."""
+        now = self.clock.monotonic()
+        by_period = {}
+        for group in self.groups.values():
+            by_period.setdefault(group.period, []).append(group)
+
+        for period, members in by_period.items():
+            members.sort(key=lambda g: g.name)
+            slot = period / len(members)
+            for index, group in enumerate(members):
+                if group not in groups:
+                    continue
+                # deterministischer Jitter innerhalb der ersten Hälfte des Slots
+                jitter = (zlib.crc32(group.name.encode()) / 0xFFFFFFFF) * slot * 0.5
+                group.next_due = now + index * slot + jitter
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="EHSSentinelCoordinator.PollScheduler")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                _LOGGER.info("Poll scheduler task cancelled")
+            self._task = None
+
+    def pause(self):
+        self._paused = True
+        self._wakeup.set()
+
+    def resume(self):
+        """Setzt das Polling fort, überfällige Gruppen werden neu verteilt statt gleichzeitig gesendet."""
+        now = self.clock.monotonic()
+        self._stagger([group for group in self.groups.values() if group.next_due is None or group.next_due <= now])
+        self._paused = False
+        self._wakeup.set()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def _next_group(self) -> PollGroup | None:
+        if len(self.groups) == 0:
+            return None
+        return min(self.groups.values(), key=lambda g: g.next_due)
+
+    async def _wait(self, delay: float | None):
+        """Wartet bis delay abgelaufen ist oder configure/pause/resume den Scheduler aufweckt."""
+        if self._wakeup.is_set():
+            self._wakeup.clear()
+            return
+
+        waiters = {asyncio.ensure_future(self._wakeup.wait())}
+        if delay is not None:
+            waiters.add(asyncio.ensure_future(self.clock.sleep(delay)))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+        self._wakeup.clear()
+
+    async def _run(self):
+        _LOGGER.info("Starting poll scheduler")
+        try:
+            while self.coordinator.running:
+                group = self._next_group()
+                if self._paused or group is None:
+                    await self._wait(None)
+                    continue
+
+                now = self.clock.monotonic()
+                if group.next_due > now:
+                    await self._wait(group.next_due - now)
+                    continue
+
+                group.next_due += group.period
+                if group.next_due <= now:
+                    group.next_due = now + group.period
+
+                messages = group.due_messages(now)
+                if len(messages) == 0:
+                    continue
+
+                try:
+                    await self.coordinator.poll_group(group.name, messages, group.freshness)
+                except (ConnectionResetError, BrokenPipeError, OSError) as e:
+                    _LOGGER.warning("Polling '%s': TCP connection lost: %s", group.name, e)
+                except Exception:
+                    _LOGGER.exception("Polling '%s': Unexpected error", group.name)
+        except asyncio.CancelledError:
+            _LOGGER.info("Poll scheduler cancelled")
+            raise
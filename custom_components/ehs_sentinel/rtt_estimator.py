@@ -0,0 +1,74 @@
+import random
+
+
+class RttEstimator:
+    """
+    Antwortzeit-Schätzung für ein Ziel nach dem TCP RTO Verfahren (RFC 6298).
+
+    Mittelwert (srtt) und Abweichung (rttvar) werden als EWMA geführt,
+    der Timeout ergibt sich aus srtt + 4 * rttvar und wird auf [min_rto, max_rto] begrenzt.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, initial_rto: float = 4.0, min_rto: float = 0.3, max_rto: float = 10.0):
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_rto
+        self.samples = 0
+        self.timeouts = 0
+
+    def add_sample(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.rto = min(max(self.srtt + self.K * self.rttvar, self.min_rto), self.max_rto)
+        self.samples += 1
+
+    def on_timeout(self):
+        self.timeouts += 1
+
+    def timeout(self, attempt: int = 0) -> float:
+        """Timeout für den n-ten Versuch, bei Wiederholungen exponentiell verdoppelt."""
+        return min(self.rto * (2 ** attempt), self.max_rto)
+
+    def as_dict(self) -> dict:
+        return {
+            "srtt": round(self.srtt, 3) if self.srtt is not None else None,
+            "rttvar": round(self.rttvar, 3) if self.rttvar is not None else None,
+            "rto": round(self.rto, 3),
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+        }
+
+
+class RttTracker:
+    """Führt je Ziel-Adresse einen eigenen RttEstimator."""
+
+    def __init__(self, initial_rto: float = 4.0, min_rto: float = 0.3, max_rto: float = 10.0):
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self._estimators: dict[str, RttEstimator] = {}
+
+    def get(self, destination: str) -> RttEstimator:
+        estimator = self._estimators.get(destination)
+        if estimator is None:
+            estimator = RttEstimator(self.initial_rto, self.min_rto, self.max_rto)
+            self._estimators[destination] = estimator
+        return estimator
+
+    def stats(self) -> dict:
+        return {destination: estimator.as_dict() for destination, estimator in self._estimators.items()}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Wartezeit vor einer Wiederholung: exponentielles Backoff mit vollem Jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -19,6 +19,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
         entity = EHSSentinelSelect(coordinator, key, nasa_name=value.get('nasa_name', ))
         entity.entity_id = entity_id  # explizit hier setzen
         entities.append(entity)
+        coordinator.data[PLATFORM_SELECT][key]['_entity'] = entity  # speichere die entity im coordinator.data
     async_add_entities(entities)
 
 class EHSSentinelSelect(CoordinatorEntity, SelectEntity, RestoreEntity):
@@ -0,0 +1,275 @@
+import asyncio
+import itertools
+import logging
+from datetime import datetime, timezone
+
+from .clock import ReplayClock
+from .const import PLATFORM_SENSOR
+from .message_processor import COP_MAP, DELTA_SOURCES, MessageProcessor
+from .nasa_packet import NASAPacket, AddressClassEnum
+from .packet_capture import read_packets
+
+_LOGGER = logging.getLogger(__name__)
+
+EHS_STATISTICS_READ_BATCH = 2000  # Frames je Executor-Aufruf beim Lesen der Aufzeichnung
+EHS_STATISTICS_IMPORT_BATCH = 1000  # Stunden je async_import_statistics Aufruf
+SUM_STATE_CLASSES = ("total", "total_increasing")
+
+# Standardziele: die vom MessageProcessor berechneten Energie-, Minuten- und COP-Sensoren
+DEFAULT_STATISTICS_KEYS = [key for targets in DELTA_SOURCES.values() for key in targets] + [key for key in COP_MAP if key != "NASA_EHSSENTINEL_COP"]
+
+# Nachrichten, aus denen der MessageProcessor diese Sensoren berechnet, alle anderen werden beim Replay übersprungen
+DERIVED_INPUTS = {*DELTA_SOURCES, *(key for pair in COP_MAP.values() for key in pair), "NASA_DHW_VALVE", "ENUM_IN_FSV_3011"}
+
+
+def statistics_keys(nasa_repo: dict) -> list:
+    """Erlaubte Ziele: die berechneten Sensoren und die Zähler mit state_class total(_increasing)."""
+    counters = [
+        key for key, value in nasa_repo.items()
+        if isinstance(value, dict) and value.get("hass_opts", {}).get("state_class") in SUM_STATE_CLASSES
+    ]
+    return DEFAULT_STATISTICS_KEYS + [key for key in counters if key not in DEFAULT_STATISTICS_KEYS]
+
+
+class HourlyAggregator:
+    """Sammelt Werte je Sensor in Stundenbuckets: Mittelwert/Min/Max, bei total(_increasing) Stand und Summe."""
+
+    def __init__(self, has_sum: dict):
+        self.has_sum = has_sum
+        self.hours = {key: {} for key in has_sum}
+        self._sum = {key: 0.0 for key in has_sum}
+        self._last = {}
+
+    def add(self, key, value, ts: float):
+        if key not in self.hours or not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        hour = int(ts // 3600) * 3600
+        bucket = self.hours[key].get(hour)
+        if bucket is None:
+            bucket = self.hours[key][hour] = {"count": 0, "total": 0.0, "min": value, "max": value}
+        bucket["count"] += 1
+        bucket["total"] += value
+        bucket["min"] = min(bucket["min"], value)
+        bucket["max"] = max(bucket["max"], value)
+        if self.has_sum[key]:
+            last = self._last.get(key)
+            if last is not None:
+                # wie der Recorder bei total_increasing: ein kleinerer Wert ist ein Reset, der neue Wert zählt voll
+                self._sum[key] += value - last if value >= last else value
+            self._last[key] = value
+            bucket["state"] = value
+            bucket["sum"] = self._sum[key]
+
+    def statistics(self, key) -> list:
+        rows = []
+        for hour, bucket in sorted(self.hours[key].items()):
+            start = datetime.fromtimestamp(hour, tz=timezone.utc)
+            if self.has_sum[key]:
+                rows.append({"start": start, "state": bucket["state"], "sum": round(bucket["sum"], 3)})
+            else:
+                rows.append({"start": start, "mean": round(bucket["total"] / bucket["count"], 3), "min": bucket["min"], "max": bucket["max"]})
+        return rows
+
+
+class ReplaySink:
+    """
+    Ersetzt den Coordinator für einen eigenen MessageProcessor, der eine Aufzeichnung nachrechnet.
+
+    Die Uhr folgt den Zeitstempeln der Aufzeichnung, die Werte landen nur in data und im
+    Aggregator, Entities und der Zustand des laufenden Coordinators bleiben unberührt.
+    """
+
+    def __init__(self, coordinator, aggregator: HourlyAggregator, start: float):
+        self.coordinator = coordinator
+        self.aggregator = aggregator
+        self.clock = ReplayClock(start=start)
+        self.nasa_repo = coordinator.nasa_repo
+        self.writemode = coordinator.writemode
+        self.extended_logging = False
+        self.force_refresh = False
+        self.data = {}
+
+    async def determine_value(self, rawvalue, msgname, packet_message_type):
+        return await self.coordinator.determine_value(rawvalue, msgname, packet_message_type)
+
+    async def update_data_safe(self, parsed):
+        ts = self.clock.time()
+        for category, values in parsed.items():
+            platform = self.data.setdefault(category, {})
+            for key, val_dict in values.items():
+                platform.setdefault(key, {}).update(val_dict)
+                self.aggregator.add(val_dict.get("nasa_name"), val_dict.get("value"), ts)
+
+    def mark_seen(self, msgname, value=None):
+        pass
+
+    def confirm_write(self, msgname, value):
+        pass
+
+    def confirm_read(self, msgname):
+        pass
+
+
+def _read_batch(packets, size: int) -> list:
+    return list(itertools.islice(packets, size))
+
+
+async def async_aggregate_capture(hass, coordinator, path, keys: list, start: float = None, end: float = None) -> tuple:
+    """
+    Streamt eine Aufzeichnung durch einen eigenen MessageProcessor und aggregiert stündlich.
+
+    Gelesen wird im Executor in Blöcken von EHS_STATISTICS_READ_BATCH Frames, zwischen den
+    Blöcken kommt die Event-Loop wieder dran. Liefert (HourlyAggregator, Anzahl Frames).
+    """
+    nasa_repo = coordinator.nasa_repo
+    has_sum = {key: nasa_repo[key].get("hass_opts", {}).get("state_class") in SUM_STATE_CLASSES for key in keys}
+    aggregator = HourlyAggregator(has_sum)
+    relevant = {int(nasa_repo[key]["address"], 16) for key in DERIVED_INPUTS | set(keys) if key in nasa_repo}
+
+    packets = await hass.async_add_executor_job(read_packets, path, start, end)
+    sink = None
+    processor = None
+    frames = 0
+    try:
+        while True:
+            batch = await hass.async_add_executor_job(_read_batch, packets, EHS_STATISTICS_READ_BATCH)
+            if len(batch) == 0:
+                break
+            for ts, _, frame in batch:
+                if sink is None:
+                    sink = ReplaySink(coordinator, aggregator, ts)
+                    processor = MessageProcessor(hass, sink)
+                sink.clock.advance(ts)
+                frames += 1
+                packet = NASAPacket()
+                try:
+                    packet.parse(bytearray(frame))
+                except Exception:
+                    continue
+                if packet.packet_source_address_class not in (AddressClassEnum.Outdoor, AddressClassEnum.Indoor):
+                    continue
+                packet.packet_messages = [msg for msg in packet.packet_messages if msg.packet_message in relevant]
+                if len(packet.packet_messages) > 0:
+                    await processor.process_message(packet)
+            await asyncio.sleep(0)
+    finally:
+        await hass.async_add_executor_job(packets.close)
+    return aggregator, frames
+
+
+def _existing_start(row) -> float:
+    start = row["start"]
+    return start.timestamp() if isinstance(start, datetime) else start
+
+
+def merge_with_existing(rows: list, existing: list, has_sum: bool) -> tuple:
+    """
+    Gleicht berechnete Stunden mit den schon vorhandenen Statistiken ab.
+
+    Vorhandene Stunden bleiben unverändert und werden übersprungen. Bei Summen läuft der Import
+    ab dem letzten vorhandenen Wert weiter statt bei 0. Beginnen die vorhandenen Statistiken erst
+    nach dem Anfang des Logs, müssen sie um die davor importierte Menge verschoben werden.
+    Liefert (neue Stunden, Verschiebung der vorhandenen Summen ab deren erster Stunde).
+    """
+    existing_sum = {_existing_start(row): row.get("sum") for row in existing}
+    if not has_sum:
+        return [row for row in rows if row["start"].timestamp() not in existing_sum], 0.0
+
+    first_existing = min(existing_sum, default=None)
+    adjustment = 0.0
+    if first_existing is not None and rows[0]["start"].timestamp() < first_existing:
+        before = [row["sum"] for row in rows if row["start"].timestamp() < first_existing]
+        adjustment = before[-1]
+
+    result = []
+    offset = 0.0
+    local = 0.0  # eigene Summe der zuletzt gesehenen Stunde
+    hours = {row["start"].timestamp(): row for row in rows}
+    for hour in sorted(hours.keys() | existing_sum.keys()):
+        row = hours.get(hour)
+        if row is not None:
+            local = row["sum"]
+        if hour in existing_sum:
+            if existing_sum[hour] is not None:
+                # nachfolgende Stunden setzen auf der vorhandenen Summe auf
+                offset = existing_sum[hour] + adjustment - local
+            continue
+        result.append({**row, "sum": round(offset + local, 3)})
+    return result, adjustment
+
+
+async def async_existing_statistics(hass, statistic_id: str, has_sum: bool) -> list:
+    """Liest die vorhandenen Stundenstatistiken eines Sensors im Executor des Recorders."""
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import statistics_during_period
+
+    result = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        datetime.fromtimestamp(0, tz=timezone.utc),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"sum"} if has_sum else {"mean"},
+    )
+    return result.get(statistic_id, [])
+
+
+async def async_import_capture_statistics(hass, coordinator, path, keys: list = None, start: float = None, end: float = None) -> dict:
+    """
+    Berechnet die Stundenstatistiken aus einer Aufzeichnung und importiert sie gebündelt in den Recorder.
+
+    Schon vorhandene Stunden werden nicht überschrieben, siehe merge_with_existing.
+    """
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import async_import_statistics
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        StatisticMeanType = None  # ältere Home Assistant Versionen kennen nur has_mean
+
+    keys = [key for key in (keys or DEFAULT_STATISTICS_KEYS) if key in coordinator.nasa_repo]
+    entities = {
+        value.get("nasa_name"): value.get("_entity")
+        for value in coordinator.data.get(PLATFORM_SENSOR, {}).values()
+        if value.get("_entity") is not None
+    }
+    missing = [key for key in keys if key not in entities]
+    keys = [key for key in keys if key in entities]
+    aggregator, frames = await async_aggregate_capture(hass, coordinator, path, keys, start, end)
+
+    imported = {}
+    for key in keys:
+        rows = aggregator.statistics(key)
+        if len(rows) == 0:
+            continue
+        entity_id = entities[key].entity_id
+        has_sum = aggregator.has_sum[key]
+        unit = coordinator.nasa_repo[key].get("hass_opts", {}).get("unit")
+        existing = await async_existing_statistics(hass, entity_id, has_sum)
+        rows, adjustment = merge_with_existing(rows, existing, has_sum)
+        if len(rows) == 0:
+            continue
+        metadata = {
+            "has_sum": has_sum,
+            "name": None,
+            "source": "recorder",
+            "statistic_id": entity_id,
+            "unit_of_measurement": unit,
+        }
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC
+        else:
+            metadata["has_mean"] = not has_sum
+        if adjustment != 0:
+            # vor dem Import einreihen, die neuen Stunden nach first_existing enthalten die Verschiebung schon
+            first_existing = datetime.fromtimestamp(min(_existing_start(row) for row in existing), tz=timezone.utc)
+            get_instance(hass).async_adjust_statistics(entity_id, first_existing, adjustment, unit)
+            _LOGGER.info("Shifted existing statistics of %s from %s by %s", entity_id, first_existing, adjustment)
+        for i in range(0, len(rows), EHS_STATISTICS_IMPORT_BATCH):
+            async_import_statistics(hass, metadata, rows[i:i + EHS_STATISTICS_IMPORT_BATCH])
+        imported[entity_id] = len(rows)
+        _LOGGER.info("Imported %s hourly statistics for %s from %s", len(rows), entity_id, path)
+
+    return {"frames": frames, "imported": imported, "missing": missing}
@@ -0,0 +1,58 @@
+import logging
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.value_snapshot"
+
+
+class ValueSnapshot:
+    """
+    Letzte bekannte Werte der NASA Nachrichten mit Zeitstempel, abgelegt im Home Assistant Storage.
+
+    Beim Start stehen die Werte damit sofort zur Verfügung, neu gelesen werden müssen
+    nur Einträge, die fehlen oder zu alt sind.
+    """
+
+    def __init__(self, hass, clock):
+        self.clock = clock
+        self.values = {}
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._dirty = False
+
+    def update(self, msgname, value):
+        self.values[msgname] = (value, self.clock.time())
+        self._dirty = True
+
+    def age(self, msgname):
+        """Alter des Eintrags in Sekunden oder None, wenn es keinen gibt."""
+        entry = self.values.get(msgname)
+        if entry is None:
+            return None
+        return max(self.clock.time() - entry[1], 0)
+
+    async def async_load(self) -> int:
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Could not load value snapshot: %s", e)
+            return 0
+        if not data:
+            return 0
+        self.values = {msgname: (entry[0], entry[1]) for msgname, entry in data.get("values", {}).items()}
+        self._dirty = False
+        return len(self.values)
+
+    async def async_save(self, force=False):
+        if not self._dirty and not force:
+            return
+        self._dirty = False
+        try:
+            await self._store.async_save({"values": {msgname: [value, ts] for msgname, (value, ts) in self.values.items()}})
+        except Exception as e:
+            self._dirty = True
+            _LOGGER.warning("Could not save value snapshot: %s", e)
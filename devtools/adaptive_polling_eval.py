@@ -0,0 +1,198 @@
+import argparse
+import math
+import os
+import re
+import statistics
+from datetime import datetime
+
+import yaml
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket, AddressClassEnum
+from custom_components.ehs_sentinel.adaptive_polling import AdaptiveInterval
+from custom_components.ehs_sentinel.const import DEFAULT_POLLING_YAML
+from custom_components.ehs_sentinel.packet_capture import read_packets
+
+# Vergleicht festes Polling mit adaptivem Polling anhand aufgezeichneter packet.log Dateien.
+# Aus den Logs wird je gepollter Adresse der Werteverlauf rekonstruiert. Beide Strategien werden
+# darüber simuliert und es wird ausgegeben, wie viele Read-Frames gesendet werden und wie lange es
+# dauert, bis eine Wertänderung durch einen Poll erkannt wird (Passiv empfangene Broadcasts zählen nicht).
+#
+# python -m devtools.adaptive_polling_eval packet.log.2026-06-21.gz packet.log.2026-06-22.gz ... packet.log
+# python -m devtools.adaptive_polling_eval packet.log --polling-yaml my_polling.yaml --min-interval 5m --max-interval 12h
+
+REPOSITORY_FILE = os.path.join("custom_components", "ehs_sentinel", "data", "nasa_repository.yml")
+CHUNKSIZE = 10  # entspricht MessageProducer._CHUNKSIZE
+
+
+def parse_time_string(time_str: str) -> int:
+    match = re.match(r'^(\d+)([smh])$', time_str.strip(), re.IGNORECASE)
+    if not match:
+        raise ValueError("Invalid time format. Use '10s', '10m', or '10h'.")
+    return int(match.group(1)) * {'s': 1, 'm': 60, 'h': 3600}[match.group(2).lower()]
+
+
+def read_value_history(logfiles, address_to_name):
+    """Liefert je Nachricht eine nach Zeit sortierte Liste von (timestamp, payload)."""
+    history = {}
+    for logfile in logfiles:
+        for ts, mono_ns, frame in read_packets(logfile):
+            packet = NASAPacket()
+            try:
+                packet.parse(bytearray(frame))
+            except Exception:
+                continue
+            if packet.packet_source_address_class not in (AddressClassEnum.Indoor, AddressClassEnum.Outdoor):
+                continue
+            for msg in packet.packet_messages:
+                msgname = address_to_name.get(msg.packet_message)
+                if msgname is not None:
+                    history.setdefault(msgname, []).append((ts, bytes(msg.packet_payload)))
+
+    for values in history.values():
+        values.sort(key=lambda x: x[0])
+    return history
+
+
+class ValueTimeline:
+    """Wert einer Adresse zu einem beliebigen Zeitpunkt sowie die Zeitpunkte der Änderungen."""
+
+    def __init__(self, values):
+        self.times = []
+        self.values = []
+        for ts, value in values:
+            if len(self.values) == 0 or self.values[-1] != value:
+                self.times.append(ts)
+                self.values.append(value)
+        self.index = 0
+
+    @property
+    def changes(self):
+        return self.times[1:]
+
+    def value_at(self, ts):
+        # Abfragen erfolgen zeitlich aufsteigend, daher reicht ein laufender Index
+        while self.index + 1 < len(self.times) and self.times[self.index + 1] <= ts:
+            self.index += 1
+        if len(self.times) == 0 or self.times[0] > ts:
+            return None
+        return self.values[self.index]
+
+
+def detection_lags(timeline: ValueTimeline, poll_times: list):
+    """Zeit zwischen jeder Wertänderung und dem ersten Poll danach."""
+    lags = []
+    poll_index = 0
+    for change in timeline.changes:
+        while poll_index < len(poll_times) and poll_times[poll_index] < change:
+            poll_index += 1
+        if poll_index < len(poll_times):
+            lags.append(poll_times[poll_index] - change)
+    return lags
+
+
+def simulate_fixed(groups, schedules, start, end):
+    polls = {}
+    frames = 0
+    for group, messages in groups.items():
+        t = start
+        while t <= end:
+            frames += math.ceil(len(messages) / CHUNKSIZE)
+            for msg in messages:
+                polls.setdefault(msg, []).append(t)
+            t += schedules[group]
+    return frames, polls
+
+
+def simulate_adaptive(groups, timelines, min_interval, max_interval, start, end):
+    polls = {}
+    frames = 0
+    intervals = {msg: AdaptiveInterval(min_interval, max_interval) for messages in groups.values() for msg in messages}
+    t = start
+    while t <= end:
+        for messages in groups.values():
+            due = [msg for msg in messages if intervals[msg].due(t)]
+            frames += math.ceil(len(due) / CHUNKSIZE)
+            for msg in due:
+                # Antwort auf den Poll liefert den aktuellen Wert
+                if msg in timelines:
+                    intervals[msg].on_value(timelines[msg].value_at(t), t)
+                intervals[msg].on_poll(t)
+                polls.setdefault(msg, []).append(t)
+        t += min_interval
+    return frames, polls
+
+
+def summarize(lags):
+    if len(lags) == 0:
+        return "n/a"
+    lags = sorted(lags)
+    p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+    return f"mean={statistics.mean(lags):.0f}s p50={statistics.median(lags):.0f}s p95={p95:.0f}s max={lags[-1]:.0f}s"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay based evaluation of adaptive polling")
+    parser.add_argument("logfiles", nargs="+", help="packet.log oder packet.ehscap Dateien (auch rotierte .gz)")
+    parser.add_argument("--polling-yaml", help="Polling YAML Datei (Default: DEFAULT_POLLING_YAML)", default=None)
+    parser.add_argument("--min-interval", help="Minimales Intervall im adaptiven Modus (Default: Schedule der Gruppe)", default=None)
+    parser.add_argument("--max-interval", help="Maximales Intervall im adaptiven Modus", default="8h")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    with open(REPOSITORY_FILE, "r") as f:
+        nasa_repo = yaml.safe_load(f)
+    address_to_name = {int(v['address'], 16): k for k, v in nasa_repo.items()}
+
+    if args.polling_yaml:
+        with open(args.polling_yaml, "r") as f:
+            polling_yaml = yaml.safe_load(f)
+    else:
+        polling_yaml = yaml.safe_load(DEFAULT_POLLING_YAML)
+
+    groups = {}
+    schedules = {}
+    for poller in polling_yaml['fetch_interval']:
+        if poller.get('enable', False):
+            groups[poller['name']] = list(dict.fromkeys(polling_yaml['groups'].get(poller['name'], [])))
+            schedules[poller['name']] = parse_time_string(poller['schedule'])
+
+    min_interval = parse_time_string(args.min_interval) if args.min_interval else min(schedules.values())
+    max_interval = parse_time_string(args.max_interval)
+
+    history = read_value_history(args.logfiles, address_to_name)
+    if len(history) == 0:
+        print("No values of polled addresses found in log files!")
+        return
+
+    start = min(values[0][0] for values in history.values())
+    end = max(values[-1][0] for values in history.values())
+
+    fixed_frames, fixed_polls = simulate_fixed(groups, schedules, start, end)
+    adaptive_frames, adaptive_polls = simulate_adaptive(
+        groups, {msg: ValueTimeline(values) for msg, values in history.items()}, min_interval, max_interval, start, end
+    )
+
+    fixed_lags = []
+    adaptive_lags = []
+    changes = 0
+    for msg, values in history.items():
+        timeline = ValueTimeline(values)
+        changes += len(timeline.changes)
+        fixed_lags += detection_lags(timeline, fixed_polls.get(msg, []))
+        adaptive_lags += detection_lags(timeline, adaptive_polls.get(msg, []))
+
+    saved = fixed_frames - adaptive_frames
+    print(f"Time range: {datetime.fromtimestamp(start)} - {datetime.fromtimestamp(end)} ({(end - start) / 3600:.1f} h)")
+    print(f"Polled addresses with values: {len(history)}, value changes: {changes}")
+    print(f"Adaptive bounds: min={min_interval}s max={max_interval}s")
+    print(f"Read frames fixed:    {fixed_frames}")
+    print(f"Read frames adaptive: {adaptive_frames} (saved {saved}, {saved / fixed_frames * 100 if fixed_frames else 0:.1f}%)")
+    print(f"Detection lag fixed:    {summarize(fixed_lags)}")
+    print(f"Detection lag adaptive: {summarize(adaptive_lags)}")
+
+
+if __name__ == "__main__":
+    main()
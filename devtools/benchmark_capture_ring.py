@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import glob
+import os
+import tempfile
+import time
+
+from custom_components.ehs_sentinel.capture_ring import CaptureRing
+from custom_components.ehs_sentinel.packet_capture import format_text_line, read_packets
+from devtools.benchmark_logging import sample_frame, per_packet
+from devtools.fake_hass import FakeHass, build_coordinator
+
+# Misst die Kosten des immer aktiven Ringpuffers je Paket im Vergleich zu einer formatierten
+# packet.log Zeile und prüft den Dump bei einem Fehler in process_packet: nach einem kaputten
+# Frame muss capture_packet_error_*.ehscap die letzten Frames inklusive des kaputten enthalten.
+#
+# python -m devtools.benchmark_capture_ring --packets 100000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture ring buffer cost and dump on packet errors")
+    parser.add_argument("--packets", type=int, default=100000)
+    parser.add_argument("--capacity", type=int, default=2048)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    frame = sample_frame()
+    ring = CaptureRing(args.capacity)
+    results = {
+        "ring add": per_packet(lambda: ring.add(frame), args.packets),
+        "text line format": per_packet(lambda: format_text_line(time.time(), frame).encode(), args.packets),
+    }
+    started = time.perf_counter()
+    frames = ring.snapshot()
+    snapshot = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass)
+        for _ in range(100):
+            await coordinator.process_packet(frame)
+        broken = bytearray(frame)
+        broken[-2] ^= 0xFF  # falsche CRC
+        await coordinator.process_packet(broken)
+        await coordinator.process_packet(broken)  # innerhalb des Cooldowns kein zweiter Dump
+        dumps = glob.glob(os.path.join(config_dir, "www", "ehs_sentinel", "logs", "capture_packet_error_*.ehscap"))
+        dumped = [packet for _, _, packet in read_packets(dumps[0])] if len(dumps) == 1 else []
+        hass.shutdown()
+
+    for name, micros in results.items():
+        print(f"{name:<18} {micros:6.2f} us/packet")
+    print(f"snapshot of {len(frames)} frames: {snapshot * 1000:.1f} ms, arena {ring.capacity * ring.slot_size // 1024} KiB")
+    print(f"dump files: {len(dumps)}, frames in dump: {len(dumped)}, last frame is the broken one: {len(dumped) > 0 and dumped[-1] == bytes(broken)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
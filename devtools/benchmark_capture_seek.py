@@ -0,0 +1,94 @@
+import argparse
+import os
+import tempfile
+import time
+
+from custom_components.ehs_sentinel.packet_capture import CaptureIndex, MAGIC, compress_indexed, format_text_line, pack_record, pack_segment, read_packets
+from devtools.benchmark_logging import sample_frame
+
+# Schreibt einen synthetischen Tag an Paketen (Text und Binär, jeweils mit Index) wie der PacketLogger,
+# rotiert beide wie um Mitternacht nach .gz und misst, wie lange das Lesen eines Zeitfensters
+# mit Index (Sprung an den Fensteranfang) und ohne Index (Lesen ab Dateianfang) dauert.
+#
+# python -m devtools.benchmark_capture_seek --rate 10 --window 10m
+
+
+def write_day(path, binary: bool, rate: float, day_start: float) -> int:
+    frame = sample_frame()
+    count = int(86400 * rate)
+    mono_base = 10**12
+    index = CaptureIndex(path)
+    with open(path, "wb") as f:
+        if binary:
+            f.write(MAGIC + pack_segment(mono_base, int(day_start * 1e9)))
+        offset = f.tell()
+        chunk = []
+        for i in range(count):
+            mono_ns = mono_base + int(i / rate * 1e9)
+            wall_ns = int(day_start * 1e9) + (mono_ns - mono_base)
+            record = pack_record(mono_ns, frame) if binary else format_text_line(wall_ns / 1e9, frame).encode()
+            index.add(wall_ns, mono_ns, offset)
+            offset += len(record)
+            chunk.append(record)
+            if len(chunk) >= 10000:
+                f.write(b"".join(chunk))
+                chunk = []
+        f.write(b"".join(chunk))
+    index.close()
+    return count
+
+
+def timed_window(path, start, end, use_index: bool):
+    if not use_index:
+        os.rename(f"{path}.idx", f"{path}.idx.off")
+    try:
+        started = time.perf_counter()
+        packets = sum(1 for _ in read_packets(path, start, end))
+        return packets, (time.perf_counter() - started) * 1000
+    finally:
+        if not use_index:
+            os.rename(f"{path}.idx.off", f"{path}.idx")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time window reads from a full day capture, with and without index")
+    parser.add_argument("--rate", type=float, default=10, help="Pakete pro Sekunde")
+    parser.add_argument("--window", type=int, default=600, help="Länge des Zeitfensters in Sekunden")
+    parser.add_argument("--at", type=float, default=0.75, help="Position des Fensters im Tag (0..1)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    day_start = time.mktime(time.strptime("2026-10-18", "%Y-%m-%d"))
+    start = day_start + 86400 * args.at
+    end = start + args.window
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, binary in (("packet.log", False), ("packet.ehscap", True)):
+            path = os.path.join(tmp, name)
+            started = time.perf_counter()
+            count = write_day(path, binary, args.rate, day_start)
+            written = time.perf_counter() - started
+            size = os.path.getsize(path)
+            index_size = os.path.getsize(f"{path}.idx")
+            rotated = os.path.join(tmp, f"{name}.2026-10-18.gz")
+            started = time.perf_counter()
+            compress_indexed(path, rotated)
+            compressed = time.perf_counter() - started
+
+            print(f"{name}: {count} packets, {size / 1e6:.1f} MB (written in {written:.1f}s), index {index_size / 1e3:.1f} kB, "
+                  f".gz {os.path.getsize(rotated) / 1e6:.1f} MB (compressed in {compressed:.1f}s)")
+            for label, target in (("plain", None), ("gz", rotated)):
+                if target is None:
+                    # unkomprimierte Variante für den Vergleich wiederherstellen
+                    write_day(path, binary, args.rate, day_start)
+                    target = path
+                indexed = timed_window(target, start, end, True)
+                full = timed_window(target, start, end, False)
+                print(f"  {label:<5} {args.window}s window: {indexed[0]} packets in {indexed[1]:.1f} ms with index, "
+                      f"{full[0]} packets in {full[1]:.0f} ms without")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.benchmark_logging import sample_frame
+from devtools.fake_hass import FakeHass, build_coordinator, start_packet_workers, stop_packet_workers
+
+# Misst, was der EHSSentinelCoordinator ohne Home Assistant und Wärmepumpe verarbeiten kann.
+# Die Frames einer Aufzeichnung laufen so schnell wie möglich durch die komplette Pipeline:
+# Framing in _tcp_read, Packet-Queue und Worker, NASAPacket.parse, MessageProcessor.process_message
+# und update_data_safe. Gemessen werden Frames/s, Messages/s, die Latenz je Frame vom fertigen
+# Framing bis process_packet fertig ist (p50/p99) und der Spitzenspeicher. Damit die Queue nicht
+# überläuft, liefert der Reader erst weiter, wenn weniger als --window Frames in Arbeit sind.
+# Mit --output werden die Ergebnisse als JSON geschrieben, um Läufe zu vergleichen.
+#
+# python -m devtools.benchmark_ingest --capture packet.ehscap.2026-10-18.gz --output ingest.json
+# python -m devtools.benchmark_ingest --frames 20000
+
+
+class ReplayReader:
+    """Ersetzt den asyncio.StreamReader für _tcp_read und liefert die Bytes der Aufzeichnung."""
+
+    def __init__(self, data: bytes, inflight, window: int):
+        self.data = data
+        self.pos = 0
+        self.inflight = inflight
+        self.window = window
+
+    async def read(self, n: int = -1) -> bytes:
+        if self.pos >= len(self.data):
+            return b""
+        while self.inflight() > self.window:
+            await asyncio.sleep(0)
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+
+class TimedQueue(asyncio.Queue):
+    """Packet-Queue, die zu jedem Eintrag den Zeitpunkt des Framings mitführt."""
+
+    def __init__(self, probe, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.probe = probe
+        self.framed = deque()
+
+    def put_nowait(self, item):
+        super().put_nowait(item)
+        self.framed.append(self.probe.framed_at)
+
+    def get_nowait(self):
+        item = super().get_nowait()
+        self.probe.taken_at = self.framed.popleft()
+        return item
+
+
+class IngestProbe:
+    """Hängt sich an process_buffer/process_packet und die Queue des Coordinators und misst die Latenz je Frame."""
+
+    def __init__(self, coordinator):
+        self.buffering = 0
+        self.running = 0
+        self.done = 0
+        self.finished_at = None
+        self.framed_at = None
+        self.taken_at = None
+        self.latencies = []
+        self.queue = TimedQueue(self, coordinator._packet_queue.maxsize)
+        coordinator._packet_queue = self.queue
+        process_buffer = coordinator.process_buffer
+        process_packet = coordinator.process_packet
+
+        def timed_buffer(buffer):
+            # wird von _tcp_read beim Erzeugen des Tasks aufgerufen, also direkt nach dem Framing
+            self.buffering += 1
+            return self._buffer(process_buffer(buffer), time.perf_counter())
+
+        def timed_packet(buffer):
+            # der Worker ruft process_packet direkt nach get() auf, taken_at gehört also zu diesem Frame
+            self.running += 1
+            return self._packet(process_packet(buffer), self.taken_at)
+
+        coordinator.process_buffer = timed_buffer
+        coordinator.process_packet = timed_packet
+
+    async def _buffer(self, coro, framed_at: float):
+        # process_buffer legt den Frame ohne vorheriges await in die Queue
+        self.framed_at = framed_at
+        try:
+            await coro
+        finally:
+            self.buffering -= 1
+
+    async def _packet(self, coro, framed_at: float):
+        try:
+            await coro
+        finally:
+            self.running -= 1
+            self.done += 1
+            self.finished_at = time.perf_counter()
+            self.latencies.append(self.finished_at - framed_at)
+
+    def inflight(self) -> int:
+        return self.buffering + self.queue.qsize() + self.running
+
+
+def load_frames(args) -> list:
+    if args.capture:
+        frames = [frame for _, _, frame in read_packets(args.capture)]
+    else:
+        frames = [bytes(sample_frame())]
+    count = args.frames or len(frames) * args.repeat
+    return list(itertools.islice(itertools.cycle(frames), count))
+
+
+def count_messages(frames: list) -> int:
+    messages = 0
+    for frame in frames:
+        packet = NASAPacket()
+        try:
+            packet.parse(bytearray(frame))
+        except Exception:
+            continue
+        messages += len(packet.packet_messages)
+    return messages
+
+
+def percentile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless ingest benchmark for the EHSSentinelCoordinator")
+    parser.add_argument("--capture", help="packet.log oder packet.ehscap (auch .gz/.zst), ohne wird ein Beispielframe wiederholt")
+    parser.add_argument("--frames", type=int, help="Anzahl Frames (Aufzeichnung wird wiederholt), Default: ganze Aufzeichnung bzw. 20000")
+    parser.add_argument("--repeat", type=int, default=1, help="Aufzeichnung n-mal abspielen")
+    parser.add_argument("--window", type=int, default=50, help="maximal gleichzeitig in Arbeit befindliche Frames")
+    parser.add_argument("--tracemalloc", action="store_true", help="zusätzlich Python-Heap Spitze messen (langsamer)")
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei schreiben")
+    args = parser.parse_args()
+    if not args.capture and not args.frames:
+        args.frames = 20000
+    return args
+
+
+async def main():
+    args = parse_args()
+    frames = load_frames(args)
+    messages = count_messages(frames)
+    data = b"".join(frames)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass)
+        probe = IngestProbe(coordinator)
+        reader = ReplayReader(data, probe.inflight, args.window)
+        start_packet_workers(coordinator)
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        await coordinator._tcp_read(reader)
+        while probe.inflight() > 0:
+            await asyncio.sleep(0)
+        elapsed = (probe.finished_at or time.perf_counter()) - started
+
+        heap_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        tracemalloc.stop()
+        coordinator.running = False
+        await stop_packet_workers(coordinator)
+        entities = len(hass.entity_registry.entities)
+        stats = dict(coordinator.stats)
+        hass.shutdown()
+
+    latencies = sorted(probe.latencies)
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {
+        "capture": args.capture or "sample",
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "frames": len(frames),
+        "frames_processed": probe.done,
+        "messages": messages,
+        "bytes": len(data),
+        "seconds": round(elapsed, 3),
+        "frames_per_s": round(probe.done / elapsed, 1),
+        "messages_per_s": round(messages / elapsed, 1),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        } if len(latencies) > 0 else None,
+        # ru_maxrss ist unter Linux in KiB, unter macOS in Bytes
+        "peak_rss_mb": round(rss_peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "peak_rss_growth_mb": round((rss_peak - rss_before) / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "peak_heap_mb": round(heap_peak / 1e6, 1) if heap_peak is not None else None,
+        "entities": entities,
+        "stats": stats,
+        "window": args.window,
+    }
+
+    print(f"{result['frames_processed']}/{result['frames']} frames, {messages} messages in {elapsed:.2f} s: "
+          f"{result['frames_per_s']:.0f} frames/s, {result['messages_per_s']:.0f} messages/s")
+    if result["latency_ms"]:
+        print(f"latency p50={result['latency_ms']['p50']:.2f} ms p99={result['latency_ms']['p99']:.2f} ms max={result['latency_ms']['max']:.2f} ms")
+    print(f"peak RSS {result['peak_rss_mb']} MB (+{result['peak_rss_growth_mb']} MB), entities {entities}")
+    if heap_peak is not None:
+        print(f"peak Python heap {result['peak_heap_mb']} MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import TimedRotatingFileHandler
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket, AddressClassEnum, DataType
+from custom_components.ehs_sentinel.nasa_message import NASAMessage
+from custom_components.ehs_sentinel.packet_logger import PacketLogger
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.fake_hass import FakeHass, build_coordinator
+from devtools.unit_emulator import build_packet, INDOOR
+
+# Misst die Kosten des Paket-Loggings je Paket bei abgeschaltetem Debug-Logging: eager formatierte
+# f-Strings (wie früher in process_packet), lazy %-Style Logging, die kompakte Darstellung für
+# extended_logging und process_packet komplett. Für packet.log wird die Zeit auf dem Event-Loop
+# je Paket verglichen: früher ein Executor-Job je Paket, jetzt der PacketLogger-Thread, außerdem
+# die Schreibkosten im Thread und die Dateigröße für Text- und Binärformat.
+# Mit --capture werden die Frames aus einem aufgezeichneten packet.log/packet.ehscap genommen.
+#
+# python -m devtools.benchmark_logging --packets 20000
+# python -m devtools.benchmark_logging --capture packet.ehscap.2026-10-18.gz
+
+_LOGGER = logging.getLogger("custom_components.ehs_sentinel.coordinator")
+
+# typische Notification der Inneneinheit mit mehreren Temperaturen und Zuständen
+MESSAGES = [(0x4236, [0x01, 0x2C]), (0x4238, [0x01, 0x18]), (0x4237, [0x01, 0x90]), (0x4201, [0x00, 0xFA]),
+            (0x4065, [0x01]), (0x4066, [0x00]), (0x4000, [0x01]), (0x4001, [0x04]), (0x4203, [0x00, 0xE6]),
+            (0x4427, [0x00, 0x00, 0x12, 0x34])]
+
+
+def sample_frame() -> bytearray:
+    messages = [NASAMessage(packet_message=number, packet_message_type=(number & 1536) >> 9, packet_payload=payload) for number, payload in MESSAGES]
+    return bytearray(build_packet(INDOOR, (AddressClassEnum.BroadcastSetLayer, 0x00, 0x20), DataType.Notification, 1, messages))
+
+
+def per_packet(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def per_packet_async(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        await func()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per packet logging cost with debug logging disabled")
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--capture", help="packet.log oder packet.ehscap (auch .gz/.zst) als Quelle der Frames")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.capture:
+        frames = [bytearray(frame) for _, _, frame in itertools.islice(read_packets(args.capture), args.packets)]
+    else:
+        frames = [sample_frame()]
+    frame = frames[0]
+    packet = NASAPacket()
+    packet.parse(frame)
+    cycle = itertools.cycle(frames)
+
+    def parse_next():
+        try:
+            NASAPacket().parse(next(cycle))
+        except Exception:
+            pass
+
+    results = {
+        "parse": per_packet(parse_next, args.packets),
+        "eager f-string (str)": per_packet(lambda: _LOGGER.debug(f"Received Packet: {packet}"), args.packets),
+        "lazy %-style": per_packet(lambda: _LOGGER.debug("Received Packet: %s", packet), args.packets),
+        "compact()": per_packet(packet.compact, args.packets),
+    }
+
+    sizes = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass)
+        await coordinator.process_packet(frame)  # Entities einmalig anlegen
+        results["process_packet"] = await per_packet_async(lambda: coordinator.process_packet(frame), args.packets)
+
+        # bisheriges packet.log: Hex-Formatierung auf dem Loop und ein Executor-Job je Paket
+        file_logger = logging.getLogger("benchmark.packet_logger")
+        file_logger.propagate = False
+        file_logger.setLevel(logging.INFO)
+        file_logger.addHandler(TimedRotatingFileHandler(os.path.join(config_dir, "executor.log"), when="midnight", encoding="utf-8"))
+
+        async def executor_job():
+            await hass.async_add_executor_job(file_logger.info, " ".join(f"{b:02X}" for b in frame))
+
+        results["packet.log executor"] = await per_packet_async(executor_job, args.packets)
+
+        packet_logger = PacketLogger(os.path.join(config_dir, "packet.log"))
+        packet_logger.start()
+        results["packet.log thread"] = per_packet(lambda: packet_logger.log(frame), args.packets)
+        coordinator._packet_logger = packet_logger
+        results["process_packet+log"] = await per_packet_async(lambda: coordinator.process_packet(frame), args.packets)
+        started = time.perf_counter()
+        await hass.async_add_executor_job(packet_logger.stop)
+        drain = time.perf_counter() - started
+
+        # Kosten im Logger-Thread und Dateigröße je Format, ohne Thread direkt gemessen
+        for name, binary in (("text", False), ("binary", True)):
+            writer = PacketLogger(os.path.join(config_dir, f"bench.{name}"), binary=binary, max_queue=args.packets)
+            for _ in range(args.packets):
+                writer.log(next(cycle))
+            started = time.perf_counter()
+            writer._write_batch()
+            writer._close()
+            results[f"thread write {name}"] = (time.perf_counter() - started) / args.packets * 1e6
+            sizes[name] = os.path.getsize(writer.path) / args.packets
+        hass.shutdown()
+
+    print(f"{len(frames)} frame(s) from {args.capture or 'sample'}, first with {len(packet.packet_messages)} messages, {len(frame)} bytes, debug disabled, {args.packets} iterations")
+    for name, micros in results.items():
+        print(f"{name:<22} {micros:8.2f} us/packet")
+    print(f"compact example: {packet.compact()}")
+    print(f"PacketLogger: {packet_logger.stats()}, drain on stop {drain * 1000:.0f} ms")
+    print(f"Bytes per packet: text={sizes['text']:.1f} binary={sizes['binary']:.1f} raw={sum(len(f) for f in frames) / len(frames):.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+
+from custom_components.ehs_sentinel.packet_capture import compress_indexed, read_packets
+from custom_components.ehs_sentinel.packet_logger import PacketLogger
+from devtools.benchmark_capture_seek import write_day
+from devtools.benchmark_logging import sample_frame
+
+# Prüft die Rotation des Paketlogs unter Last: packet.ehscap vom Vortag (ein ganzer Tag an Paketen)
+# liegt bereit, der PacketLogger startet und muss ihn rotieren, während laufend neue Pakete kommen.
+# Gemessen wird die längste Schreibpause im Logger-Thread und ob alle Pakete lückenlos ankommen.
+# Zum Vergleich wird die Dauer der Kompression gemessen, die früher direkt im Schreibpfad lief.
+#
+# python -m devtools.benchmark_rotation --rate 200 --seconds 5
+
+
+class TimedPacketLogger(PacketLogger):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_times = []
+
+    def _write_batch(self):
+        started = time.perf_counter()
+        super()._write_batch()
+        self.batch_times.append(time.perf_counter() - started)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Packet log rotation under load")
+    parser.add_argument("--rate", type=float, default=200, help="neue Pakete pro Sekunde während der Rotation")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--day-rate", type=float, default=10, help="Pakete pro Sekunde im Log des Vortags")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    frame = sample_frame()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "packet.ehscap")
+        yesterday = time.time() - 86400
+        day_start = yesterday - yesterday % 86400
+
+        # Vergleich: Dauer der Kompression, die früher den Schreibpfad blockiert hat
+        day_packets = write_day(path, True, args.day_rate, day_start)
+        size = os.path.getsize(path)
+        started = time.perf_counter()
+        compress_indexed(path, os.path.join(tmp, "inline.gz"))
+        inline = time.perf_counter() - started
+
+        write_day(path, True, args.day_rate, day_start)
+        os.utime(path, (yesterday, yesterday))
+
+        logger = TimedPacketLogger(path, binary=True, flush_interval=0.05, max_queue=10**6)
+        logger.start()
+        sent = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds:
+            logger.log(frame)
+            sent += 1
+            time.sleep(1 / args.rate)
+        logger.stop()
+
+        rotated = os.path.join(tmp, f"packet.ehscap.{time.strftime('%Y-%m-%d', time.localtime(yesterday))}.gz")
+        deadline = time.perf_counter() + 60
+        while not os.path.exists(f"{rotated}.idx") and time.perf_counter() < deadline:
+            time.sleep(0.1)
+
+        times = [ts for ts, _, _ in read_packets(path)]
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        rotated_packets = sum(1 for _ in read_packets(rotated))
+
+    print(f"Previous day: {day_packets} packets, {size / 1e6:.1f} MB, inline compression took {inline * 1000:.0f} ms")
+    print(f"Logged {sent} packets at {args.rate:.0f}/s during rotation: written={len(times)} dropped={logger.dropped}, "
+          f"max batch {max(logger.batch_times) * 1000:.1f} ms, max gap between packets {max(gaps) * 1000:.1f} ms")
+    print(f"Rotated file: {rotated_packets} of {day_packets} packets")
+
+
+if __name__ == "__main__":
+    main()
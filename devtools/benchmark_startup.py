@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import tempfile
+import time
+
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+from devtools.unit_emulator import LOCALHOST, UnitEmulator
+
+# Misst, wie lange es nach dem Start dauert, bis alle writable Entities einen Wert haben.
+# Der Coordinator wird zweimal mit demselben Config-Verzeichnis gestartet: der erste Lauf startet
+# ohne Snapshot (kalt, voller Sweep), der zweite mit dem beim Stop gespeicherten Snapshot (warm).
+#
+# python -m devtools.benchmark_startup
+# python -m devtools.benchmark_startup --max-age 30m --timeout 180
+
+
+async def run_once(config_dir, emulator, port, nasa_repo, args):
+    hass = FakeHass(config_dir)
+    coordinator = build_coordinator(hass, nasa_repo=nasa_repo, ip=LOCALHOST, port=port, snapshot_max_age=args.max_age)
+    started = time.perf_counter()
+    restored = await coordinator.async_restore_snapshot()
+    await coordinator.start_ehs_sentinel()
+
+    total = len(coordinator._writable_entities())
+    while len(coordinator._unpopulated) > 0 and time.perf_counter() - started < args.timeout:
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    populated = total - len(coordinator._unpopulated)
+
+    # Sweep bzw. Nachlesen noch abschließen lassen, damit die Anzahl der Leseanfragen vollständig ist
+    await asyncio.sleep(args.tail)
+    requested = coordinator.stats["packets_requested"]
+    await coordinator.stop()
+    hass.shutdown()
+    return restored, populated, total, elapsed, requested
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time to populated entities with cold and warm value snapshot")
+    parser.add_argument("--latency", type=float, default=0.1, help="Antwortzeit des Emulators in Sekunden")
+    parser.add_argument("--max-age", default="6h", help="snapshot_max_age für den warmen Start")
+    parser.add_argument("--timeout", type=float, default=120, help="Maximale Wartezeit je Start in Sekunden")
+    parser.add_argument("--tail", type=float, default=15, help="Laufzeit nach dem Befüllen aller Entities in Sekunden")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    nasa_repo = load_nasa_repo()
+    # FSV Einstellungen verteilt der Emulator nicht per Notification, sie müssen gelesen werden
+    emulator = UnitEmulator(nasa_repo, latency=args.latency, notify_interval=1)
+    emulator.seed_defaults()
+    server = await asyncio.start_server(emulator.handle_client, LOCALHOST, 0)
+    port = server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        for name in ("cold", "warm"):
+            restored, populated, total, elapsed, requested = await run_once(config_dir, emulator, port, nasa_repo, args)
+            print(f"{name}: restored={restored} populated={populated}/{total} after {elapsed:.1f}s, requested messages={requested}")
+
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo, start_packet_workers, stop_packet_workers
+from devtools.unit_emulator import LOCALHOST, UnitEmulator, add_emulator_args, build_emulator
+
+# Misst gegen den UnitEmulator, wie lange ein Sweep über alle writable Entities dauert (einmal
+# gepipelined mit read_batch wie beim FSV Export, einmal paketweise mit read_request im Retry-Modus)
+# und die Latenz von write_request. Mit --seed, --loss und --bus-load sind die Bedingungen
+# reproduzierbar, z.B. um Retry- und Timeout-Änderungen im MessageProducer zu vergleichen.
+#
+# python -m devtools.benchmark_sweep --seed 1
+# python -m devtools.benchmark_sweep --seed 1 --loss 0.1 --bus-load 0.3 --writes 20 --output sweep.json
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Read sweep and write latency against the unit emulator")
+    add_emulator_args(parser)
+    parser.add_argument("--writes", type=int, default=10)
+    parser.add_argument("--key", default="VAR_IN_FSV_1011")
+    parser.add_argument("--values", default="20,21", help="Abwechselnd geschriebene Werte")
+    parser.add_argument("--sweep-timeout", type=float, default=120, help="Zeitbudget für read_batch in Sekunden")
+    parser.add_argument("--skip-sequential", action="store_true", help="nur den gepipelineten Sweep messen")
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei schreiben")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    nasa_repo = load_nasa_repo()
+    emulator: UnitEmulator = build_emulator(args, nasa_repo)
+    server = await asyncio.start_server(emulator.handle_client, LOCALHOST, 0)
+    port = server.sockets[0].getsockname()[1]
+    result = {"emulator": {key: getattr(args, key) for key in ("latency", "jitter", "loss", "no_ack", "baud", "bus_load", "seed")}}
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo, ip=LOCALHOST, port=port)
+        reader, writer = await asyncio.open_connection(LOCALHOST, port)
+        coordinator.producer.set_writer(writer)
+        read_task = asyncio.create_task(coordinator._tcp_read(reader))
+        start_packet_workers(coordinator)
+        while coordinator.indoor_address is None or coordinator.outdoor_address is None:
+            await asyncio.sleep(0.1)
+
+        keys = coordinator._writable_entities()
+        started = time.perf_counter()
+        answered = await coordinator.producer.read_batch(keys, args.sweep_timeout)
+        result["read_batch"] = {"seconds": round(time.perf_counter() - started, 2), "answered": len(answered), "keys": len(keys)}
+
+        if not args.skip_sequential:
+            started = time.perf_counter()
+            ok = await coordinator.producer.read_request(keys, retry_mode=True)
+            result["read_request"] = {"seconds": round(time.perf_counter() - started, 2), "complete": ok is not False, "keys": len(keys)}
+
+        values = args.values.split(",")
+        latencies = []
+        failures = 0
+        for i in range(args.writes):
+            started = time.perf_counter()
+            if not await coordinator.producer.write_request(message=args.key, value=values[i % len(values)], read_request_after=True):
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+        await asyncio.gather(*coordinator.producer._verification_tasks, return_exceptions=True)
+        latencies.sort()
+        result["write_request"] = {
+            "writes": args.writes,
+            "failures": failures,
+            "p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        } if len(latencies) > 0 else None
+        result["response_times"] = coordinator.producer.rtt.stats()
+
+        coordinator.running = False
+        read_task.cancel()
+        await asyncio.gather(read_task, return_exceptions=True)
+        await stop_packet_workers(coordinator)
+        writer.close()
+        hass.shutdown()
+
+    emulator.close_clients()
+    server.close()
+    await server.wait_closed()
+    result["emulator_stats"] = {key: round(value, 2) for key, value in emulator.stats.items()}
+
+    print(json.dumps(result, indent=2, default=str))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
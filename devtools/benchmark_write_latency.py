@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo, start_packet_workers, stop_packet_workers
+from devtools.unit_emulator import LOCALHOST, UnitEmulator
+
+# Misst die Latenz von MessageProducer.write_request(read_request_after=True) gegen den UnitEmulator
+# (devtools.unit_emulator, ohne Übertragungszeit und Verluste). Der Emulator beantwortet Reads mit
+# Responses und Schreibanfragen optional mit einem Ack, so lassen sich Ack-Bestätigung und
+# Rücklese-Bestätigung vergleichen.
+#
+# Mit --batch werden zusätzlich so viele FSV Werte einmal mit write_batch (wie beim FSV Import) und
+# einmal einzeln mit write_request geschrieben.
+#
+# python -m devtools.benchmark_write_latency --writes 20
+# python -m devtools.benchmark_write_latency --writes 20 --no-ack --latency 0.1
+# python -m devtools.benchmark_write_latency --writes 0 --batch 40 [--no-ack]
+
+
+def fsv_value(meta: dict) -> str:
+    """Gültiger Wert wie im FSV-Export: erster Enum-Text oder 1."""
+    if meta.get('type') == 'ENUM' and meta.get('enum'):
+        return next(iter(meta['enum'].values()))
+    return "1"
+
+
+async def write_fsv(coordinator, count: int) -> dict:
+    """Schreibt count FSV Werte gebündelt und einzeln, liefert Dauer und Fehler je Variante."""
+    keys = [key for key in coordinator._writable_entities() if "_FSV_" in key][:count]
+    values = {key: fsv_value(coordinator.nasa_repo[key]) for key in keys}
+    result = {"keys": len(keys)}
+
+    started = time.perf_counter()
+    confirmed = await coordinator.producer.write_batch(values)
+    result["batch"] = (time.perf_counter() - started, sum(1 for ok in confirmed.values() if not ok))
+
+    started = time.perf_counter()
+    failures = 0
+    for key, value in values.items():
+        if not await coordinator.producer.write_request(message=key, value=value, read_request_after=True):
+            failures += 1
+    result["single"] = (time.perf_counter() - started, failures)
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Write latency benchmark against a local indoor unit emulator")
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="Antwortzeit des Emulators in Sekunden")
+    parser.add_argument("--no-ack", action="store_true", help="Emulator sendet keine Acks (Bestätigung über Rücklesen)")
+    parser.add_argument("--key", default="VAR_IN_FSV_1011")
+    parser.add_argument("--values", default="20,21", help="Abwechselnd geschriebene Werte")
+    parser.add_argument("--batch", type=int, default=0, help="Anzahl FSV Werte für den Vergleich write_batch/einzeln")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    nasa_repo = load_nasa_repo()
+    emulator = UnitEmulator(nasa_repo, latency=args.latency, send_acks=not args.no_ack)
+    emulator.seed_defaults()
+    server = await asyncio.start_server(emulator.handle_client, LOCALHOST, 0)
+    port = server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo, ip=LOCALHOST, port=port)
+        reader, writer = await asyncio.open_connection(LOCALHOST, port)
+        coordinator.producer.set_writer(writer)
+        read_task = asyncio.create_task(coordinator._tcp_read(reader))
+        start_packet_workers(coordinator)
+
+        while coordinator.indoor_address is None or coordinator.outdoor_address is None:
+            await asyncio.sleep(0.1)
+
+        values = args.values.split(",")
+        latencies = []
+        failures = 0
+        for i in range(args.writes):
+            started = time.perf_counter()
+            ok = await coordinator.producer.write_request(message=args.key, value=values[i % len(values)], read_request_after=True)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                failures += 1
+
+        fsv = await write_fsv(coordinator, args.batch) if args.batch > 0 else None
+
+        # Hintergrund-Rücklesen abwarten, damit keine Tasks offen bleiben
+        await asyncio.gather(*coordinator.producer._verification_tasks, return_exceptions=True)
+
+        coordinator.running = False
+        read_task.cancel()
+        await asyncio.gather(read_task, return_exceptions=True)
+        await stop_packet_workers(coordinator)
+        writer.close()
+        await writer.wait_closed()
+        hass.shutdown()
+
+    server.close()
+    await server.wait_closed()
+
+    latencies.sort()
+    print(f"Mode: {'read back' if args.no_ack else 'ack'}, emulator latency: {args.latency * 1000:.0f} ms, writes: {args.writes}, failures: {failures}")
+    if len(latencies) > 0:
+        print(f"Write latency mean={statistics.mean(latencies) * 1000:.0f} ms p50={statistics.median(latencies) * 1000:.0f} ms "
+              f"p95={latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.0f} ms max={latencies[-1] * 1000:.0f} ms")
+    if fsv is not None:
+        for name in ("batch", "single"):
+            seconds, failed = fsv[name]
+            print(f"FSV {name}: {fsv['keys']} values in {seconds:.1f} s, failures: {failed}")
+    print(f"Response times: {coordinator.producer.rtt.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import argparse
+import os
+import time
+
+from custom_components.ehs_sentinel.packet_capture import (
+    MAGIC,
+    format_text_line,
+    is_capture_path,
+    open_compressed,
+    pack_record,
+    pack_segment,
+    read_packets,
+)
+
+# Wandelt Paketlogs zwischen Textformat (packet.log) und Binärformat (packet.ehscap) um.
+# Das Eingabeformat wird am Inhalt erkannt, das Ausgabeformat am Dateinamen (.ehscap -> binär).
+# Endet die Ausgabe auf .gz oder .zst, wird komprimiert (.zst benötigt das Paket zstandard).
+#
+# python -m devtools.capture_convert packet.log packet.ehscap.zst
+# python -m devtools.capture_convert packet.ehscap.2026-10-18.gz packet.log
+
+
+def convert(source, target) -> int:
+    count = 0
+    binary = is_capture_path(target)
+    with open_compressed(target, "wb") as out:
+        if binary:
+            out.write(MAGIC)
+        offset = None
+        for ts, mono_ns, frame in read_packets(source):
+            if binary:
+                # neues Segment, sobald sich der Bezug zwischen Wanduhr und monotoner Zeit ändert (Neustart)
+                wall_ns = int(ts * 1e9)
+                if offset is None or abs((wall_ns - mono_ns) - offset) > 1_000_000:
+                    offset = wall_ns - mono_ns
+                    out.write(pack_segment(mono_ns, wall_ns))
+                out.write(pack_record(mono_ns, frame))
+            else:
+                out.write(format_text_line(ts, frame).encode())
+            count += 1
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert packet logs between text and binary capture format")
+    parser.add_argument("source", help="packet.log oder packet.ehscap, auch .gz/.zst")
+    parser.add_argument("target", help="Zieldatei, .ehscap im Namen für das Binärformat")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    count = convert(args.source, args.target)
+    elapsed = time.perf_counter() - started
+    source_size = os.path.getsize(args.source)
+    target_size = os.path.getsize(args.target)
+    print(f"{count} packets in {elapsed:.2f}s: {args.source} ({source_size} bytes) -> {args.target} ({target_size} bytes, {target_size / max(source_size, 1):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket, AddressClassEnum
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+
+# Dekodiert Paketlogs (packet.log/packet.ehscap, auch rotierte .gz/.zst) offline in Zeitreihen, mit
+# NASAPacket.parse, search_nasa_table und determine_value der Integration. Wie in process_packet
+# werden nur Frames von Innen- und Außeneinheit ausgewertet. Jede Eingabedatei wird in einem eigenen
+# Prozess dekodiert (--jobs, Default: Anzahl CPUs) und ergibt eine Ausgabedatei in --output-dir.
+#
+# Formate: CSV oder Parquet (benötigt pyarrow, bei --format auto wird es genutzt, wenn installiert).
+# --layout long (Default): eine Zeile je Nachricht mit timestamp (Unix-Sekunden), source, message und
+# value. In Parquet landen Zahlen in value und Texte/ENUMs in text, damit die Spalten typisiert bleiben.
+# --layout wide: eine Zeile je Frame mit timestamp, source und einer Spalte je Nachricht.
+#
+# python -m devtools.decode_captures logs/packet.log.2026-10-*.gz --output-dir decoded
+# python -m devtools.decode_captures logs/ --output-dir decoded --format csv --layout wide --jobs 4
+# python -m devtools.decode_captures packet.ehscap --messages NASA_OUTDOOR_CONTROL_WATTMETER_ALL_UNIT_ACCUM,NASA_DHW_VALVE
+
+FORMATS = ("auto", "csv", "parquet")
+LAYOUTS = ("long", "wide")
+SOURCES = (AddressClassEnum.Indoor, AddressClassEnum.Outdoor)
+
+_nasa_repo = None
+
+
+def _init_worker():
+    # Repository einmal je Prozess laden statt einmal je Datei
+    global _nasa_repo
+    _nasa_repo = load_nasa_repo()
+
+
+def have_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def expand_inputs(inputs: list) -> list:
+    """Dateien direkt, bei Verzeichnissen alle Paketlogs und Captures darin (ohne .idx)."""
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths += sorted(p for p in path.iterdir() if p.is_file() and p.name.startswith(("packet.", "capture_")) and not p.name.endswith(".idx"))
+        else:
+            paths.append(path)
+    return paths
+
+
+async def decode_rows(path, messages: set = None) -> tuple:
+    """Liefert (rows, Statistik), rows als (timestamp, source, message, value)."""
+    stats = {"frames": 0, "invalid": 0, "skipped": 0, "messages": 0}
+    rows = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass, nasa_repo=_nasa_repo)
+        processor = coordinator.processor
+        names = {}  # Adresse -> Name, search_nasa_table geht linear über das Repository
+        for ts, _, frame in read_packets(path):
+            stats["frames"] += 1
+            packet = NASAPacket()
+            try:
+                packet.parse(bytearray(frame))
+            except Exception:
+                stats["invalid"] += 1
+                continue
+            if packet.packet_source_address_class not in SOURCES:
+                stats["skipped"] += 1
+                continue
+            source = packet.packet_source_address_class.name
+            for msg in packet.packet_messages:
+                address = f"0x{msg.packet_message:04x}"
+                if address not in names:
+                    names[address] = processor.search_nasa_table(address)
+                name = names[address]
+                if name is None or (messages is not None and name not in messages):
+                    continue
+                try:
+                    value = await coordinator.determine_value(msg.packet_payload, name, msg.packet_message_type)
+                except Exception:
+                    continue
+                rows.append((round(ts, 3), source, name, value))
+        stats["messages"] = len(rows)
+        hass.shutdown()
+    return rows, stats
+
+
+def to_wide(rows: list) -> tuple:
+    """Eine Zeile je Frame (gleicher Zeitstempel und Quelle), eine Spalte je Nachricht."""
+    columns = sorted({row[2] for row in rows})
+    wide = []
+    key = None
+    for ts, source, name, value in rows:
+        if (ts, source) != key:
+            key = (ts, source)
+            wide.append({"timestamp": ts, "source": source})
+        wide[-1][name] = value
+    return ["timestamp", "source", *columns], wide
+
+
+def write_csv(target: Path, rows: list, layout: str):
+    with open(target, "w", newline="") as f:
+        if layout == "wide":
+            fieldnames, wide = to_wide(rows)
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(wide)
+        else:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "source", "message", "value"])
+            writer.writerows(rows)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def write_parquet(target: Path, rows: list, layout: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if layout == "wide":
+        fieldnames, wide = to_wide(rows)
+        columns = {}
+        for name in fieldnames:
+            values = [row.get(name) for row in wide]
+            if name != "source" and all(value is None or _is_number(value) for value in values):
+                columns[name] = pa.array(values, type=pa.float64())
+            else:
+                columns[name] = pa.array([None if value is None else str(value) for value in values], type=pa.string())
+        table = pa.table(columns)
+    else:
+        table = pa.table({
+            "timestamp": pa.array([row[0] for row in rows], type=pa.float64()),
+            "source": pa.array([row[1] for row in rows], type=pa.dictionary(pa.int8(), pa.string())),
+            "message": pa.array([row[2] for row in rows], type=pa.dictionary(pa.int16(), pa.string())),
+            "value": pa.array([row[3] if _is_number(row[3]) else None for row in rows], type=pa.float64()),
+            "text": pa.array([None if _is_number(row[3]) else str(row[3]) for row in rows], type=pa.string()),
+        })
+    pq.write_table(table, target, compression="zstd")
+
+
+def decode_file(path: Path, output_dir: Path, fmt: str, layout: str, messages: set = None) -> dict:
+    started = time.perf_counter()
+    rows, stats = asyncio.run(decode_rows(path, messages))
+    name = path.name[:-len(path.suffix)] if path.suffix in (".gz", ".zst") else path.name
+    target = output_dir / f"{name}.{fmt}"
+    if fmt == "parquet":
+        write_parquet(target, rows, layout)
+    else:
+        write_csv(target, rows, layout)
+    return {"source": str(path), "target": str(target), "seconds": round(time.perf_counter() - started, 2), **stats}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Decode packet logs into columnar time series")
+    parser.add_argument("inputs", nargs="+", help="packet.log/packet.ehscap Dateien (auch .gz/.zst) oder Verzeichnisse")
+    parser.add_argument("--output-dir", default="decoded")
+    parser.add_argument("--format", choices=FORMATS, default="auto", help="auto: Parquet wenn pyarrow installiert ist, sonst CSV")
+    parser.add_argument("--layout", choices=LAYOUTS, default="long")
+    parser.add_argument("--messages", help="nur diese Nachrichten, kommagetrennt")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Anzahl paralleler Prozesse")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "parquet" if have_pyarrow() else "csv"
+    elif fmt == "parquet" and not have_pyarrow():
+        print("Parquet output needs the 'pyarrow' package")
+        return 1
+    messages = set(args.messages.split(",")) if args.messages else None
+
+    paths = expand_inputs(args.inputs)
+    if len(paths) == 0:
+        print("No packet logs found")
+        return 1
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    failed = 0
+    totals = {"frames": 0, "messages": 0}
+    with ProcessPoolExecutor(max_workers=max(min(args.jobs, len(paths)), 1), initializer=_init_worker) as pool:
+        futures = {pool.submit(decode_file, path, output_dir, fmt, args.layout, messages): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}")
+                continue
+            totals["frames"] += result["frames"]
+            totals["messages"] += result["messages"]
+            print(f"{result['source']} -> {result['target']}: {result['frames']} frames ({result['invalid']} invalid), "
+                  f"{result['messages']} messages in {result['seconds']:.1f} s")
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(paths) - failed}/{len(paths)} files, {totals['frames']} frames, {totals['messages']} messages in {elapsed:.1f} s "
+          f"({totals['frames'] / max(elapsed, 1e-9):.0f} frames/s, {fmt}, {args.layout})")
+    return 1 if failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from custom_components.ehs_sentinel.message_processor import COP_MAP, DAILY_MESSAGES, DELTA_SOURCES
+from devtools import decode_captures, replay_energy
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Berechnet die Energie-, Minuten- und COP-Zähler des MessageProcessors offline und vektorisiert mit
+# NumPy neu, z.B. um eine geänderte Logik über Monate an Aufzeichnungen zu prüfen. Eingaben sind
+# dekodierte Dateien von devtools.decode_captures (CSV oder Parquet, --layout long) oder direkt
+# Paketlogs. Gelesen werden nur die Zähler aus DELTA_SOURCES, NASA_DHW_VALVE und ENUM_IN_FSV_3011.
+#
+# Nachgebildet wird _handle_mode_delta/_update_mode/_handle_cop: Deltas zwischen aufeinanderfolgenden
+# Werten (negative verworfen, erst wenn FSV 3011 empfangen wurde), Zuordnung zu DHW/Heizen nach dem
+# Ventilstand, Aufteilung anteilig nach Zeit, wenn der Modus zwischen zwei Werten gewechselt hat, und
+# Tageswerte je lokalem Kalendertag. Nur ein Wechsel von FSV 3011 auf "No" mitten in der Aufzeichnung
+# wird näherungsweise abgebildet. Mit --check läuft dieselbe Aufzeichnung zusätzlich durch den Coordinator
+# (wie devtools.replay_energy) und die Ergebnisse werden verglichen, Exit-Code 1 bei Abweichungen.
+#
+# python -m devtools.energy_analytics decoded/*.csv --output analytics.json
+# python -m devtools.energy_analytics packet.ehscap.2026-10-18.gz --check
+
+VALVE = "NASA_DHW_VALVE"
+FSV_3011 = "ENUM_IN_FSV_3011"
+SERIES = (*DELTA_SOURCES, VALVE, FSV_3011)
+
+
+def _number(text: str):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def load_rows(paths: list) -> list:
+    """(timestamp, message, value) in der Reihenfolge der Aufzeichnung, nur die Nachrichten aus SERIES."""
+    rows = []
+    for path in paths:
+        if path.suffix == ".csv":
+            with open(path, newline="") as f:
+                reader = csv.DictReader(f)
+                if "message" not in (reader.fieldnames or []):
+                    raise ValueError(f"{path}: only the long layout of devtools.decode_captures is supported")
+                rows += [(float(row["timestamp"]), row["message"], _number(row["value"])) for row in reader if row["message"] in SERIES]
+        elif path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path, columns=["timestamp", "message", "value", "text"]).to_pydict()
+            for ts, name, value, text in zip(table["timestamp"], table["message"], table["value"], table["text"]):
+                if name in SERIES:
+                    rows.append((ts, name, value if value is not None else text))
+        else:
+            decode_captures._init_worker()
+            decoded, _ = asyncio.run(decode_captures.decode_rows(path, set(SERIES)))
+            rows += [(ts, name, value) for ts, _, name, value in decoded]
+    return rows
+
+
+def load_series(rows: list) -> dict:
+    """Name -> (Position im Datenstrom, Zeitstempel, Werte) als NumPy Arrays."""
+    series = {}
+    for name in SERIES:
+        picked = [(seq, ts, value) for seq, (ts, msgname, value) in enumerate(rows) if msgname == name]
+        seq = np.array([item[0] for item in picked], dtype=np.int64)
+        ts = np.array([item[1] for item in picked], dtype=np.float64)
+        if name == VALVE:
+            values = np.array([item[2] == "TANK" for item in picked], dtype=bool)
+        elif name == FSV_3011:
+            values = np.array([item[2] != "No" for item in picked], dtype=bool)
+        else:
+            values = np.array([item[2] for item in picked], dtype=np.float64)
+        series[name] = (seq, ts, values)
+    return series
+
+
+def local_days(ts):
+    """Lokaler Kalendertag je Zeitstempel (Tage seit 1970-01-01), UTC-Offset einmal je Stunde bestimmt."""
+    hours, inverse = np.unique(np.floor(ts / 3600), return_inverse=True)
+    offsets = np.array([datetime.fromtimestamp(hour * 3600).astimezone().utcoffset().total_seconds() for hour in hours])
+    return np.floor((ts + offsets[inverse.reshape(ts.shape)]) / 86400).astype(np.int64)
+
+
+def mode_changes(series: dict, start: float) -> tuple:
+    """Zeitpunkte, zu denen dhw_power_store wechselt: (Position, Zeitstempel, DHW an)."""
+    seq, ts, tank = series[VALVE]
+    fsv_seq, _, fsv_ok = series[FSV_3011]
+    # _update_mode greift erst ab dem zweiten Ventilwert und wenn FSV 3011 vorher empfangen wurde
+    fsv_idx = np.searchsorted(fsv_seq, seq) - 1
+    active = (np.arange(len(seq)) > 0) & (fsv_idx >= 0)
+    seq, ts, tank = seq[active], ts[active], tank[active]
+    dhw = tank & fsv_ok[fsv_idx[active]]
+    changed = tank != np.concatenate(([False], dhw[:-1]))
+    # Startzustand wie in MessageProcessor.__init__: OFF, Zeitpunkt = Beginn der Aufzeichnung
+    return (np.concatenate(([-1], seq[changed])),
+            np.concatenate(([start], ts[changed])),
+            np.concatenate(([False], dhw[changed])))
+
+
+def split_deltas(series: dict, name: str, changes: tuple) -> tuple:
+    """Je Delta von name: (Tag, Delta, Anteil DHW, Anteil Heizen), ungültige Deltas sind entfernt."""
+    seq, ts, values = series[name]
+    fsv_seq, _, fsv_ok = series[FSV_3011]
+    change_seq, change_ts, change_dhw = changes
+
+    delta = np.round(np.diff(values), 2)
+    old_ts, new_ts, new_seq = ts[:-1], ts[1:], seq[1:]
+    delta_time = new_ts - old_ts
+    fsv_idx = np.searchsorted(fsv_seq, new_seq) - 1
+    valid = (fsv_idx >= 0) & (delta >= 0) & (delta_time > 0)
+
+    mode = np.searchsorted(change_seq, new_seq) - 1
+    is_dhw = change_dhw[mode]
+    mode_ts = change_ts[mode]
+    split = (old_ts <= mode_ts) & (mode_ts < new_ts) & fsv_ok[np.maximum(fsv_idx, 0)]
+    safe_time = np.where(delta_time > 0, delta_time, 1)
+    # wie _handle_mode_delta: der Anteil vor dem Wechsel geht an den aktuellen Modus, der Rest an den anderen
+    main = np.where(split, delta * np.round((mode_ts - old_ts) / safe_time, 2), delta)
+    secondary = np.where(split, delta * np.round((new_ts - mode_ts) / safe_time, 2), 0.0)
+    # inkrementell wird nach jedem Schritt auf 2 Stellen gerundet, bei Zählerständen mit 2 Stellen
+    # entspricht das dem Runden jedes Anteils
+    main, secondary = np.round(main, 2), np.round(secondary, 2)
+    dhw = np.where(is_dhw, main, secondary)
+    heat = np.where(is_dhw, secondary, main)
+    return local_days(new_ts[valid]), delta[valid], dhw[valid], heat[valid]
+
+
+def cop(generated, consumed) -> float:
+    # _calculate_cop rundet auf 3 Stellen, der Sensor zeigt nach _normalize_value 2
+    return round(round(generated / consumed, 3), 2) if consumed > 0 else 0
+
+
+def analyze(series: dict) -> dict:
+    """Tages- und Gesamtwerte im selben Format wie devtools.replay_energy."""
+    all_ts = np.concatenate([ts for _, ts, _ in series.values()])
+    if len(all_ts) == 0:
+        return {"days": {}, "total": {}}
+    days = np.unique(local_days(all_ts))
+    changes = mode_changes(series, float(all_ts.min()))
+
+    daily = {int(day): {} for day in days}
+    total = {}
+    for name, (target_dhw, target_heat, daily_dhw, daily_heat, daily_all) in DELTA_SOURCES.items():
+        delta_days, delta, dhw, heat = split_deltas(series, name, changes)
+        index = np.searchsorted(days, delta_days)
+        for target, parts in ((daily_dhw, dhw), (daily_heat, heat), (daily_all, delta)):
+            sums = np.bincount(index, weights=parts, minlength=len(days))
+            for day, value in zip(days, sums):
+                daily[int(day)][target] = round(float(value), 2)
+        total[target_dhw] = round(float(dhw.sum()), 2)
+        total[target_heat] = round(float(heat.sum()), 2)
+        if len(series[name][2]) > 0:
+            total[name] = float(series[name][2][-1])  # letzter Rohwert, z.B. für NASA_EHSSENTINEL_TOTAL_COP
+
+    for cop_sensor, (gen_key, cons_key) in COP_MAP.items():
+        if cop_sensor in DAILY_MESSAGES:
+            for counters in daily.values():
+                if gen_key in counters and cons_key in counters:
+                    counters[cop_sensor] = cop(counters[gen_key], counters[cons_key])
+        elif gen_key in total and cons_key in total:
+            total[cop_sensor] = cop(total[gen_key], total[cons_key])
+
+    return {
+        "days": {(date(1970, 1, 1) + timedelta(days=day)).isoformat(): counters for day, counters in daily.items()},
+        "total": {name: value for name, value in total.items() if name not in DELTA_SOURCES},
+    }
+
+
+def check(result: dict, capture: Path, tolerance: float) -> tuple:
+    """Vergleicht mit dem inkrementellen Weg über den Coordinator, nur für die hier berechneten Zähler."""
+    started = time.perf_counter()
+    reference = asyncio.run(replay_energy.replay(argparse.Namespace(capture=str(capture), speed=None, start=None, end=None)))
+    elapsed = time.perf_counter() - started
+    reference["total"] = {name: value for name, value in reference["total"].items() if name in result["total"]}
+    return replay_energy.compare(result, reference, tolerance), elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vectorized energy/COP analytics over decoded series")
+    parser.add_argument("inputs", nargs="+", help="CSV/Parquet von devtools.decode_captures oder Paketlogs")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    parser.add_argument("--check", action="store_true", help="gegen den Coordinator prüfen (nur mit genau einem Paketlog)")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="erlaubte relative Abweichung bei --check")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if np is None:
+        print("devtools.energy_analytics needs the 'numpy' package")
+        return 1
+    paths = [Path(path) for path in args.inputs]
+    if args.check and (len(paths) != 1 or paths[0].suffix in (".csv", ".parquet")):
+        print("--check needs exactly one packet log as input")
+        return 1
+
+    started = time.perf_counter()
+    rows = load_rows(paths)
+    loaded = time.perf_counter()
+    result = analyze(load_series(rows))
+    elapsed = time.perf_counter() - loaded
+    print(json.dumps(result, indent=2))
+    print(f"{len(rows)} values loaded in {loaded - started:.2f} s, analyzed in {elapsed * 1000:.1f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.check:
+        mismatches, incremental = check(result, paths[0], args.tolerance)
+        for key, expected, actual in mismatches:
+            print(f"MISMATCH {key}: incremental {expected}, vectorized {actual}")
+        print(f"{len(mismatches)} mismatch(es) against the incremental engine ({incremental:.2f} s)")
+        return 1 if len(mismatches) > 0 else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
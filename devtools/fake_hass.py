@@ -0,0 +1,121 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from custom_components.ehs_sentinel.coordinator import EHSSentinelCoordinator, EHS_PACKET_WORKERS
+from custom_components.ehs_sentinel.const import DEFAULT_POLLING_YAML, PLATFORM_SENSOR, PLATFORM_NUMBER, PLATFORM_SWITCH, PLATFORM_BINARY_SENSOR, PLATFORM_SELECT
+
+# Minimaler Home Assistant Ersatz, um den EHSSentinelCoordinator ohne laufende HA-Instanz
+# in Devtools (Benchmarks, Testharness) zu betreiben. Es wird nur nachgebildet, was der
+# Coordinator tatsächlich benutzt: State Machine, Executor, Config-Pfade und Entity-Adder.
+
+REPOSITORY_FILE = os.path.join("custom_components", "ehs_sentinel", "data", "nasa_repository.yml")
+
+
+class FakeStates:
+    def __init__(self):
+        self._entity_ids = {}
+
+    def async_entity_ids(self, domain_filter=None):
+        if domain_filter is None:
+            return [entity_id for ids in self._entity_ids.values() for entity_id in ids]
+        return list(self._entity_ids.get(domain_filter, []))
+
+    def add(self, domain, entity_id):
+        self._entity_ids.setdefault(domain, []).append(entity_id)
+
+
+class FakeConfig:
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+
+    def path(self, *parts):
+        return os.path.join(self.config_dir, *parts)
+
+
+class FakeEntityRegistry:
+    """Sammelt die Entities, die der Coordinator über die registrierten Entity-Adder anlegt."""
+
+    def __init__(self, states: FakeStates):
+        self.states = states
+        self.entities = {}
+
+    def adder(self, platform):
+        def _add(entities):
+            for entity in entities:
+                self.entities[entity.entity_id] = entity
+                self.states.add(platform, entity.entity_id)
+        return _add
+
+
+class FakeHass:
+    def __init__(self, config_dir, executor_workers=4):
+        self.loop = asyncio.get_running_loop()
+        self.states = FakeStates()
+        self.config = FakeConfig(config_dir)
+        self.entity_registry = FakeEntityRegistry(self.states)
+        self.data = {}
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="FakeHassExecutor")
+
+        try:
+            from homeassistant.core import CoreState
+            self.state = CoreState.running  # wird z.B. von helpers.storage.Store geprüft
+        except ImportError:
+            self.state = None
+
+        try:
+            from homeassistant.helpers import frame
+            frame.async_setup(self)
+        except Exception:
+            pass  # ältere HA Versionen ohne frame helper setup
+
+    def async_add_executor_job(self, target, *args):
+        return self.loop.run_in_executor(self._executor, target, *args)
+
+    def async_create_task(self, target, name=None, eager_start=True):
+        return self.loop.create_task(target, name=name)
+
+    def async_create_background_task(self, target, name=None, eager_start=True):
+        return self.loop.create_task(target, name=name)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def load_nasa_repo(path=REPOSITORY_FILE):
+    with open(path, "r") as file:
+        return yaml.safe_load(file)
+
+
+def build_coordinator(hass: FakeHass, nasa_repo=None, clock=None, **options) -> EHSSentinelCoordinator:
+    """Erzeugt einen Coordinator mit den Default-Optionen der Integration, überschreibbar per options."""
+    config_dict = {
+        "ip": "127.0.0.1",
+        "port": 5020,
+        "polling": False,
+        "polling_yaml": DEFAULT_POLLING_YAML,
+        "write_mode": True,
+        "extended_logging": False,
+        "force_refresh": False,
+        "diagnostic_logs": False,
+    }
+    config_dict.update(options)
+    coordinator = EHSSentinelCoordinator(hass, config_dict, nasa_repo if nasa_repo is not None else load_nasa_repo(), clock=clock)
+    for platform in (PLATFORM_SENSOR, PLATFORM_NUMBER, PLATFORM_SWITCH, PLATFORM_BINARY_SENSOR, PLATFORM_SELECT):
+        coordinator.register_entity_adder(platform, hass.entity_registry.adder(platform))
+    return coordinator
+
+
+def start_packet_workers(coordinator: EHSSentinelCoordinator):
+    """Startet nur die Packet-Worker, ohne TCP-Loop und Packet-Logger."""
+    for _ in range(EHS_PACKET_WORKERS):
+        coordinator._packet_workers.append(asyncio.create_task(coordinator._packet_worker()))
+
+
+async def stop_packet_workers(coordinator: EHSSentinelCoordinator):
+    for worker in coordinator._packet_workers:
+        worker.cancel()
+    await asyncio.gather(*coordinator._packet_workers, return_exceptions=True)
+    coordinator._packet_workers.clear()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import tempfile
+import time
+
+from custom_components.ehs_sentinel import coordinator as coordinator_module
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+from devtools.reconnect_harness import Bridge
+from devtools.unit_emulator import LOCALHOST, UnitEmulator
+
+# Prüft die Verbindungsüberwachung gegen die emulierte Bridge. Nach der Lernphase sendet der
+# Emulator nur noch Frames mit falscher CRC. Gemessen wird, wann der Zustand auf "failed" wechselt
+# und ob daraufhin neu verbunden wird. Mit --window wird das Auswertungsfenster verkürzt.
+#
+# python -m devtools.health_harness --window 2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Health monitor harness: corrupts the bus after warmup and waits for a reconnect")
+    parser.add_argument("--window", type=float, default=2, help="Länge eines Auswertungsfensters in Sekunden")
+    parser.add_argument("--timeout", type=float, default=60)
+    return parser.parse_args()
+
+
+async def wait_for(predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def main():
+    args = parse_args()
+    coordinator_module.EHS_HEALTH_WINDOW = args.window
+    nasa_repo = load_nasa_repo()
+    emulator = UnitEmulator(nasa_repo, latency=0.05, notify_interval=1)
+    emulator.seed_defaults()
+    bridge = Bridge(emulator)
+    await bridge.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo, ip=LOCALHOST, port=bridge.port, polling=False, write_mode=False)
+        await coordinator.start_ehs_sentinel()
+
+        ok = await wait_for(lambda: coordinator.health.state == "healthy", args.timeout)
+        print(f"Warmup: state={coordinator.health.state} reached={ok} {coordinator.health.as_dict()}")
+
+        emulator.corrupt = True
+        corrupted_at = time.perf_counter()
+        reconnects_before = coordinator.reconnects
+        ok = await wait_for(lambda: coordinator.health.state == "failed", args.timeout)
+        print(f"Corrupted bus: state={coordinator.health.state} after {time.perf_counter() - corrupted_at:.1f}s reached={ok} {coordinator.health.reasons}")
+        ok = await wait_for(lambda: coordinator.reconnects > reconnects_before, args.timeout)
+        print(f"Reconnect triggered={ok} after {time.perf_counter() - corrupted_at:.1f}s")
+
+        emulator.corrupt = False
+        recovered_at = time.perf_counter()
+        ok = await wait_for(lambda: coordinator.health.state == "healthy", args.timeout)
+        print(f"Recovered: state={coordinator.health.state} after {time.perf_counter() - recovered_at:.1f}s reached={ok}")
+
+        await coordinator.stop()
+        hass.shutdown()
+
+    await bridge.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket, AddressClassEnum, DataType
+from custom_components.ehs_sentinel.nasa_message import NASAMessage
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+from devtools.unit_emulator import build_packet, INDOOR
+
+# Microbenchmarks für die Hot Paths beim Empfangen und Senden: NASAPacket.parse/to_raw,
+# NASAMessage.to_raw, search_nasa_table, determine_value, _decode_value/_build_message und
+# _normalize_name. Jeder Benchmark läuft einmal über einen Korpus, angegeben wird die Zeit je
+# Element (Median und Minimum über --repeat Läufe, ähnlich pyperf).
+# Der Korpus wird aus dem NASA Repository erzeugt (jede Nachricht mit gültigem Wert, 10 je Frame),
+# dazu Randfälle: Strukturnachrichten (Typ 3) und ein Frame mit maximaler Kapazität. Mit --capture
+# kommen echte Frames aus packet.log/packet.ehscap dazu.
+# Mit --compare wird gegen eine Baseline verglichen, Exit-Code 1 bei einer Regression über --threshold.
+# Verglichen werden nicht die absoluten Zeiten, sondern das Verhältnis zu einer Kalibrierschleife aus
+# demselben Lauf, damit Unterschiede zwischen Maschinen und CPU-Takt weitgehend herausfallen. Die
+# Baseline wird trotzdem lokal vor der eigenen Änderung erzeugt (mit denselben --capture Frames),
+# eingecheckt wird keine. Benchmarks mit anderem Korpus als in der Baseline werden übersprungen.
+#
+# python -m devtools.microbench --save /tmp/before.json
+# python -m devtools.microbench --compare /tmp/before.json
+# python -m devtools.microbench --capture packet.log --filter parse
+
+BROADCAST = (AddressClassEnum.BroadcastSetLayer, 0x00, 0x20)
+MAX_CAPACITY = 255
+
+
+def sample_payload(meta: dict, message_type: int) -> bytes:
+    """Gültiger Rohwert je Nachricht, bei ENUMs der erste Eintrag."""
+    size = {0: 1, 1: 2, 2: 4}[message_type]
+    value = next(iter(meta["enum"])) if meta.get("type") == "ENUM" and meta.get("enum") else 1
+    return int(value).to_bytes(size, byteorder="big", signed=value < 0)
+
+
+def build_corpus(nasa_repo: dict, capture: str = None) -> dict:
+    messages = []
+    structures = []
+    for key, meta in sorted(nasa_repo.items(), key=lambda item: int(item[1]["address"], 16)):
+        number = int(meta["address"], 16)
+        message_type = (number & 1536) >> 9
+        if message_type == 3:
+            # Strukturnachricht, z.B. Texte mit führender Länge und Abschluss
+            structures.append(NASAMessage(packet_message=number, packet_message_type=3, packet_payload=[0x10, *b"EHS-Sentinel", 0x00, 0x00]))
+        else:
+            messages.append(NASAMessage(packet_message=number, packet_message_type=message_type, packet_payload=sample_payload(meta, message_type)))
+
+    frames = [build_packet(INDOOR, BROADCAST, DataType.Notification, i & 0xFF, messages[i:i + 10]) for i in range(0, len(messages), 10)]
+    frames += [build_packet(INDOOR, BROADCAST, DataType.Notification, 0, [msg]) for msg in structures]
+    # Randfall: so viele Nachrichten wie das Kapazitätsbyte erlaubt
+    frames.append(build_packet(INDOOR, BROADCAST, DataType.Notification, 0, [msg for msg in itertools.islice(itertools.cycle(m for m in messages if m.packet_message_type == 0), MAX_CAPACITY)]))
+    if capture:
+        frames += [frame for _, _, frame in read_packets(capture)]
+    frames = [bytearray(frame) for frame in frames]
+
+    packets = []
+    for frame in frames:
+        packet = NASAPacket()
+        try:
+            packet.parse(bytearray(frame))
+        except Exception:
+            continue
+        packets.append(packet)
+
+    writable = [key for key, meta in nasa_repo.items() if meta.get("hass_opts", {}).get("writable")]
+    return {
+        "frames": frames,
+        "packets": packets,
+        "messages": [msg for packet in packets for msg in packet.packet_messages],
+        "names": list(nasa_repo),
+        "writable": writable,
+    }
+
+
+def writable_value(meta: dict) -> str:
+    if meta.get("type") == "ENUM" and meta.get("enum"):
+        return next(iter(meta["enum"].values()))
+    return "20"
+
+
+def build_benchmarks(coordinator, corpus: dict, loop) -> dict:
+    """Name -> (Funktion über den ganzen Korpus, Anzahl Elemente)."""
+    processor = coordinator.processor
+    producer = coordinator.producer
+    nasa_repo = coordinator.nasa_repo
+    frames = corpus["frames"]
+    packets = corpus["packets"]
+    known = [(msg, name) for msg in corpus["messages"] if (name := processor.search_nasa_table(f"0x{msg.packet_message:04x}")) is not None]
+    addresses = [f"0x{msg.packet_message:04x}" for msg in corpus["messages"]]
+    writes = [(key, writable_value(nasa_repo[key])) for key in corpus["writable"]]
+    decoded = [(key, producer._decode_value(key, value)) for key, value in writes]
+
+    def parse():
+        for frame in frames:
+            try:
+                NASAPacket().parse(frame)
+            except Exception:
+                pass
+
+    def packet_to_raw():
+        for packet in packets:
+            packet.to_raw()
+
+    def message_to_raw():
+        for msg in corpus["messages"]:
+            msg.to_raw()
+
+    def search():
+        for address in addresses:
+            processor.search_nasa_table(address)
+
+    async def determine_all():
+        for msg, name in known:
+            try:
+                await coordinator.determine_value(msg.packet_payload, name, msg.packet_message_type)
+            except Exception:
+                pass
+
+    def determine():
+        loop.run_until_complete(determine_all())
+
+    def decode():
+        for key, value in writes:
+            producer._decode_value(key, value)
+
+    def build_message():
+        for key, value in decoded:
+            producer._build_message(key, value)
+
+    def normalize():
+        for name in corpus["names"]:
+            processor._normalize_name(name)
+
+    return {
+        "NASAPacket.parse": (parse, len(frames)),
+        "NASAPacket.to_raw": (packet_to_raw, len(packets)),
+        "NASAMessage.to_raw": (message_to_raw, len(corpus["messages"])),
+        "search_nasa_table": (search, len(addresses)),
+        "determine_value": (determine, len(known)),
+        "_decode_value": (decode, len(writes)),
+        "_build_message": (build_message, len(decoded)),
+        "_normalize_name": (normalize, len(corpus["names"])),
+    }
+
+
+def calibration():
+    # feste, reine Python-Arbeit (Schleife, Ganzzahlen, Bytes) als Maßstab für die Geschwindigkeit der Maschine
+    total = 0
+    for byte in bytes(range(256)) * 4:
+        total = (total * 31 + byte) & 0xFFFFFFFF
+    return total
+
+
+def measure(func, items: int, repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [t / number / items * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    return {"median_ns": round(statistics.median(runs), 1), "min_ns": round(min(runs), 1), "items": items}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for codec, lookup and decode hot paths")
+    parser.add_argument("--capture", help="zusätzliche echte Frames aus packet.log/packet.ehscap (auch .gz/.zst)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--filter", help="nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--save", help="Ergebnisse als Baseline in diese Datei speichern")
+    parser.add_argument("--compare", help="gegen eine lokal gespeicherte Baseline vergleichen")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Faktor (relativ zur Kalibrierung), ab dem ein Benchmark als Regression gilt")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory() as config_dir:
+
+        async def setup():
+            return FakeHass(config_dir)
+
+        hass = loop.run_until_complete(setup())
+        nasa_repo = load_nasa_repo()
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo)
+        coordinator.indoor_address = {"class": INDOOR[0].value, "channel": INDOOR[1], "address": INDOOR[2]}
+        corpus = build_corpus(nasa_repo, args.capture)
+        benchmarks = build_benchmarks(coordinator, corpus, loop)
+
+        results = {}
+        for name, (func, items) in benchmarks.items():
+            if args.filter and args.filter not in name:
+                continue
+            # Kalibrierung direkt vor jedem Benchmark, damit Taktänderungen während des Laufs mit herausfallen
+            reference = measure(calibration, 1, args.repeat)
+            results[name] = measure(func, items, args.repeat)
+            results[name]["calibration_ns"] = reference["min_ns"]
+            results[name]["relative"] = round(results[name]["min_ns"] / reference["min_ns"], 6)
+        hass.shutdown()
+    loop.close()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        old = [name for name, result in baseline.items() if "relative" not in result]
+        if len(old) > 0:
+            print(f"{args.compare} has no relative timings, save it again with this version")
+            return 1
+
+    print(f"Corpus: {len(corpus['frames'])} frames, {len(corpus['messages'])} messages, {len(corpus['names'])} repository entries"
+          f"{' (+ ' + args.capture + ')' if args.capture else ''}")
+    regressions = []
+    for name, result in results.items():
+        line = f"{name:<20} {result['median_ns']:10.1f} ns/item (min {result['min_ns']:.1f}, {result['relative']:.3f}x calibration, {result['items']} items)"
+        if name in baseline:
+            if baseline[name]["items"] != result["items"]:
+                line += "  skipped: different corpus than baseline"
+            else:
+                # Minimum schwankt am wenigsten, relativ zur Kalibrierung aus demselben Lauf
+                ratio = result["relative"] / baseline[name]["relative"]
+                line += f"  {ratio:5.2f}x baseline"
+                if ratio > args.threshold:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "machine": platform.machine(), "capture": args.capture, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"written to {args.save}")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+from devtools.unit_emulator import LOCALHOST, UnitEmulator
+
+# Trennt die Verbindung zur lokal emulierten Bridge wiederholt und misst die Datenlücken beim Coordinator.
+# Je Ausfall wird die Bridge für --down Sekunden beendet (Verbindungsversuche werden abgewiesen)
+# und danach auf demselben Port neu gestartet. Gemessen wird die Zeit zwischen dem letzten Paket
+# vor und dem ersten Paket nach dem Ausfall, die Anzahl der Verbindungsversuche und ob das Polling weiterläuft.
+#
+# python -m devtools.reconnect_harness --kills 5 --down 3
+
+
+class Bridge:
+    def __init__(self, emulator: UnitEmulator):
+        self.emulator = emulator
+        self.server = None
+        self.port = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.emulator.handle_client, LOCALHOST, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def kill(self):
+        self.server.close()
+        self.emulator.close_clients()
+        await self.server.wait_closed()
+
+
+async def watch_packets(coordinator, timestamps: list):
+    last = coordinator.stats["packets_read"]
+    while True:
+        current = coordinator.stats["packets_read"]
+        if current != last:
+            timestamps.append(time.perf_counter())
+            last = current
+        await asyncio.sleep(0.01)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reconnect harness: kills the bridge stand-in and measures data gaps")
+    parser.add_argument("--kills", type=int, default=5)
+    parser.add_argument("--down", type=float, default=3, help="Ausfallzeit der Bridge je Kill in Sekunden")
+    parser.add_argument("--interval", type=float, default=5, help="Laufzeit zwischen zwei Kills in Sekunden")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    nasa_repo = load_nasa_repo()
+    emulator = UnitEmulator(nasa_repo, latency=0.05, notify_interval=1)
+    emulator.seed_defaults()
+    bridge = Bridge(emulator)
+    await bridge.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo, ip=LOCALHOST, port=bridge.port, polling=True, write_mode=False)
+        await coordinator.start_ehs_sentinel()
+
+        timestamps = []
+        watcher = asyncio.create_task(watch_packets(coordinator, timestamps))
+
+        # erst nach abgeschlossener Startsequenz trennen, gemessen werden nur Reconnects
+        while not coordinator._startup_complete:
+            await asyncio.sleep(0.5)
+        print(f"Startup complete, paused={coordinator._poll_scheduler.paused}")
+
+        gaps = []
+        for i in range(args.kills):
+            await asyncio.sleep(args.interval)
+            killed_at = time.perf_counter()
+            reconnects_before = coordinator.reconnects
+            await bridge.kill()
+            await asyncio.sleep(args.down)
+            await bridge.start()
+
+            while not timestamps or timestamps[-1] <= killed_at + args.down:
+                await asyncio.sleep(0.01)
+            before = [ts for ts in timestamps if ts <= killed_at]
+            after = [ts for ts in timestamps if ts > killed_at]
+            gap = after[0] - before[-1]
+            gaps.append(gap)
+            await asyncio.sleep(0.5)
+            print(f"Kill {i + 1}: data gap {gap:.2f}s (bridge down {args.down:.1f}s, "
+                  f"reconnect after restart {after[0] - killed_at - args.down:.2f}s), "
+                  f"connection attempts {coordinator.reconnects - reconnects_before}, "
+                  f"polling paused={coordinator._poll_scheduler.paused}, "
+                  f"addresses kept={coordinator.indoor_address is not None and coordinator.outdoor_address is not None}")
+
+        print(f"Data gaps: mean={statistics.mean(gaps):.2f}s max={max(gaps):.2f}s")
+
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+        await coordinator.stop()
+        hass.shutdown()
+
+    await bridge.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from custom_components.ehs_sentinel.clock import ReplayClock, ScaledClock
+from custom_components.ehs_sentinel.const import PLATFORM_SENSOR
+from custom_components.ehs_sentinel.message_processor import COP_MAP, DAILY_MESSAGES, DELTA_SOURCES
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.fake_hass import FakeHass, build_coordinator, load_nasa_repo
+
+# Spielt eine Aufzeichnung direkt in process_packet ein und gibt die berechneten Energie-, Minuten-
+# und COP-Zähler aus: die Tageswerte je Tag (Stand vor dem Tageswechsel) und die Gesamtwerte am Ende.
+# Der Coordinator läuft dabei mit der Zeit der Aufzeichnung: bei --speed max mit einer ReplayClock,
+# die vor jedem Frame auf dessen Zeitstempel gesetzt wird, sonst mit einer ScaledClock ab dem ersten
+# Frame und entsprechend getakteten Frames. Beide Wege sollen dieselben Zähler liefern, bei hohen
+# Faktoren verschiebt die Verarbeitungszeit aber die Zeitstempel um Latenz * speed. Eine Woche
+# Aufzeichnung ist mit --speed max in Sekunden durch. Mit --compare werden die Zähler gegen einen
+# früheren Lauf (--output) verglichen, Exit-Code 1 bei Abweichungen über --tolerance.
+#
+# python -m devtools.replay_energy packet.ehscap.2026-10-18.gz --output max.json
+# python -m devtools.replay_energy packet.ehscap.2026-10-18.gz --speed 20 --compare max.json
+# python -m devtools.replay_energy packet.log --start 2026-10-18T00:00:00 --end 2026-10-25T00:00:00
+
+TOTAL_MESSAGES = [name for targets in DELTA_SOURCES.values() for name in targets if name not in DAILY_MESSAGES] + \
+                 [name for name in COP_MAP if name not in DAILY_MESSAGES] + \
+                 ["NASA_EHSSENTINEL_START_COUNTER", "NASA_EHSSENTINEL_DEFROST_COUNTER"]
+
+
+def read_counters(coordinator, names: list) -> dict:
+    sensors = coordinator.data.get(PLATFORM_SENSOR, {})
+    processor = coordinator.processor
+    counters = {}
+    for name in names:
+        value = sensors.get(processor._normalize_name(name), {}).get("value")
+        if value is not None:
+            counters[name] = value
+    return counters
+
+
+async def replay(args) -> dict:
+    first = next(read_packets(args.capture, args.start, args.end), None)
+    if first is None:
+        raise SystemExit("No packets found in capture (or in selected time range)!")
+    nasa_repo = load_nasa_repo()
+
+    result = {"capture": args.capture, "speed": args.speed or "max", "days": {}}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        if args.speed is None:
+            clock = ReplayClock(start=first[0])
+        else:
+            # erst nach dem Laden starten, sonst läuft die Uhr den Frames um Ladezeit * speed voraus
+            clock = ScaledClock(args.speed, start=first[0])
+        coordinator = build_coordinator(hass, nasa_repo=nasa_repo, clock=clock)
+        started = time.perf_counter()
+        frames = 0
+        day = None
+        for ts, _, frame in read_packets(args.capture, args.start, args.end):
+            if args.speed is None:
+                clock.advance(ts)
+            else:
+                wait = (ts - clock.time()) / args.speed
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            current = clock.now().date()
+            if day is not None and current != day:
+                # Tageswerte vor dem Reset durch den ersten Frame des neuen Tages festhalten
+                result["days"][day.isoformat()] = read_counters(coordinator, DAILY_MESSAGES)
+            day = current
+            try:
+                await coordinator.process_packet(bytearray(frame))
+            except Exception:
+                pass  # fehlerhafte Frames zählt der Coordinator selbst
+            frames += 1
+        if day is not None:
+            result["days"][day.isoformat()] = read_counters(coordinator, DAILY_MESSAGES)
+        result["total"] = read_counters(coordinator, TOTAL_MESSAGES)
+        result["frames"] = frames
+        result["seconds"] = round(time.perf_counter() - started, 2)
+        result["capture_seconds"] = round(ts - first[0], 1)
+        hass.shutdown()
+    return result
+
+
+def compare(result: dict, reference: dict, tolerance: float) -> list:
+    """Liefert die Zähler, die um mehr als tolerance (relativ) von der Referenz abweichen."""
+    pairs = [(f"total.{name}", value, result["total"].get(name)) for name, value in reference.get("total", {}).items()]
+    for day, counters in reference.get("days", {}).items():
+        pairs += [(f"{day}.{name}", value, result["days"].get(day, {}).get(name)) for name, value in counters.items()]
+
+    mismatches = []
+    for key, expected, actual in pairs:
+        if actual is None or abs(actual - expected) > tolerance * max(abs(expected), 1):
+            mismatches.append((key, expected, actual))
+    return mismatches
+
+
+def parse_time(text: str) -> float:
+    return datetime.fromisoformat(text).timestamp()
+
+
+def parse_speed(text: str):
+    if text.lower() in ("max", "0"):
+        return None
+    speed = float(text)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be greater than 0 or 'max'")
+    return speed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a capture and report energy/COP counters")
+    parser.add_argument("capture", help="packet.log/packet.ehscap (auch .gz/.zst)")
+    parser.add_argument("--speed", type=parse_speed, default=None, help="Faktor gegenüber Echtzeit oder 'max' (Default)")
+    parser.add_argument("--start", type=parse_time, help="ab Zeitpunkt (ISO, z.B. 2026-10-18T00:00:00)")
+    parser.add_argument("--end", type=parse_time, help="bis Zeitpunkt (ISO)")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    parser.add_argument("--compare", help="gegen das JSON eines früheren Laufs vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="erlaubte relative Abweichung bei --compare")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    result = asyncio.run(replay(args))
+    print(json.dumps(result, indent=2, default=str))
+    print(f"Replayed {result['frames']} frames ({result['capture_seconds']:.0f} s of capture) in {result['seconds']:.2f} s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+    if args.compare:
+        with open(args.compare) as f:
+            mismatches = compare(result, json.load(f), args.tolerance)
+        for key, expected, actual in mismatches:
+            print(f"MISMATCH {key}: expected {expected}, got {actual}")
+        print(f"{len(mismatches)} mismatch(es) against {args.compare}")
+        return 1 if len(mismatches) > 0 else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
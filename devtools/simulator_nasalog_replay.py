@@ -1,68 +1,145 @@
 import asyncio
-import re
+from contextlib import closing
 from datetime import datetime
 import argparse
-import sys
+import time
+
+from custom_components.ehs_sentinel.packet_capture import read_packets
 
 HOST = "0.0.0.0"        # Server-IP
 PORT = 5020              # Modbus-ähnlicher Port (502 ist Standard, aber oft belegt)
+TICK = 0.01              # Frames, die innerhalb eines Ticks fällig werden, gehen mit einem write() raus
+MAX_BATCH = 256          # höchstens so viele Frames je write(), v.a. bei --speed max
+CLIENT_QUEUE = 64        # gepufferte Batches je Client, langsame Clients bremsen die Wiedergabe
 
-# python3 devtools\simulator_nasalog_replay.py packet.log --start 12:00:00 --end 13:00:00
-# python3 devtools\simulator_nasalog_replay.py packet.log     
-
-# Logzeile zu (timestamp, bytes) parsen
-def parse_log_line(line):
-    match = re.match(r"\[(\d{4}-\d{2}-\d{2}), (\d{2}:\d{2}:\d{2}\.\d{3})\] ([0-9A-Fa-f ]+)$", line.strip())
-    if match:
-        # Datum ignorieren, nur Zeit verwenden
-        timestr = match.group(2)
-        hexstr = match.group(3)
-        # Zeit als Sekunden seit Mitternacht
-        t = datetime.strptime(timestr, "%H:%M:%S.%f")
-        seconds = t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
-        pkt = bytes(int(b, 16) for b in hexstr.split())
-        return (seconds, pkt)
-    return None
-
-def load_packets(logfile, start_time=None, end_time=None):
-    packets = []
-    with open(logfile, "r", encoding="utf-8") as f:
-        for line in f:
-            parsed = parse_log_line(line)
-            if parsed:
-                pkt_time, pkt = parsed
-                if start_time is not None and pkt_time < start_time:
-                    continue
-                if end_time is not None and pkt_time > end_time:
-                    continue
-                packets.append((pkt_time, pkt))
-    return packets
-
-async def replay_packets(writer, packets):
-    while True:
-        start = asyncio.get_event_loop().time()
-        for i, (pkt_time, pkt) in enumerate(packets):
-            now = asyncio.get_event_loop().time()
-            if i == 0:
-                base = pkt_time
-                send_at = start
-            else:
-                send_at = start + (pkt_time - base)
-            wait = send_at - now
-            if wait > 0:
+# Spielt ein packet.log/packet.ehscap (auch rotierte .gz/.zst) per TCP ab, mit den Abständen aus dem Log.
+# Mit --speed läuft die Wiedergabe um diesen Faktor schneller, --speed max so schnell wie möglich.
+# Das Log wird gestreamt statt komplett geladen, alle Clients hängen an derselben Wiedergabe.
+# Die Wiedergabe beginnt mit dem ersten Client und wiederholt das Log, mit --once nur ein Durchlauf.
+#
+# python -m devtools.simulator_nasalog_replay packet.log --start 12:00:00 --end 13:00:00
+# python -m devtools.simulator_nasalog_replay packet.log
+# python -m devtools.simulator_nasalog_replay packet.ehscap.zst
+# python -m devtools.simulator_nasalog_replay packet.log.2026-10-18.gz --speed 60
+# python -m devtools.simulator_nasalog_replay packet.ehscap.2026-10-18.gz --speed max --once
+
+def replay_window(logfile, start_time=None, end_time=None):
+    """
+    Rechnet start/end (Sekunden seit Mitternacht des ersten Pakets) in Wanduhrzeiten um.
+    Liefert None, wenn das Log oder das Zeitfenster keine Pakete enthält.
+    """
+    with closing(read_packets(logfile)) as packets:
+        first = next(packets, None)
+        if first is None:
+            return None
+        if start_time is None and end_time is None:
+            return None, None
+    midnight = datetime.fromtimestamp(first[0]).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    start = midnight + start_time if start_time is not None else None
+    end = midnight + end_time if end_time is not None else None
+    with closing(iter_packets(logfile, start, end)) as packets:
+        if next(packets, None) is None:
+            return None
+    return start, end
+
+
+def iter_packets(logfile, start=None, end=None):
+    """Liefert (Wanduhrzeit, Frame) aus Text- oder Binärlogs, start/end als Wanduhrzeit."""
+    # mit Index (.idx) wird direkt an den Anfang des Zeitfensters gesprungen
+    with closing(read_packets(logfile, start, end)) as packets:
+        for ts, mono_ns, pkt in packets:
+            yield ts, pkt
+
+
+class SharedReplay:
+    """Liest das Log einmal und verteilt die Frames in Batches an alle verbundenen Clients."""
+
+    def __init__(self, logfile, start, end, speed, once):
+        self.logfile = logfile
+        self.start = start
+        self.end = end
+        self.speed = speed  # None = so schnell wie möglich
+        self.once = once
+        self.clients = set()
+        self._connected = asyncio.Event()
+
+    def add_client(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE)
+        self.clients.add(queue)
+        self._connected.set()
+        return queue
+
+    def remove_client(self, queue):
+        self.clients.discard(queue)
+        if len(self.clients) == 0:
+            self._connected.clear()
+
+    async def run(self):
+        while True:
+            await self._connected.wait()
+            started = time.monotonic()
+            frames = await self._replay_once()
+            print(f"Replayed {frames} packets in {time.monotonic() - started:.1f} s to {len(self.clients)} client(s)")
+            if self.once:
+                await self._broadcast(None)
+                while len(self.clients) > 0:
+                    await asyncio.sleep(0.1)
+                return
+
+    async def _replay_once(self) -> int:
+        loop = asyncio.get_running_loop()
+        frames = 0
+        base = None
+        batch = []
+        for ts, pkt in iter_packets(self.logfile, self.start, self.end):
+            if not self._connected.is_set():
+                await self._connected.wait()
+                base = None  # nach einer Pause ohne Clients mit dem aktuellen Paket neu aufsetzen
+            frames += 1
+            if self.speed is None:
+                batch.append(pkt)
+                if len(batch) >= MAX_BATCH:
+                    await self._send(batch)
+                    batch = []
+                continue
+
+            if base is None:
+                base = (ts, loop.time())
+            due = base[1] + (ts - base[0]) / self.speed
+            if len(batch) > 0 and (due > loop.time() + TICK or len(batch) >= MAX_BATCH):
+                await self._send(batch)
+                batch = []
+            wait = due - loop.time()
+            if wait > TICK:
                 await asyncio.sleep(wait)
-            writer.write(pkt)
-            await writer.drain()
-        # Nach dem letzten Paket: von vorne beginnen
+            batch.append(pkt)
+        if len(batch) > 0:
+            await self._send(batch)
+        return frames
+
+    async def _send(self, batch: list):
+        await self._broadcast(b"".join(batch))
 
-async def handle_client(reader, writer, packets):
+    async def _broadcast(self, data):
+        for queue in list(self.clients):
+            await queue.put(data)
+
+
+async def handle_client(reader, writer, replay: SharedReplay):
     addr = writer.get_extra_info('peername')
     print(f"Client connected: {addr}")
+    queue = replay.add_client()
     try:
-        await replay_packets(writer, packets)
+        while True:
+            data = await queue.get()
+            if data is None:
+                break
+            writer.write(data)
+            await writer.drain()
     except Exception as e:
         print(f"Client error: {e}")
     finally:
+        replay.remove_client(queue)
         try:
             writer.close()
             await writer.wait_closed()
@@ -79,26 +156,39 @@ def parse_time_to_seconds(timestr):
         t = datetime.strptime(timestr, "%H:%M:%S")
     return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
 
+def parse_speed(text):
+    if text.lower() in ("max", "0"):
+        return None
+    speed = float(text)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be greater than 0 or 'max'")
+    return speed
+
 async def main():
     parser = argparse.ArgumentParser(description="TCP Packet Replay Simulator")
     parser.add_argument("logfile", help="Pfad zur Logdatei")
     parser.add_argument("--start", help="Startzeit (HH:MM:SS[.sss])", default=None)
     parser.add_argument("--end", help="Endzeit (HH:MM:SS[.sss])", default=None)
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="Faktor gegenüber Echtzeit oder 'max'")
+    parser.add_argument("--once", action="store_true", help="Log nur einmal abspielen, danach Clients trennen und beenden")
+    parser.add_argument("--port", type=int, default=PORT)
     args = parser.parse_args()
 
     start_time = parse_time_to_seconds(args.start) if args.start else None
     end_time = parse_time_to_seconds(args.end) if args.end else None
 
-    packets = load_packets(args.logfile, start_time, end_time)
-    if not packets:
+    window = replay_window(args.logfile, start_time, end_time)
+    if window is None:
         print("No packets found in log file (or in selected time range)!")
         return
+
+    replay = SharedReplay(args.logfile, *window, args.speed, args.once)
     server = await asyncio.start_server(
-        lambda r, w: handle_client(r, w, packets), HOST, PORT
+        lambda r, w: handle_client(r, w, replay), HOST, args.port
     )
-    print(f"Async simulator listening on {HOST}:{PORT}")
+    print(f"Async simulator listening on {HOST}:{args.port}, speed {args.speed or 'max'}")
     async with server:
-        await server.serve_forever()
+        await replay.run()
 
 if __name__ == "__main__":
     try:
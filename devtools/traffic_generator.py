@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import random
+import socket
+import time
+
+from custom_components.ehs_sentinel.nasa_packet import AddressClassEnum, DataType
+from custom_components.ehs_sentinel.nasa_message import NASAMessage
+from devtools.fake_hass import load_nasa_repo
+from devtools.unit_emulator import build_packet
+
+# Erzeugt synthetischen NASA Busverkehr und stellt ihn per TCP bereit, als Last- und Dauertest-Quelle
+# für die Ingest-Pipeline (statt simulator_nasalog_replay, das nur ein Log in Echtzeit wiederholt).
+# Die Frames werden aus den Einträgen in nasa_repository.yml mit zufälligen, gültigen Werten über
+# NASAPacket.to_raw gebaut. Quellen und Nachrichten passen zueinander: Inneneinheit sendet 0x4xxx,
+# Außeneinheit 0x8xxx, die übrigen Klassen den Rest. Mit Wahrscheinlichkeiten je Frame werden Fehler
+# eingestreut: falsche CRC, abgeschnittene Frames, Müll zwischen Frames und auf mehrere TCP-Segmente
+# aufgeteilte Frames. Ein echter Bus liefert etwa 10-20 Frames/s.
+#
+# python -m devtools.traffic_generator --rate 200 --port 5020
+# python -m devtools.traffic_generator --rate 1000 --bad-crc 0.01 --truncate 0.01 --garbage 0.02 --split 0.1
+# python -m devtools.traffic_generator --sources Indoor=6,Outdoor=3,WiFiKit=1 --messages 1-10 --seed 1
+
+HOST = "0.0.0.0"
+PORT = 5020
+BROADCAST = (AddressClassEnum.BroadcastSetLayer, 0x00, 0x20)
+FAULTS = ("bad_crc", "truncate", "garbage", "split")
+GARBAGE = bytes(b for b in range(256) if b != 0x32)
+STRUCTURE_SHARE = 0.05  # Anteil der Frames mit einer Strukturnachricht, falls die Quelle welche sendet
+TICK = 0.01  # Sekunden je Sendeschritt, bei hohen Raten werden mehrere Frames je Schritt gesendet
+
+
+def random_payload(rng: random.Random, meta: dict, message_type: int) -> bytes:
+    if message_type == 3:
+        text = b"EHS-%04d" % rng.randrange(10000)
+        return bytes([len(text) + 2, *text, 0x00, 0x00])
+    size = {0: 1, 1: 2, 2: 4}[message_type]
+    if meta.get("type") == "ENUM" and meta.get("enum"):
+        return int(rng.choice(list(meta["enum"]))).to_bytes(size, byteorder="big")
+    low, high = {0: (0, 100), 1: (-400, 900), 2: (0, 1000000)}[message_type]
+    return rng.randint(low, high).to_bytes(size, byteorder="big", signed=True)
+
+
+class TrafficGenerator:
+    """Liefert Frames als Liste von Byte-Stücken, jedes Stück wird mit einem eigenen write() gesendet."""
+
+    def __init__(self, nasa_repo: dict, sources: dict, messages: tuple, faults: dict, seed: int = None):
+        self.rng = random.Random(seed)
+        self.sources = [AddressClassEnum[name] for name in sources]
+        self.weights = list(sources.values())
+        self.messages = messages
+        self.faults = faults
+        self.packet_number = 0
+        self.counts = {"frames": 0, "messages": 0, "bytes": 0, **{fault: 0 for fault in FAULTS}}
+        self.by_source = {}
+        for key, meta in nasa_repo.items():
+            number = int(meta["address"], 16)
+            prefix = number >> 12
+            source = AddressClassEnum.Indoor if prefix == 0x4 else AddressClassEnum.Outdoor if prefix == 0x8 else None
+            structure = (number & 1536) >> 9 == 3
+            self.by_source.setdefault((source, structure), []).append((number, meta))
+
+    def _messages(self, source: AddressClassEnum) -> list:
+        key = source if (source, False) in self.by_source else None
+        structures = self.by_source.get((key, True), [])
+        if len(structures) > 0 and self.rng.random() < STRUCTURE_SHARE:
+            # Strukturnachrichten (Typ 3) müssen allein im Frame stehen
+            chosen = [self.rng.choice(structures)]
+        else:
+            candidates = self.by_source[(key, False)]
+            chosen = self.rng.sample(candidates, min(self.rng.randint(*self.messages), len(candidates)))
+        return [NASAMessage(packet_message=number, packet_message_type=(number & 1536) >> 9,
+                            packet_payload=random_payload(self.rng, meta, (number & 1536) >> 9)) for number, meta in chosen]
+
+    def next_frame(self) -> list:
+        source = self.rng.choices(self.sources, self.weights)[0]
+        messages = self._messages(source)
+        self.packet_number = (self.packet_number + 1) & 0xFF
+        frame = bytearray(build_packet((source, 0x00, 0x00), BROADCAST, DataType.Notification, self.packet_number, messages))
+        self.counts["frames"] += 1
+        self.counts["messages"] += len(messages)
+
+        chunks = []
+        if self._fault("garbage"):
+            # Bytes ohne Startbyte 0x32, wie Störungen auf der Leitung
+            chunks.append(bytes(self.rng.choice(GARBAGE) for _ in range(self.rng.randint(1, 16))))
+        if self._fault("bad_crc"):
+            frame[-2] ^= 0xFF
+        if self._fault("truncate"):
+            frame = frame[:self.rng.randint(3, len(frame) - 1)]
+        if self._fault("split") and len(frame) > 2:
+            cut = self.rng.randint(1, len(frame) - 1)
+            chunks += [bytes(frame[:cut]), bytes(frame[cut:])]
+        else:
+            chunks.append(bytes(frame))
+        self.counts["bytes"] += sum(len(chunk) for chunk in chunks)
+        return chunks
+
+    def _fault(self, name: str) -> bool:
+        if self.rng.random() < self.faults.get(name, 0):
+            self.counts[name] += 1
+            return True
+        return False
+
+
+async def serve_client(reader, writer, args, nasa_repo):
+    addr = writer.get_extra_info("peername")
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        # damit aufgeteilte Frames auch als eigene TCP-Segmente ankommen
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    generator = TrafficGenerator(nasa_repo, args.sources, args.messages, args.faults, args.seed)
+    print(f"Client connected: {addr}")
+    started = time.monotonic()
+    reported = started
+    sent = 0
+    try:
+        while args.duration is None or time.monotonic() - started < args.duration:
+            due = int((time.monotonic() - started) * args.rate)
+            while sent < due:
+                chunks = generator.next_frame()
+                for i, chunk in enumerate(chunks):
+                    writer.write(chunk)
+                    if i < len(chunks) - 1:
+                        await writer.drain()
+                        await asyncio.sleep(0)
+                sent += 1
+            await writer.drain()
+            now = time.monotonic()
+            if now - reported >= args.report:
+                print(f"{addr}: {sent / (now - started):.0f} frames/s, {generator.counts}")
+                reported = now
+            await asyncio.sleep(TICK)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+        print(f"Client disconnected: {addr}, {generator.counts}")
+
+
+def parse_sources(text: str) -> dict:
+    sources = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        AddressClassEnum[name.strip()]  # unbekannte Klassen sofort melden
+        sources[name.strip()] = float(weight or 1)
+    return sources
+
+
+def parse_range(text: str) -> tuple:
+    low, _, high = text.partition("-")
+    return int(low), int(high or low)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Synthetic NASA bus traffic over TCP")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--rate", type=float, default=20, help="Frames pro Sekunde je Client")
+    parser.add_argument("--sources", type=parse_sources, default="Indoor=6,Outdoor=3,WiFiKit=1", help="Quell-Adressklassen mit Gewicht")
+    parser.add_argument("--messages", type=parse_range, default="1-10", help="Nachrichten je Frame, z.B. 1-10")
+    parser.add_argument("--duration", type=float, help="Sekunden je Client, ohne Angabe endlos")
+    parser.add_argument("--seed", type=int, help="gleicher Seed, gleicher Verkehr")
+    parser.add_argument("--report", type=float, default=5, help="Sekunden zwischen zwei Statusausgaben")
+    for fault in FAULTS:
+        parser.add_argument(f"--{fault.replace('_', '-')}", type=float, default=0, help=f"Wahrscheinlichkeit je Frame für {fault}")
+    args = parser.parse_args()
+    args.faults = {fault: getattr(args, fault) for fault in FAULTS}
+    return args
+
+
+async def main():
+    args = parse_args()
+    nasa_repo = load_nasa_repo()
+    server = await asyncio.start_server(lambda r, w: serve_client(r, w, args, nasa_repo), args.host, args.port)
+    print(f"Traffic generator listening on {args.host}:{args.port}, {args.rate:.0f} frames/s, faults {args.faults}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Traffic generator stopped.")
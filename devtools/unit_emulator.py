@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import random
+
+import yaml
+
+from custom_components.ehs_sentinel.nasa_packet import NASAPacket, AddressClassEnum, PacketType, DataType
+from custom_components.ehs_sentinel.nasa_message import NASAMessage
+from custom_components.ehs_sentinel.packet_capture import read_packets
+from devtools.fake_hass import load_nasa_repo
+
+# Zustandsbehafteter Emulator von Innen- und Außeneinheit für Tests des MessageProducers ohne Gerät.
+# Er führt eine Wertetabelle (Default-Werte aus nasa_repository.yml, optional aus einem FSV-Export
+# oder einer Aufzeichnung), beantwortet Reads mit Responses, übernimmt Schreibanfragen und quittiert
+# sie mit Ack bzw. Nack (unbekannte oder nicht beschreibbare Nachricht, ungültiger Enum-Wert) und
+# sendet regelmäßig Notifications wie ein echtes Gerät. Antwortzeit, Verlustrate und ein belegter
+# Bus lassen sich einstellen: Alle Frames gehen nacheinander über einen gemeinsamen Bus, dessen
+# Übertragungszeit sich aus der Baudrate ergibt, andere Teilnehmer belegen ihn zu --bus-load.
+# Mit --seed sind Verluste und Antwortzeiten reproduzierbar.
+#
+# Die Benchmarks und Harnesses in devtools nutzen den UnitEmulator und build_packet/split_frames
+# von hier, statt eigene Emulatoren mitzubringen.
+#
+# python -m devtools.unit_emulator --port 5020 --latency 0.1 --loss 0.05
+# python -m devtools.unit_emulator --fsv fsv_export.yaml --bus-load 0.3 --notify-interval 5
+# python -m devtools.unit_emulator --capture packet.ehscap.2026-10-18.gz --no-ack
+
+HOST = "0.0.0.0"
+PORT = 5020
+LOCALHOST = "127.0.0.1"  # für Benchmarks und Harnesses, die Emulator und Coordinator im selben Prozess starten
+INDOOR = (AddressClassEnum.Indoor, 0x00, 0x00)
+OUTDOOR = (AddressClassEnum.Outdoor, 0x00, 0x00)
+BROADCAST = (AddressClassEnum.BroadcastSetLayer, 0x00, 0x20)
+BITS_PER_BYTE = 10  # 8N1
+FOREIGN_FRAME = 30  # typische Länge der Frames anderer Teilnehmer in Bytes
+NOTIFY_CHUNK = 10
+
+
+def build_packet(source, dest, data_type: DataType, number: int, messages: list[NASAMessage]) -> bytes:
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(source[0])
+    packet.set_packet_source_channel(source[1])
+    packet.set_packet_source_address(source[2])
+    packet.set_packet_dest_address_class(dest[0])
+    packet.set_packet_dest_channel(dest[1])
+    packet.set_packet_dest_address(dest[2])
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(data_type)
+    packet.set_packet_number(number)
+    packet.set_packet_messages(messages)
+    return packet.to_raw()
+
+
+def split_frames(buffer: bytearray):
+    """Schneidet vollständige Frames (0x32 ... 0x34) aus dem Puffer, Rest bleibt im Puffer."""
+    frames = []
+    while True:
+        start = buffer.find(b'\x32')
+        if start < 0:
+            buffer.clear()
+            break
+        del buffer[:start]
+        if len(buffer) < 3:
+            break
+        size = ((buffer[1] << 8) | buffer[2]) + 2
+        if len(buffer) < size:
+            break
+        frames.append(bytes(buffer[:size]))
+        del buffer[:size]
+    return frames
+
+
+def encode_value(meta: dict, value) -> bytes:
+    """Wert wie im FSV-Export (Enum-Text oder Zahl) in den Rohwert der Nachricht umrechnen."""
+    number = int(meta["address"], 16)
+    size = {0: 1, 1: 2, 2: 4}[(number & 1536) >> 9]
+    if meta.get("type") == "ENUM" and meta.get("enum"):
+        raw = next(key for key, text in meta["enum"].items() if text == value)
+    elif meta.get("reverse-arithmetic"):
+        raw = int(eval(meta["reverse-arithmetic"], {}, {"value": value}))
+    else:
+        raw = int(value)
+    return raw.to_bytes(size, byteorder="big", signed=raw < 0)
+
+
+class UnitEmulator:
+    """Beantwortet Reads und Writes aus einer gemeinsamen Wertetabelle (Nachrichtennummer -> Rohwert)."""
+
+    def __init__(self, nasa_repo: dict, latency: float = 0.05, jitter: float = 0.0, loss: float = 0.0,
+                 send_acks: bool = True, baud: int = 0, bus_load: float = 0.0, notify_interval: float = 10, seed: int = None):
+        self.nasa_repo = nasa_repo
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.send_acks = send_acks
+        self.baud = baud
+        self.bus_load = bus_load
+        self.notify_interval = notify_interval
+        self.rng = random.Random(seed)
+        self.values = {}
+        self.clients = set()
+        self.corrupt = False  # alle gesendeten Frames mit falscher CRC, z.B. für gestörte Leitungen
+        self.stats = {"reads": 0, "writes": 0, "acks": 0, "nacks": 0, "lost": 0, "responses": 0, "notifications": 0, "bus_wait": 0.0}
+        self._meta = {int(meta["address"], 16): meta for meta in nasa_repo.values()}
+        self._bus = asyncio.Lock()
+
+    def seed_defaults(self):
+        """Gültiger Wert für jede Nachricht, bei ENUMs der erste Eintrag."""
+        for number, meta in self._meta.items():
+            message_type = (number & 1536) >> 9
+            if message_type == 3:
+                self.values.setdefault(number, bytes([0x0E, *b"EHS-Sentinel", 0x00, 0x00]))
+                continue
+            value = next(iter(meta["enum"])) if meta.get("type") == "ENUM" and meta.get("enum") else 0
+            self.values.setdefault(number, int(value).to_bytes({0: 1, 1: 2, 2: 4}[message_type], byteorder="big"))
+
+    def seed_fsv(self, path) -> int:
+        """Werte aus einem FSV-Export (export_fsv_file) übernehmen."""
+        with open(path) as f:
+            exported = yaml.safe_load(f) or {}
+        count = 0
+        for key, value in exported.items():
+            if key in self.nasa_repo and value is not None:
+                self.values[int(self.nasa_repo[key]["address"], 16)] = encode_value(self.nasa_repo[key], value)
+                count += 1
+        return count
+
+    def seed_capture(self, path) -> int:
+        """Jeweils letzten Wert jeder Nachricht aus einer Aufzeichnung von Innen- oder Außeneinheit übernehmen."""
+        count = 0
+        for _, _, frame in read_packets(path):
+            packet = NASAPacket()
+            try:
+                packet.parse(bytearray(frame))
+            except Exception:
+                continue
+            if packet.packet_source_address_class not in (AddressClassEnum.Indoor, AddressClassEnum.Outdoor):
+                continue
+            for msg in packet.packet_messages:
+                self.values[msg.packet_message] = bytes(msg.packet_payload)
+                count += 1
+        return count
+
+    def close_clients(self):
+        """Trennt alle verbundenen Clients, z.B. um einen Ausfall der Bridge nachzustellen."""
+        for writer in list(self.clients):
+            writer.close()
+
+    def _owner(self, number: int) -> tuple:
+        return OUTDOOR if number >> 12 == 0x8 else INDOOR
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        tasks = [asyncio.create_task(self._notify(writer))]
+        if self.bus_load > 0 and self.baud > 0:
+            tasks.append(asyncio.create_task(self._foreign_traffic(writer)))
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                buffer.extend(data)
+                for frame in split_frames(buffer):
+                    packet = NASAPacket()
+                    try:
+                        packet.parse(bytearray(frame))
+                    except Exception:
+                        continue
+                    if packet.packet_data_type in (DataType.Read, DataType.Request):
+                        asyncio.create_task(self._answer(writer, packet))
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _transmit(self, writer, frame: bytes):
+        """Sendet einen Frame über den gemeinsamen Bus, belegt ihn für die Übertragungszeit."""
+        waiting = asyncio.get_running_loop().time()
+        async with self._bus:
+            self.stats["bus_wait"] += asyncio.get_running_loop().time() - waiting
+            if self.baud > 0:
+                await asyncio.sleep(len(frame) * BITS_PER_BYTE / self.baud)
+            if self.corrupt:
+                frame = bytearray(frame)
+                frame[-2] ^= 0xFF
+            if not writer.is_closing():
+                writer.write(frame)
+                await writer.drain()
+
+    async def _foreign_traffic(self, writer):
+        # andere Teilnehmer (Fernbedienung, WiFi Kit, ...) belegen den Bus im Mittel zu bus_load
+        busy = FOREIGN_FRAME * BITS_PER_BYTE / self.baud
+        while not writer.is_closing():
+            await asyncio.sleep(self.rng.expovariate(self.bus_load / (busy * (1 - self.bus_load))))
+            async with self._bus:
+                await asyncio.sleep(busy)
+
+    async def _notify(self, writer):
+        # erste Notifications sofort, damit der Coordinator die Adressen erkennt
+        while not writer.is_closing():
+            for unit in (INDOOR, OUTDOOR):
+                # wie beim Gerät werden Messwerte und Zustände verteilt, FSV Einstellungen nur auf Anfrage
+                numbers = [n for n in self.values if self._owner(n) == unit and (n & 1536) >> 9 != 3 and not self._is_setting(n)]
+                for i in range(0, max(len(numbers), 1), NOTIFY_CHUNK):
+                    messages = [NASAMessage(n, (n & 1536) >> 9, self.values[n]) for n in numbers[i:i + NOTIFY_CHUNK]] or [NASAMessage(0x0000, 0, [0])]
+                    await self._transmit(writer, build_packet(unit, BROADCAST, DataType.Notification, 0, messages))
+                    self.stats["notifications"] += 1
+            await asyncio.sleep(self.notify_interval)
+
+    async def _answer(self, writer, packet: NASAPacket):
+        if self.rng.random() < self.loss:
+            self.stats["lost"] += 1
+            return
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        source = (packet.packet_source_address_class, packet.packet_source_channel, packet.packet_source_address)
+        numbers = [msg.packet_message for msg in packet.packet_messages]
+        unit = self._owner(numbers[0]) if len(numbers) > 0 else INDOOR
+        if packet.packet_data_type == DataType.Read:
+            self.stats["reads"] += 1
+            messages = [NASAMessage(msg.packet_message, msg.packet_message_type, self.values.get(msg.packet_message, msg.packet_payload)) for msg in packet.packet_messages]
+            await self._transmit(writer, build_packet(unit, source, DataType.Resposne, packet.packet_number, messages))
+            self.stats["responses"] += 1
+            return
+
+        self.stats["writes"] += 1
+        accepted = all(self._writable(msg) for msg in packet.packet_messages)
+        if accepted:
+            for msg in packet.packet_messages:
+                self.values[msg.packet_message] = bytes(msg.packet_payload)
+        if self.send_acks:
+            await self._transmit(writer, build_packet(unit, source, DataType.Ack if accepted else DataType.Nack, packet.packet_number, packet.packet_messages))
+            self.stats["acks" if accepted else "nacks"] += 1
+
+    def _is_setting(self, number: int) -> bool:
+        return bool(self._meta.get(number, {}).get("hass_opts", {}).get("writable"))
+
+    def _writable(self, msg: NASAMessage) -> bool:
+        if not self._is_setting(msg.packet_message):
+            return False
+        meta = self._meta[msg.packet_message]
+        if meta.get("type") == "ENUM" and meta.get("enum"):
+            return int.from_bytes(msg.packet_payload, byteorder="big") in meta["enum"]
+        return True
+
+
+def build_emulator(args, nasa_repo: dict) -> UnitEmulator:
+    emulator = UnitEmulator(nasa_repo, latency=args.latency, jitter=args.jitter, loss=args.loss, send_acks=not args.no_ack,
+                            baud=args.baud, bus_load=args.bus_load, notify_interval=args.notify_interval, seed=args.seed)
+    if args.capture:
+        print(f"{emulator.seed_capture(args.capture)} values from {args.capture}")
+    if args.fsv:
+        print(f"{emulator.seed_fsv(args.fsv)} values from {args.fsv}")
+    emulator.seed_defaults()
+    return emulator
+
+
+def add_emulator_args(parser):
+    parser.add_argument("--latency", type=float, default=0.05, help="Antwortzeit in Sekunden")
+    parser.add_argument("--jitter", type=float, default=0.0, help="zusätzliche zufällige Antwortzeit bis zu n Sekunden")
+    parser.add_argument("--loss", type=float, default=0.0, help="Anteil unbeantworteter Reads/Writes")
+    parser.add_argument("--no-ack", action="store_true", help="Writes nicht quittieren (Bestätigung nur über Rücklesen)")
+    parser.add_argument("--baud", type=int, default=9600, help="Baudrate des Busses, 0 = ohne Übertragungszeit")
+    parser.add_argument("--bus-load", type=float, default=0.0, help="Anteil der Zeit, den andere Teilnehmer den Bus belegen")
+    parser.add_argument("--notify-interval", type=float, default=10, help="Sekunden zwischen zwei Runden Notifications")
+    parser.add_argument("--fsv", help="Werte aus einem FSV-Export (YAML) übernehmen")
+    parser.add_argument("--capture", help="Werte aus packet.log/packet.ehscap übernehmen")
+    parser.add_argument("--seed", type=int, help="gleicher Seed, gleiche Verluste und Antwortzeiten")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Stateful indoor/outdoor unit emulator")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    add_emulator_args(parser)
+    args = parser.parse_args()
+    emulator = build_emulator(args, load_nasa_repo())
+    server = await asyncio.start_server(emulator.handle_client, args.host, args.port)
+    print(f"Unit emulator listening on {args.host}:{args.port} with {len(emulator.values)} values")
+    async with server:
+        while True:
+            await asyncio.sleep(10)
+            print(emulator.stats)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Emulator stopped.")
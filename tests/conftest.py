@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from custom_components.ehs_sentinel.clock import Clock
+
+
+class FakeClock(Clock):
+    """Clock für Tests: steht still, bis advance() oder sleep() sie weiterschiebt."""
+
+    def __init__(self, start: float = 1000.0):
+        self._now = start
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        self._now += seconds
+
+    async def sleep(self, seconds: float):
+        self._now += max(seconds, 0)
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,103 @@
+import pytest
+
+from custom_components.ehs_sentinel.adaptive_polling import AdaptiveInterval
+from custom_components.ehs_sentinel.poll_scheduler import PollScheduler
+
+
+def poll(interval: AdaptiveInterval, clock, value=None):
+    """Fragt ab, sobald fällig, und liefert die Antwort gleich danach wie der Bus."""
+    clock.advance(max(interval.next_due - clock.monotonic(), 0) if interval.next_due is not None else 0)
+    assert interval.due(clock.monotonic())
+    interval.on_poll(clock.monotonic())
+    if value is not None:
+        interval.on_value(value, clock.monotonic())
+    return interval.interval
+
+
+def test_interval_grows_while_value_is_unchanged(clock):
+    interval = AdaptiveInterval(10, 80)
+
+    intervals = [poll(interval, clock, 1) for _ in range(6)]
+
+    assert intervals == [10, 20, 40, 80, 80, 80]
+
+
+def test_change_resets_interval_and_next_due(clock):
+    interval = AdaptiveInterval(10, 80)
+    for _ in range(4):
+        poll(interval, clock, 1)
+    assert interval.interval == 80
+
+    clock.advance(5)
+    interval.on_value(2, clock.monotonic())
+
+    assert interval.interval == 10
+    assert interval.next_due == clock.monotonic() + 10
+
+
+def test_change_in_poll_answer_stops_growth_at_next_poll(clock):
+    interval = AdaptiveInterval(10, 80)
+    poll(interval, clock, 1)
+    poll(interval, clock, 1)
+    assert interval.interval == 20
+
+    # die Antwort auf diesen Poll bringt die Änderung, der nächste Poll darf nicht wachsen
+    assert poll(interval, clock, 2) == 10
+    assert poll(interval, clock, 2) == 10
+    assert poll(interval, clock, 2) == 20
+
+
+def test_value_flapping_back_between_polls_counts_as_change(clock):
+    interval = AdaptiveInterval(10, 80)
+    poll(interval, clock, 1)
+    poll(interval, clock, 1)
+
+    clock.advance(1)
+    interval.on_value(2, clock.monotonic())
+    interval.on_value(1, clock.monotonic())
+
+    assert poll(interval, clock) == 10
+
+
+def test_set_bounds_clamps_current_interval(clock):
+    interval = AdaptiveInterval(10, 160)
+    for _ in range(5):
+        poll(interval, clock, 1)
+    assert interval.interval == 160
+
+    interval.set_bounds(10, 40)
+    assert interval.interval == 40
+    interval.set_bounds(60, 120)
+    assert interval.interval == 60
+
+
+@pytest.mark.parametrize("min_interval, max_interval", [(0, 10), (20, 10)])
+def test_invalid_bounds_are_rejected(min_interval, max_interval):
+    with pytest.raises(ValueError):
+        AdaptiveInterval(min_interval, max_interval)
+
+
+def test_scheduler_keeps_adaptive_state_on_reconfigure(clock):
+    class Coordinator:
+        running = True
+
+        def parse_time_string(self, time_str: str) -> int:
+            return int(time_str[:-1]) * {"s": 1, "m": 60, "h": 3600}[time_str[-1]]
+
+    yaml = {
+        "fetch_interval": [{"name": "a", "schedule": "10s", "enable": True, "adaptive": True, "max_interval": "80s"}],
+        "groups": {"a": ["NASA_A"]},
+    }
+    scheduler = PollScheduler(Coordinator(), clock)
+    scheduler.configure(yaml)
+    group = scheduler.groups["a"]
+    for _ in range(3):
+        assert group.due_messages(clock.monotonic()) == ["NASA_A"]
+        scheduler.observe("NASA_A", 1)
+        clock.advance(group.adaptive["NASA_A"].next_due - clock.monotonic())
+    assert group.adaptive["NASA_A"].interval == 40
+
+    scheduler.configure(yaml)
+    assert scheduler.groups["a"].adaptive["NASA_A"].interval == 40
+    scheduler.observe("NASA_A", 2)
+    assert scheduler.adaptive_summary() == {"a": (10, 10, 10)}
@@ -0,0 +1,55 @@
+import pytest
+import yaml
+
+from custom_components.ehs_sentinel.config_flow import validate_polling_yaml
+from custom_components.ehs_sentinel.const import DEFAULT_POLLING_YAML
+from custom_components.ehs_sentinel.coordinator import EHSSentinelCoordinator
+from custom_components.ehs_sentinel.poll_scheduler import PollScheduler
+
+
+class Coordinator:
+    running = True
+    parse_time_string = EHSSentinelCoordinator.parse_time_string
+
+
+def poller(**options) -> str:
+    return yaml.safe_dump({"fetch_interval": [{"name": "a", "enable": True, **options}], "groups": {"a": ["VAR_IN_FSV_1011"]}})
+
+
+VALID = [
+    DEFAULT_POLLING_YAML,
+    "",
+    poller(schedule="30m", freshness="15m"),
+    poller(schedule="10s", adaptive=True, min_interval="5m", max_interval="1m"),  # Gruppen-Maximum wird angehoben
+    poller(schedule="10m", adaptive=True, overrides={"VAR_IN_FSV_1011": {"min_interval": "1h"}}),
+    poller(schedule="10m", adaptive=True, overrides={"VAR_IN_FSV_1011": None}),
+]
+
+INVALID = [
+    ("fetch_interval: [", "invalid_yaml"),
+    ("- a\n- b", "invalid_yaml"),
+    ("fetch_interval: {a: 1}", "invalid_yaml"),
+    ("groups: [a]", "invalid_yaml"),
+    (poller(schedule="30"), "invalid_polling_time"),
+    (poller(schedule=30), "invalid_polling_time"),
+    (poller(schedule="0s"), "invalid_polling_time"),
+    (poller(), "invalid_polling_time"),
+    (poller(schedule="30m", freshness="15 minutes"), "invalid_polling_time"),
+    (poller(schedule="10m", adaptive=True, min_interval="0m"), "invalid_polling_time"),
+    (poller(schedule="10m", adaptive=True, max_interval="1d"), "invalid_polling_time"),
+    (poller(schedule="10m", adaptive=True, overrides={"VAR_IN_FSV_1011": {"min_interval": "x"}}), "invalid_polling_time"),
+    (poller(schedule="10m", adaptive=True, overrides={"VAR_IN_FSV_1011": {"max_interval": "5m"}}), "invalid_polling_time"),
+    (poller(schedule="10m", adaptive=True, overrides={"VAR_IN_FSV_1011": "5m"}), "invalid_yaml"),
+]
+
+
+@pytest.mark.parametrize("polling_yaml", VALID)
+def test_valid_polling_yaml_configures_the_scheduler(polling_yaml):
+    assert validate_polling_yaml(polling_yaml) is None
+    PollScheduler(Coordinator()).configure(yaml.safe_load(polling_yaml))
+
+
+@pytest.mark.parametrize("polling_yaml, error", INVALID)
+def test_invalid_polling_yaml_is_a_form_error(polling_yaml, error):
+    assert validate_polling_yaml(polling_yaml) == error
+
@@ -0,0 +1,114 @@
+from custom_components.ehs_sentinel.health_monitor import (
+    HEALTH_DEGRADED,
+    HEALTH_FAILED,
+    HEALTH_OK,
+    HEALTH_STARTING,
+    HealthMonitor,
+)
+
+WINDOW = 30
+
+
+def window(monitor: HealthMonitor, clock, valid: dict = None, crc: int = 0, invalid: int = 0) -> str:
+    """Ein 30 s Fenster mit den angegebenen Frames je Quelle, danach auswerten."""
+    for source, count in (valid if valid is not None else {"indoor": 60, "outdoor": 30}).items():
+        for _ in range(count):
+            monitor.frame_valid(source)
+    for _ in range(crc):
+        monitor.frame_crc_error()
+    for _ in range(invalid):
+        monitor.frame_invalid()
+    clock.advance(WINDOW)
+    return monitor.evaluate(clock.monotonic())
+
+
+def warmed_up(clock) -> HealthMonitor:
+    monitor = HealthMonitor()
+    monitor.evaluate(clock.monotonic())
+    for _ in range(HealthMonitor.WARMUP_WINDOWS):
+        window(monitor, clock)
+    return monitor
+
+
+def test_starting_during_warmup_then_healthy(clock):
+    monitor = HealthMonitor()
+    assert monitor.evaluate(clock.monotonic()) == HEALTH_STARTING
+
+    states = [window(monitor, clock) for _ in range(HealthMonitor.WARMUP_WINDOWS + 1)]
+
+    assert states == [HEALTH_STARTING] * HealthMonitor.WARMUP_WINDOWS + [HEALTH_OK]
+    assert monitor.baseline == 3.0
+
+
+def test_low_rate_is_degraded(clock):
+    monitor = warmed_up(clock)
+
+    assert window(monitor, clock, {"indoor": 20, "outdoor": 10}) == HEALTH_DEGRADED
+    assert "valid frame rate" in monitor.reasons[0]
+    assert window(monitor, clock) == HEALTH_OK
+
+
+def test_failed_only_after_consecutive_windows(clock):
+    monitor = warmed_up(clock)
+
+    assert window(monitor, clock, {"indoor": 2}) == HEALTH_DEGRADED
+    assert window(monitor, clock, {"indoor": 2}) == HEALTH_FAILED
+    assert window(monitor, clock) == HEALTH_OK
+
+
+def test_only_garbage_fails_without_baseline(clock):
+    monitor = HealthMonitor()
+    monitor.evaluate(clock.monotonic())
+
+    assert window(monitor, clock, {}, crc=50) == HEALTH_DEGRADED
+    assert window(monitor, clock, {}, crc=50, invalid=10) == HEALTH_FAILED
+    assert monitor.reasons == ["no valid frames"]
+
+
+def test_crc_error_ratio_is_degraded(clock):
+    monitor = warmed_up(clock)
+
+    assert window(monitor, clock, crc=20) == HEALTH_DEGRADED
+    assert monitor.reasons[0].startswith("crc error ratio")
+
+
+def test_silent_source_is_degraded(clock):
+    monitor = warmed_up(clock)
+
+    assert window(monitor, clock, {"indoor": 90}) == HEALTH_DEGRADED
+    assert monitor.reasons == ["no frames from outdoor"]
+
+
+def test_baseline_is_not_learned_from_bad_windows(clock):
+    monitor = warmed_up(clock)
+    baseline = monitor.baseline
+
+    window(monitor, clock, {"indoor": 20, "outdoor": 10})
+    window(monitor, clock, {"indoor": 2})
+
+    assert monitor.baseline == baseline
+
+
+def test_reset_keeps_baseline_and_restarts_failed_count(clock):
+    monitor = warmed_up(clock)
+    baseline = monitor.baseline
+    assert window(monitor, clock, {"indoor": 2}) == HEALTH_DEGRADED
+
+    clock.advance(5)
+    monitor.reset(clock.monotonic())
+
+    assert monitor.baseline == baseline
+    assert window(monitor, clock, {"indoor": 2}) == HEALTH_DEGRADED
+    assert window(monitor, clock, {"indoor": 2}) == HEALTH_FAILED
+
+
+def test_counters_and_as_dict(clock):
+    monitor = warmed_up(clock)
+    window(monitor, clock, crc=1, invalid=2)
+
+    result = monitor.as_dict()
+    assert result["state"] == HEALTH_OK
+    assert result["valid_frames"] == 90 * (HealthMonitor.WARMUP_WINDOWS + 1)
+    assert result["crc_errors"] == 1
+    assert result["invalid_frames"] == 2
+    assert result["last"]["sources"] == {"indoor": 2.0, "outdoor": 1.0}
@@ -0,0 +1,230 @@
+import asyncio
+
+import pytest
+
+from custom_components.ehs_sentinel.coordinator import EHSSentinelCoordinator
+from custom_components.ehs_sentinel.message_producer import MessageProducer
+from custom_components.ehs_sentinel.nasa_packet import AddressClassEnum, DataType, NASAPacket
+from custom_components.ehs_sentinel.rtt_estimator import RttTracker
+
+INDOOR = {"class": AddressClassEnum.Indoor.value, "channel": 0, "address": 0}
+OUTDOOR = {"class": AddressClassEnum.Outdoor.value, "channel": 0, "address": 0}
+INDOOR_KEY = "20.00.00"
+OUTDOOR_KEY = "10.00.00"
+
+NASA_REPO = {
+    "ENUM_IN_A": {"address": "0x4001"},
+    "ENUM_IN_B": {"address": "0x4002"},
+    "VAR_IN_C": {"address": "0x4203"},
+    "ENUM_OUT_D": {"address": "0x8004", "dest_address_class": "Outdoor"},
+}
+
+
+class FakeCoordinator:
+    """Nur die Teile des Coordinators, die der Producer braucht, Quittungen mit der echten Zuordnung."""
+
+    create_ack_confirmation = EHSSentinelCoordinator.create_ack_confirmation
+    confirm_ack = EHSSentinelCoordinator.confirm_ack
+    create_write_confirmation = EHSSentinelCoordinator.create_write_confirmation
+    confirm_write = EHSSentinelCoordinator.confirm_write
+    create_read_confirmation = EHSSentinelCoordinator.create_read_confirmation
+    confirm_read = EHSSentinelCoordinator.confirm_read
+
+    def __init__(self):
+        self.nasa_repo = NASA_REPO
+        self.indoor_address = INDOOR
+        self.outdoor_address = OUTDOOR
+        self.extended_logging = False
+        self.producer = None
+        self.captures = []
+        self._ack_confirmations = {}
+        self._write_confirmations = {}
+        self._read_confirmations = {}
+        self.capture_ring = self
+
+    def add(self, frame):
+        pass
+
+    async def determine_value(self, rawvalue, msgname, packet_message_type):
+        return int.from_bytes(rawvalue, byteorder="big", signed=True)
+
+    async def dump_capture(self, reason: str, force: bool = False):
+        self.captures.append(reason)
+
+
+class FakeDevice:
+    """
+    Transport des Producers: beantwortet Writes je Ziel mit Ack, Nack oder gar nicht und Reads mit dem Wert.
+
+    ack: Ziel -> "ack", "nack" oder None. applies: ob ein Write den Wert tatsächlich übernimmt.
+    """
+
+    def __init__(self, coordinator: FakeCoordinator):
+        self.coordinator = coordinator
+        self.names = {int(meta["address"], 16): name for name, meta in NASA_REPO.items()}
+        self.ack = {INDOOR_KEY: "ack", OUTDOOR_KEY: "ack"}
+        self.applies = True
+        self.values = {}
+        self.packets = []
+
+    def write(self, frame):
+        packet = NASAPacket()
+        packet.parse(bytearray(frame))
+        self.packets.append(packet)
+        loop = asyncio.get_running_loop()
+        if packet.packet_data_type == DataType.Request:
+            if self.applies:
+                for message in packet.packet_messages:
+                    self.values[self.names[message.packet_message]] = int.from_bytes(message.packet_payload, byteorder="big", signed=True)
+            answer = self.ack.get(self.destination(packet))
+            if answer is not None:
+                loop.call_soon(self.coordinator.confirm_ack, packet.packet_number, answer == "ack")
+        elif packet.packet_data_type == DataType.Read:
+            for message in packet.packet_messages:
+                name = self.names[message.packet_message]
+                loop.call_soon(self.reply, name)
+
+    def reply(self, name):
+        self.coordinator.confirm_read(name)
+        if name in self.values:
+            self.coordinator.confirm_write(name, self.values[name])
+
+    async def drain(self):
+        await asyncio.sleep(0)
+
+    @staticmethod
+    def destination(packet) -> str:
+        return f"{packet.packet_dest_address_class.value:02X}.{packet.packet_dest_channel:02X}.{packet.packet_dest_address:02X}"
+
+    def writes(self, destination: str = None) -> list:
+        return [p for p in self.packets if p.packet_data_type == DataType.Request and destination in (None, self.destination(p))]
+
+
+@pytest.fixture
+def producer():
+    coordinator = FakeCoordinator()
+    producer = MessageProducer(None, coordinator)
+    coordinator.producer = producer
+    # kurze Timeouts, damit Tests ohne Ack nicht Sekunden warten
+    producer._ACK_PROBE_TIMEOUT = 0.05
+    producer._BACKOFF_BASE = 0.01
+    producer.rtt = RttTracker(initial_rto=0.1, min_rto=0.05, max_rto=0.2)
+    producer.set_writer(FakeDevice(coordinator))
+    return producer
+
+
+def test_unsupported_destination_leaves_no_ack_futures(producer):
+    device = producer.writer
+    device.ack[INDOOR_KEY] = None
+
+    async def run():
+        results = [await producer.write_request("ENUM_IN_A", str(i % 100)) for i in range(300)]
+        # danach quittiert das Gerät wieder, spätere Acks dürfen keine alten Writes treffen
+        device.ack[INDOOR_KEY] = "ack"
+        await producer.write_request("ENUM_IN_A", "1")
+        await asyncio.sleep(0)
+        supported_again = producer._ack_support[INDOOR_KEY]
+        acked = await producer.write_request("ENUM_IN_A", "2")
+        return results, supported_again, acked
+
+    results, supported_again, acked = asyncio.run(run())
+
+    assert all(results)
+    assert len(device.writes()) == 302
+    assert producer.coordinator._ack_confirmations == {}
+    assert len(producer._unawaited_acks) <= 256
+    assert supported_again is True
+    assert acked is True
+
+
+def test_confirm_ack_resolves_only_matching_packet_number():
+    async def run():
+        coordinator = FakeCoordinator()
+        first = coordinator.create_ack_confirmation(1)
+        second = coordinator.create_ack_confirmation(2)
+        coordinator.confirm_ack(2, False)
+        coordinator.confirm_ack(2, True)  # doppelte Quittung ändert nichts mehr
+        return first.done(), second.result(), coordinator._ack_confirmations
+
+    first_done, second_result, pending = asyncio.run(run())
+
+    assert first_done is False
+    assert second_result is False
+    assert list(pending) == [1]
+
+
+def test_write_with_ack_verifies_in_background(producer):
+    async def run():
+        result = await producer.write_request("ENUM_IN_A", "3", read_request_after=True)
+        await asyncio.gather(*producer._verification_tasks)
+        return result
+
+    assert asyncio.run(run()) is True
+    assert producer._ack_support[INDOOR_KEY] is True
+    assert producer.writer.values["ENUM_IN_A"] == 3
+    assert producer.coordinator._write_confirmations == {}
+    assert producer.rtt.get(INDOOR_KEY).samples == 1
+
+
+def test_write_with_nack_fails_without_read_back(producer):
+    producer.writer.ack[INDOOR_KEY] = "nack"
+
+    assert asyncio.run(producer.write_request("ENUM_IN_A", "3", read_request_after=True)) is False
+    assert [p.packet_data_type for p in producer.writer.packets] == [DataType.Request]
+    assert producer.coordinator._write_confirmations == {}
+
+
+def test_probe_timeout_falls_back_to_read_back(producer):
+    producer.writer.ack[INDOOR_KEY] = None
+
+    assert asyncio.run(producer.write_request("ENUM_IN_A", "4", read_request_after=True)) is True
+    assert producer._ack_support[INDOOR_KEY] is False
+    assert len(producer.writer.writes()) == 1
+    assert producer.writer.packets[-1].packet_data_type == DataType.Read
+
+
+def test_read_back_mismatch_retries_and_fails(producer):
+    producer.writer.ack[INDOOR_KEY] = None
+    producer.writer.applies = False
+
+    assert asyncio.run(producer.write_request("ENUM_IN_A", "4", read_request_after=True)) is False
+    assert len(producer.writer.writes()) == producer._MAX_RETRIES
+    assert producer.coordinator.captures == ["write_failed"]
+    assert producer.coordinator._write_confirmations == {}
+
+
+def test_missing_ack_after_support_is_retried_and_fails(producer):
+    async def run():
+        assert await producer.write_request("ENUM_IN_A", "1") is True
+        producer.writer.ack[INDOOR_KEY] = None
+        return await producer.write_request("ENUM_IN_A", "2")
+
+    assert asyncio.run(run()) is False
+    writes = producer.writer.writes()
+    assert [p.packet_retry_count for p in writes[1:]] == [0, 1, 2]
+    assert len({p.packet_number for p in writes[1:]}) == 1
+    assert producer.coordinator.captures == ["write_failed"]
+
+
+def test_write_batch_mixed_destinations(producer):
+    producer.writer.ack[OUTDOOR_KEY] = "nack"
+    values = {"ENUM_IN_A": 1, "ENUM_IN_B": 2, "VAR_IN_C": 300, "ENUM_OUT_D": 4, "UNKNOWN": 5}
+
+    results = asyncio.run(producer.write_batch(values))
+
+    assert results == {"UNKNOWN": False, "ENUM_IN_A": True, "ENUM_IN_B": True, "VAR_IN_C": True, "ENUM_OUT_D": False}
+    # ein Paket je Ziel
+    assert len(producer.writer.writes(INDOOR_KEY)) == 1
+    assert len(producer.writer.writes(OUTDOOR_KEY)) == 1
+    assert producer.writer.values == {"ENUM_IN_A": 1, "ENUM_IN_B": 2, "VAR_IN_C": 300, "ENUM_OUT_D": 4}
+    assert producer.coordinator._write_confirmations == {}
+    assert producer.coordinator._ack_confirmations == {}
+
+
+def test_write_batch_without_ack_confirms_by_read_back(producer):
+    producer.writer.ack[OUTDOOR_KEY] = None
+
+    results = asyncio.run(producer.write_batch({"ENUM_IN_A": 1, "ENUM_OUT_D": 4}))
+
+    assert results == {"ENUM_IN_A": True, "ENUM_OUT_D": True}
+    assert producer._ack_support == {INDOOR_KEY: True, OUTDOOR_KEY: False}
@@ -0,0 +1,232 @@
+import gzip
+import time
+from datetime import datetime
+
+import pytest
+
+from custom_components.ehs_sentinel import packet_logger
+from custom_components.ehs_sentinel.capture_ring import CaptureRing, dump_frames
+from custom_components.ehs_sentinel.packet_capture import (
+    MAGIC,
+    CaptureWriter,
+    INDEX_ENTRY,
+    INDEX_MAGIC,
+    format_text_line,
+    index_path,
+    pack_record,
+    pack_segment,
+    parse_text_line,
+    read_index,
+    read_packets,
+)
+from custom_components.ehs_sentinel.packet_logger import PacketLogger, RotationWorker
+
+WALL_START = datetime(2026, 10, 18, 12, 0).timestamp()
+MONO_START = 5 * 10**12
+
+
+class DriftingTime:
+    """Ersatz für das time Modul des PacketLoggers: die Wanduhr läuft bei jedem Abfragen 1 ms weiter weg."""
+
+    def __init__(self):
+        self.mono_ns = MONO_START
+        self.drift_ns = 0
+
+    def monotonic_ns(self) -> int:
+        return self.mono_ns
+
+    def time_ns(self) -> int:
+        self.drift_ns += 10**6
+        return int(WALL_START * 1e9) + self.mono_ns - MONO_START + self.drift_ns
+
+    def monotonic(self) -> float:
+        return self.mono_ns / 1e9
+
+
+def frame(i: int) -> bytes:
+    return bytes([0x32, 0x00, 0x11, i & 0xFF, (i >> 8) & 0xFF, 0x34])
+
+
+def write_capture(path, monkeypatch, binary: bool = True, frames: int = 600, batch: int = 20, step_ns: int = 10**9, **options) -> list:
+    """Schreibt frames Pakete im Abstand step_ns in Batches über den PacketLogger, ohne dessen Thread."""
+    clock = DriftingTime()
+    monkeypatch.setattr(packet_logger, "time", clock)
+    logger = PacketLogger(path, binary=binary, **options)
+    written = []
+    for i in range(frames):
+        logger._queue.append((clock.mono_ns, frame(i)))
+        written.append(frame(i))
+        clock.mono_ns += step_ns
+        if len(logger._queue) >= batch:
+            logger._write_batch()
+    logger._write_batch()
+    logger._close()
+    return written
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_windowed_read_matches_full_read(tmp_path, monkeypatch, binary):
+    path = tmp_path / ("packet.ehscap" if binary else "packet.log")
+    written = write_capture(path, monkeypatch, binary)
+
+    full = list(read_packets(path))
+    assert [f for _, _, f in full] == written
+
+    for index in (0, 59, 60, 61, 250, 599):
+        start = full[index][0]
+        window = list(read_packets(path, start, full[index + 30][0] if index + 30 < len(full) else None))
+        assert window == [p for p in full[index:index + 31]]
+
+
+def test_capture_segments_keep_their_own_wall_clock(tmp_path):
+    path = tmp_path / "packet.ehscap"
+    wall_ns = int(WALL_START * 1e9)
+    with open(path, "wb") as f:
+        f.write(MAGIC + pack_segment(MONO_START, wall_ns))
+        f.write(pack_record(MONO_START + 10**9, frame(1)))
+        # Neustart: neue monotone Basis, neues Segment
+        f.write(pack_segment(100, wall_ns + 60 * 10**9))
+        f.write(pack_record(100 + 2 * 10**9, frame(2)))
+
+    assert list(read_packets(path)) == [
+        ((wall_ns + 10**9) / 1e9, MONO_START + 10**9, frame(1)),
+        ((wall_ns + 62 * 10**9) / 1e9, 100 + 2 * 10**9, frame(2)),
+    ]
+
+
+def test_capture_writer_appends_segment_without_second_magic(tmp_path):
+    path = tmp_path / "packet.ehscap"
+    for i in range(2):
+        with open(path, "ab") as f:
+            writer = CaptureWriter(f, new_file=f.tell() == 0)
+            writer.write(MONO_START + i, frame(i))
+
+    data = path.read_bytes()
+    assert data.count(MAGIC) == 1
+    assert [f for _, _, f in read_packets(path)] == [frame(0), frame(1)]
+
+
+def test_truncated_last_record_is_skipped(tmp_path):
+    path = tmp_path / "packet.ehscap"
+    path.write_bytes(MAGIC + pack_segment(MONO_START, int(WALL_START * 1e9)) + pack_record(MONO_START, frame(1)) + pack_record(MONO_START + 1, frame(2))[:-2])
+
+    assert [f for _, _, f in read_packets(path)] == [frame(1)]
+
+
+def test_format_is_detected_from_content(tmp_path):
+    binary = tmp_path / "capture.gz"
+    with gzip.open(binary, "wb") as f:
+        CaptureWriter(f).write(MONO_START, frame(1))
+    text = tmp_path / "packet.log.2026-10-18"
+    text.write_text("not a packet\n" + format_text_line(WALL_START + 0.25, frame(2)))
+
+    assert [f for _, _, f in read_packets(binary)] == [frame(1)]
+    assert list(read_packets(text)) == [(WALL_START + 0.25, int((WALL_START + 0.25) * 1e9), frame(2))]
+    assert parse_text_line(format_text_line(WALL_START, frame(3))) == (WALL_START, frame(3))
+
+
+@pytest.mark.parametrize("damage", ["missing", "magic", "partial_entry"])
+def test_windowed_read_without_usable_index_scans_linearly(tmp_path, monkeypatch, damage):
+    path = tmp_path / "packet.ehscap"
+    write_capture(path, monkeypatch)
+    full = list(read_packets(path))
+    index = index_path(path)
+    entries = read_index(path)
+    assert len(entries) == 10  # ein Eintrag je Minute bei einem Frame pro Sekunde
+
+    if damage == "missing":
+        index.unlink()
+    elif damage == "magic":
+        index.write_bytes(b"garbage\n" + index.read_bytes()[len(INDEX_MAGIC):])
+    else:
+        # abgeschnittener letzter Eintrag, z.B. nach einem Absturz beim Schreiben
+        index.write_bytes(index.read_bytes()[:-INDEX_ENTRY.size // 2])
+        assert len(read_index(path)) == len(entries) - 1
+
+    assert list(read_packets(path, full[300][0], full[330][0])) == full[300:331]
+    assert read_index(path) == ([] if damage != "partial_entry" else entries[:-1])
+
+
+def test_windowed_read_outside_of_the_capture(tmp_path, monkeypatch):
+    path = tmp_path / "packet.ehscap"
+    write_capture(path, monkeypatch, frames=120)
+
+    assert len(list(read_packets(path, WALL_START - 3600, WALL_START - 60))) == 0
+    assert len(list(read_packets(path, WALL_START + 3600))) == 0
+    assert len(list(read_packets(path, WALL_START - 3600))) == 120
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_rotate_compress_and_read(tmp_path, monkeypatch, binary):
+    path = tmp_path / ("packet.ehscap" if binary else "packet.log")
+    # alle 10 Minuten ein Frame über drei Mitternächte
+    written = write_capture(path, monkeypatch, binary, frames=432, step_ns=600 * 10**9, backup_count=2)
+    monkeypatch.setattr(packet_logger, "time", time)
+    rotated = [path.with_name(f"{path.name}.2026-10-{day}") for day in (18, 19, 20)]
+    assert [p for p in sorted(tmp_path.iterdir()) if not p.name.endswith(".idx")] == sorted(rotated + [path])
+
+    worker = RotationWorker(path, backup_count=2)
+    assert worker.pending() == rotated
+    worker.start()
+    for p in worker.pending():
+        worker.submit(p)
+    worker.stop(timeout=10)
+
+    assert worker.compressed == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([
+        path.name, f"{path.name}.idx",
+        f"{rotated[1].name}.gz", f"{rotated[1].name}.gz.idx",
+        f"{rotated[2].name}.gz", f"{rotated[2].name}.gz.idx",
+    ])
+
+    day = rotated[2].with_name(f"{rotated[2].name}.gz")
+    full = list(read_packets(day))
+    assert len(full) == 144
+    assert all(datetime.fromtimestamp(ts).day == 20 for ts, _, _ in full)
+    everything = [f for p in (rotated[1].with_name(f"{rotated[1].name}.gz"), day, path) for _, _, f in read_packets(p)]
+    assert everything == written[-len(everything):]
+
+    # jeder Indexeintrag zeigt auf den Anfang eines eigenen gzip-Members
+    data = day.read_bytes()
+    entries = read_index(day)
+    assert len(entries) == 144
+    assert all(data[offset:offset + 2] == b"\x1f\x8b" for _, _, offset in entries)
+    assert list(read_packets(day, full[100][0], full[110][0])) == full[100:111]
+
+
+def test_ring_wraps_around_oldest_first():
+    ring = CaptureRing(capacity=4, slot_size=8)
+    for i in range(3):
+        ring.add(frame(i), mono_ns=i)
+    assert ring.snapshot() == [(i, frame(i)) for i in range(3)]
+
+    for i in range(3, 10):
+        ring.add(frame(i), mono_ns=i)
+
+    assert len(ring) == 4
+    assert ring.total == 10
+    assert ring.snapshot() == [(i, frame(i)) for i in range(6, 10)]
+
+
+def test_ring_truncates_oversized_frames_and_clears():
+    ring = CaptureRing(capacity=2, slot_size=4)
+    ring.add(b"\x01\x02", mono_ns=1)
+    ring.add(bytes(range(10)), mono_ns=2)
+    ring.add(b"\x03", mono_ns=3)
+
+    assert ring.truncated == 1
+    # kürzere Frames im selben Slot lassen keine Reste des vorherigen stehen
+    assert ring.snapshot() == [(2, bytes(range(4))), (3, b"\x03")]
+    ring.clear()
+    assert len(ring) == 0 and ring.snapshot() == []
+
+
+def test_ring_dump_is_a_readable_capture(tmp_path):
+    ring = CaptureRing(capacity=3)
+    for i in range(5):
+        ring.add(frame(i), mono_ns=MONO_START + i * 10**6)
+    path = tmp_path / "capture_diagnostics.ehscap"
+
+    dump_frames(ring.snapshot(), path)
+
+    assert [(mono_ns, f) for _, mono_ns, f in read_packets(path)] == ring.snapshot()
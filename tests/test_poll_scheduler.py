@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from custom_components.ehs_sentinel.coordinator import EHSSentinelCoordinator
+from custom_components.ehs_sentinel.poll_scheduler import PollScheduler
+
+
+class FakeCoordinator:
+    """Nimmt die Polls des Schedulers entgegen und stoppt ihn nach max_polls."""
+
+    def __init__(self, clock, max_polls: int = 0):
+        self.clock = clock
+        self.max_polls = max_polls
+        self.running = True
+        self.polls = []
+        self.done = asyncio.Event()
+
+    def parse_time_string(self, time_str: str) -> int:
+        return int(time_str[:-1]) * {"s": 1, "m": 60, "h": 3600}[time_str[-1]]
+
+    async def poll_group(self, name, message_list, freshness_seconds=0):
+        self.polls.append((self.clock.monotonic(), name, list(message_list), freshness_seconds))
+        if len(self.polls) >= self.max_polls:
+            self.running = False
+            self.done.set()
+
+
+def polling_yaml(**schedules) -> dict:
+    return {
+        "fetch_interval": [{"name": name, "schedule": schedule, "enable": True} for name, schedule in schedules.items()],
+        "groups": {name: [f"NASA_{name.upper()}"] for name in schedules},
+    }
+
+
+def test_stagger_spreads_groups_with_same_period(clock):
+    scheduler = PollScheduler(FakeCoordinator(clock), clock)
+    scheduler.configure(polling_yaml(a="60s", b="60s", c="60s"))
+
+    offsets = [scheduler.groups[name].next_due - clock.monotonic() for name in ("a", "b", "c")]
+    for index, offset in enumerate(offsets):
+        # Slot je Gruppe 20 s, Jitter höchstens die halbe Slotbreite
+        assert index * 20 <= offset <= index * 20 + 10
+    assert len(set(offsets)) == 3
+
+
+def test_stagger_is_deterministic(clock):
+    first = PollScheduler(FakeCoordinator(clock), clock)
+    first.configure(polling_yaml(a="60s", b="60s"))
+    second = PollScheduler(FakeCoordinator(clock), clock)
+    second.configure(polling_yaml(a="60s", b="60s"))
+
+    assert [g.next_due for g in first.groups.values()] == [g.next_due for g in second.groups.values()]
+
+
+def test_configure_keeps_next_due_of_unchanged_groups(clock):
+    scheduler = PollScheduler(FakeCoordinator(clock), clock)
+    scheduler.configure(polling_yaml(a="60s", b="5m"))
+    due = {name: group.next_due for name, group in scheduler.groups.items()}
+
+    clock.advance(30)
+    scheduler.configure(polling_yaml(a="60s", b="10m"))
+
+    assert scheduler.groups["a"].next_due == due["a"]
+    # geänderte Periode: neu verteilt ab jetzt
+    assert scheduler.groups["b"].next_due >= clock.monotonic()
+    assert scheduler.groups["b"].period == 600
+
+
+def test_configure_drops_disabled_groups(clock):
+    scheduler = PollScheduler(FakeCoordinator(clock), clock)
+    yaml = polling_yaml(a="60s", b="60s")
+    scheduler.configure(yaml)
+    yaml["fetch_interval"][1]["enable"] = False
+    scheduler.configure(yaml)
+
+    assert list(scheduler.groups) == ["a"]
+
+
+def test_run_polls_each_group_once_per_period(clock):
+    async def run():
+        coordinator = FakeCoordinator(clock, max_polls=8)
+        scheduler = PollScheduler(coordinator, clock)
+        scheduler.configure(polling_yaml(fast="10s", slow="30s"))
+        start = clock.monotonic()
+        scheduler.start()
+        scheduler.resume()
+        await asyncio.wait_for(coordinator.done.wait(), timeout=5)
+        await scheduler.stop()
+        return start, coordinator.polls
+
+    start, polls = asyncio.run(run())
+
+    fast = [ts for ts, name, _, _ in polls if name == "fast"]
+    slow = [ts for ts, name, _, _ in polls if name == "slow"]
+    assert [round(b - a, 6) for a, b in zip(fast, fast[1:])] == [10] * (len(fast) - 1)
+    assert [round(b - a, 6) for a, b in zip(slow, slow[1:])] == [30] * (len(slow) - 1)
+    assert fast[0] - start < 10 and slow[0] - start < 30
+
+
+def test_run_passes_freshness_and_skips_while_paused(clock):
+    async def run():
+        coordinator = FakeCoordinator(clock, max_polls=1)
+        scheduler = PollScheduler(coordinator, clock)
+        yaml = polling_yaml(a="10s")
+        yaml["fetch_interval"][0]["freshness"] = "5s"
+        scheduler.configure(yaml)
+        scheduler.start()
+        await asyncio.sleep(0.01)
+        paused_polls = len(coordinator.polls)
+        scheduler.resume()
+        await asyncio.wait_for(coordinator.done.wait(), timeout=5)
+        await scheduler.stop()
+        return paused_polls, coordinator.polls
+
+    paused_polls, polls = asyncio.run(run())
+
+    assert paused_polls == 0
+    assert polls[0][1:] == ("a", ["NASA_A"], 5)
+
+
+
+class FreshnessCoordinator:
+    """poll_group und is_fresh des echten Coordinators mit einem Producer, der die Reads sammelt."""
+
+    poll_group = EHSSentinelCoordinator.poll_group
+    is_fresh = EHSSentinelCoordinator.is_fresh
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.producer = self
+        self.requests = []
+        self.stats = {}
+        self._last_seen = {}
+
+    async def read_request(self, messages, retry_mode=False):
+        self.requests.extend(messages)
+
+    async def _inc_stat(self, name, amount=1):
+        self.stats[name] = self.stats.get(name, 0) + amount
+
+
+@pytest.mark.parametrize("age, expected", [(5, ["NASA_OTHER"]), (10, ["NASA_SEEN", "NASA_OTHER"])])
+def test_poll_group_skips_fresh_messages(clock, age, expected):
+    coordinator = FreshnessCoordinator(clock)
+    coordinator._last_seen["NASA_SEEN"] = clock.monotonic()
+    clock.advance(age)
+
+    asyncio.run(coordinator.poll_group("a", ["NASA_SEEN", "NASA_OTHER"], 10))
+
+    assert coordinator.requests == expected
+    assert coordinator.stats["polls_saved"] == 2 - len(expected)
+    assert coordinator.stats["polls_sent"] == len(expected)
+
+
+def test_poll_group_without_freshness_polls_everything(clock):
+    coordinator = FreshnessCoordinator(clock)
+    coordinator._last_seen["NASA_SEEN"] = clock.monotonic()
+
+    asyncio.run(coordinator.poll_group("a", ["NASA_SEEN"]))
+
+    assert coordinator.requests == ["NASA_SEEN"]
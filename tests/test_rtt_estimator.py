@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from custom_components.ehs_sentinel.rtt_estimator import RttEstimator, RttTracker, backoff_delay
+
+
+def test_first_sample_sets_srtt_and_rttvar():
+    estimator = RttEstimator()
+    estimator.add_sample(0.2)
+
+    assert estimator.srtt == 0.2
+    assert estimator.rttvar == 0.1
+    assert estimator.rto == pytest.approx(0.6)
+
+
+def test_rto_follows_rfc_6298():
+    estimator = RttEstimator()
+    estimator.add_sample(0.2)
+    estimator.add_sample(0.4)
+
+    assert estimator.rttvar == pytest.approx(0.75 * 0.1 + 0.25 * 0.2)
+    assert estimator.srtt == pytest.approx(0.875 * 0.2 + 0.125 * 0.4)
+    assert estimator.rto == pytest.approx(estimator.srtt + 4 * estimator.rttvar)
+
+
+@pytest.mark.parametrize("samples, expected", [([0.01] * 20, 0.3), ([30.0], 10.0)])
+def test_rto_is_bounded(samples, expected):
+    estimator = RttEstimator(min_rto=0.3, max_rto=10.0)
+    for sample in samples:
+        estimator.add_sample(sample)
+
+    assert estimator.rto == pytest.approx(expected)
+
+
+def test_initial_rto_until_first_sample():
+    estimator = RttEstimator(initial_rto=4.0)
+
+    assert estimator.timeout() == 4.0
+    assert estimator.as_dict() == {"srtt": None, "rttvar": None, "rto": 4.0, "samples": 0, "timeouts": 0}
+
+
+def test_timeout_doubles_per_attempt_up_to_max_rto():
+    estimator = RttEstimator(initial_rto=1.5, max_rto=10.0)
+
+    assert [estimator.timeout(attempt) for attempt in range(5)] == [1.5, 3.0, 6.0, 10.0, 10.0]
+
+
+def test_tracker_keeps_one_estimator_per_destination():
+    tracker = RttTracker(initial_rto=2.0)
+    tracker.get("indoor").add_sample(0.1)
+    tracker.get("outdoor").on_timeout()
+
+    assert tracker.get("indoor") is tracker.get("indoor")
+    assert tracker.get("outdoor").rto == 2.0
+    assert tracker.stats()["indoor"]["samples"] == 1
+    assert tracker.stats()["outdoor"]["timeouts"] == 1
+
+
+@pytest.mark.parametrize("attempt, limit", [(0, 0.5), (2, 2.0), (3, 3.0), (10, 3.0)])
+def test_backoff_delay_stays_within_full_jitter_bounds(attempt, limit):
+    random.seed(attempt)
+    delays = [backoff_delay(attempt, base=0.5, cap=3.0) for _ in range(200)]
+
+    assert all(0 <= delay <= limit for delay in delays)
+    assert max(delays) > limit * 0.8
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+from custom_components.ehs_sentinel.statistics_import import HourlyAggregator, merge_with_existing, statistics_keys
+
+HOUR = 3600
+START = datetime(2026, 10, 18, tzinfo=timezone.utc).timestamp()
+
+
+def hourly_sums(*sums) -> list:
+    """Berechnete Stunden ab START mit den eigenen Summen (beginnen bei 0 am Anfang des Logs)."""
+    return [{"start": datetime.fromtimestamp(START + i * HOUR, tz=timezone.utc), "state": s, "sum": s} for i, s in enumerate(sums)]
+
+
+def existing(hour: int, value: float) -> dict:
+    # statistics_during_period liefert start als Timestamp
+    return {"start": START + hour * HOUR, "sum": value}
+
+
+def test_aggregator_sums_and_means_per_hour():
+    aggregator = HourlyAggregator({"TOTAL": True, "TEMP": False})
+    for minute, (total, temp) in enumerate([(100, 20), (101, 22), (103, 24)]):
+        aggregator.add("TOTAL", total, START + minute * 20 * 60)
+        aggregator.add("TEMP", temp, START + minute * 20 * 60)
+    aggregator.add("TOTAL", 104, START + HOUR + 60)
+    aggregator.add("TEMP", True, START)  # bool ist kein Messwert
+    aggregator.add("OTHER", 1, START)
+
+    assert [(r["state"], r["sum"]) for r in aggregator.statistics("TOTAL")] == [(103, 3), (104, 4)]
+    assert aggregator.statistics("TEMP") == [{"start": datetime.fromtimestamp(START, tz=timezone.utc), "mean": 22, "min": 20, "max": 24}]
+
+
+def test_aggregator_meter_reset_within_an_hour():
+    aggregator = HourlyAggregator({"TOTAL": True})
+    for offset, value in enumerate([50, 52, 1, 3]):
+        aggregator.add("TOTAL", value, START + offset * 60)
+    aggregator.add("TOTAL", 5, START + HOUR)
+
+    # wie der Recorder: nach dem Reset zählt der neue Wert voll
+    assert [(r["state"], r["sum"]) for r in aggregator.statistics("TOTAL")] == [(3, 2 + 1 + 2), (5, 7)]
+
+
+def test_without_existing_statistics_sums_start_at_zero():
+    rows, adjustment = merge_with_existing(hourly_sums(1, 3, 6), [], True)
+
+    assert [r["sum"] for r in rows] == [1, 3, 6]
+    assert adjustment == 0
+
+
+def test_sums_continue_from_last_existing_statistic():
+    rows, adjustment = merge_with_existing(hourly_sums(1, 3, 6), [existing(-5, 1000.0)], True)
+
+    assert [r["sum"] for r in rows] == [1001, 1003, 1006]
+    assert adjustment == 0
+
+
+def test_overlapping_hours_are_kept_and_followed():
+    # Stunde 1 und 2 sind schon im Recorder, dort mit anderem Stand
+    rows, adjustment = merge_with_existing(hourly_sums(1, 3, 6, 10), [existing(-1, 100.0), existing(1, 103.5), existing(2, 106.5)], True)
+
+    assert [(r["start"].timestamp(), r["sum"]) for r in rows] == [(START, 101), (START + 3 * HOUR, 110.5)]
+    assert adjustment == 0
+
+
+def test_import_before_existing_series_shifts_it_by_the_imported_sum():
+    # der Recorder beginnt erst in Stunde 2 bei 0, davor wurden 3 importiert
+    rows, adjustment = merge_with_existing(hourly_sums(1, 3, 6, 10), [existing(2, 0.5), existing(3, 4.5)], True)
+
+    assert [r["sum"] for r in rows] == [1, 3]
+    assert adjustment == 3
+    # die verschobene Stunde 2 (0.5 + 3) schließt an die importierte Stunde 1 (3) an
+    assert 0.5 + adjustment >= rows[-1]["sum"]
+
+
+def test_gap_between_existing_hours_is_filled_from_the_earlier_one():
+    rows, adjustment = merge_with_existing(hourly_sums(1, 3, 6, 10), [existing(0, 50.0), existing(3, 70.0)], True)
+
+    assert [(r["start"].timestamp(), r["sum"]) for r in rows] == [(START + HOUR, 52), (START + 2 * HOUR, 55)]
+    assert adjustment == 0
+
+
+def test_mean_statistics_skip_existing_hours_only():
+    rows = [{"start": datetime.fromtimestamp(START + i * HOUR, tz=timezone.utc), "mean": 20, "min": 19, "max": 21} for i in range(3)]
+
+    merged, adjustment = merge_with_existing(rows, [{"start": datetime.fromtimestamp(START + HOUR, tz=timezone.utc), "mean": 5}], False)
+
+    assert [r["start"].timestamp() for r in merged] == [START, START + 2 * HOUR]
+    assert adjustment == 0
+
+
+def test_statistics_keys_allow_calculated_sensors_and_total_counters():
+    nasa_repo = {
+        "NASA_EHSSENTINEL_TOTAL_COP": {"hass_opts": {"state_class": "measurement"}},
+        "LVAR_IN_TOTAL_GENERATED_POWER": {"hass_opts": {"state_class": "total_increasing"}},
+        "NASA_OUTDOOR_TW1_TEMP": {"hass_opts": {"state_class": "measurement"}},
+    }
+
+    keys = statistics_keys(nasa_repo)
+
+    assert "LVAR_IN_TOTAL_GENERATED_POWER" in keys
+    assert "NASA_EHSSENTINEL_TOTAL_COP" in keys
+    assert "NASA_OUTDOOR_TW1_TEMP" not in keys